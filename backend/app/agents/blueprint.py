@@ -0,0 +1,326 @@
+"""Blueprint rendering: one view of a finished run, several output formats.
+
+``blueprint_view`` flattens a ``CreatorState`` into the values every format
+needs. The formats are built from ``Template`` objects parsed once at import:
+
+  markdown — the blueprint shown in the UI (the finalizer's ``final_blueprint``)
+  html     — a standalone, escaped HTML document
+  csv      — the shot list, one row per timeline shot
+  json     — a compact document of the fields clients actually consume
+
+Only markdown is rendered inside the graph; the other formats are rendered on
+request (see ``app.services.render_service``).
+"""
+
+from __future__ import annotations
+
+import csv
+import html
+import io
+import json
+from string import Formatter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+FORMATS = ("markdown", "html", "csv", "json")
+
+MEDIA_TYPES = {
+    "markdown": "text/markdown; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+}
+
+SHOT_FIELDS = ("timestamp", "shot_type", "visual", "audio", "text_overlay", "transition", "notes")
+
+
+class Template:
+    """A ``str.format``-style template parsed once into literals and field names."""
+
+    def __init__(self, source: str):
+        self._parts: List[Tuple[str, Optional[str]]] = [
+            (literal, name) for literal, name, _spec, _conv in Formatter().parse(source)
+        ]
+
+    def render(self, values: Mapping[str, Any], escape: Callable[[str], str] = str) -> str:
+        out = []
+        for literal, name in self._parts:
+            out.append(literal)
+            if name is not None:
+                out.append(escape(str(values[name])))
+        return "".join(out)
+
+
+def _items(values: Any) -> List[Any]:
+    return values if isinstance(values, list) else []
+
+
+def _section_scores_line(section_scores: Dict[str, int]) -> str:
+    if not section_scores:
+        return "N/A"
+    return " · ".join(f"{name} {value}/10" for name, value in section_scores.items())
+
+
+def blueprint_view(state: Mapping[str, Any]) -> Dict[str, Any]:
+    """Values shared by every format, with the same defaults the blueprint always used."""
+    analysis = state.get("analysis") or {}
+    enhancements = state.get("enhancements") or {}
+    story = state.get("story_structure") or {}
+    return {
+        "run_id": state.get("run_id", ""),
+        "prompt": state.get("prompt", ""),
+        "content_type": state.get("content_type", ""),
+        "platform": state.get("platform", ""),
+        "duration_seconds": state.get("duration_seconds", 0),
+        "language": analysis.get("language", "English"),
+        "region": analysis.get("region", "Global"),
+        "genre": analysis.get("genre", "general"),
+        "tone": analysis.get("tone", "N/A"),
+        "visual_style": analysis.get("visual_style", "N/A"),
+        "target_audience": analysis.get("target_audience", "N/A"),
+        "key_themes": ", ".join(map(str, _items(analysis.get("key_themes")))),
+        "score": state.get("score", 0),
+        "iteration_count": state.get("iteration_count", 0),
+        "section_scores": state.get("section_scores") or {},
+        "section_scores_line": _section_scores_line(state.get("section_scores") or {}),
+        "degraded": bool(state.get("degraded")),
+        "skipped": ", ".join(state.get("skipped_nodes") or []),
+        "skipped_nodes": list(state.get("skipped_nodes") or []),
+        "script": state.get("script", "_No script generated._"),
+        "shots": [s for s in _items(state.get("timeline")) if isinstance(s, dict)],
+        "hooks": _items(enhancements.get("hooks")),
+        "music": _items(enhancements.get("music_suggestions")),
+        "color_grading": enhancements.get("color_grading", "N/A"),
+        "hashtags": " ".join(map(str, _items(enhancements.get("hashtags")))),
+        "captions": _items(enhancements.get("captions")),
+        "narrative_arc": story.get("narrative_arc", "N/A"),
+        "payoff": story.get("payoff", "N/A"),
+        "series_potential": story.get("series_potential", "N/A"),
+        "emotion_map": _items(story.get("emotion_map")),
+    }
+
+
+# ─────────────────────────────────────────────────────────────
+# Markdown
+# ─────────────────────────────────────────────────────────────
+_MD_HEADER = Template(
+    "# 🎬 Production Blueprint\n\n"
+    "**Prompt:** {prompt}\n"
+    "**Type:** {content_type} | **Platform:** {platform} | **Duration:** {duration_seconds}s\n"
+    "**Language:** {language} | **Region:** {region} | **Genre:** {genre}\n"
+    "**Quality Score:** {score}/10 | **Iterations:** {iteration_count}\n"
+    "**Section Scores:** {section_scores_line}\n\n"
+)
+_MD_DRAFT = "> ✏️ **Draft preview:** quick pass without timeline, enhancements or critique; the full blueprint follows.\n\n"
+_MD_DEGRADED = Template("> ⚠️ **Degraded run:** the time budget ran out; skipped {skipped}.\n\n")
+_MD_BODY = Template(
+    "---\n\n"
+    "## 📊 Content Analysis\n"
+    "- **Tone:** {tone}\n"
+    "- **Visual Style:** {visual_style}\n"
+    "- **Target Audience:** {target_audience}\n"
+    "- **Key Themes:** {key_themes}\n\n"
+    "## 📝 Script\n\n"
+    "{script}\n\n"
+    "## 🎯 Shot-by-Shot Timeline\n\n"
+)
+_MD_SHOT = Template(
+    "### Shot {n}: {timestamp}\n"
+    "- **Type:** {shot_type}\n"
+    "- **Visual:** {visual}\n"
+    "- **Audio:** {audio}\n"
+)
+_MD_ENHANCEMENTS = "## 🚀 Enhancements\n\n### Opening Hooks\n"
+_MD_LOOKS = Template(
+    "\n### Color Grading\n{color_grading}\n\n"
+    "### Hashtags\n{hashtags}\n\n"
+    "### Captions\n"
+)
+_MD_STORY = Template(
+    "\n## 📖 Story Architecture\n"
+    "- **Narrative Arc:** {narrative_arc}\n"
+    "- **Payoff:** {payoff}\n"
+    "- **Series Potential:** {series_potential}\n"
+)
+_MD_FOOTER = "\n---\n*Generated by bb /create — Multi-Agent Content Production Engine*"
+
+
+def render_markdown(view: Mapping[str, Any], draft: bool = False) -> str:
+    out = [_MD_HEADER.render(view)]
+    if draft:
+        out.append(_MD_DRAFT)
+    if view["degraded"]:
+        out.append(_MD_DEGRADED.render(view))
+    out.append(_MD_BODY.render(view))
+
+    for n, shot in enumerate(view["shots"], 1):
+        out.append(_MD_SHOT.render({
+            "n": n,
+            "timestamp": shot.get("timestamp", "??:??"),
+            "shot_type": shot.get("shot_type", "N/A"),
+            "visual": shot.get("visual", "N/A"),
+            "audio": shot.get("audio", "N/A"),
+        }))
+        if shot.get("text_overlay"):
+            out.append(f"- **Text Overlay:** {shot['text_overlay']}\n")
+        out.append(f"- **Transition:** {shot.get('transition', 'cut')}\n")
+        if shot.get("notes"):
+            out.append(f"- **Notes:** {shot['notes']}\n")
+        out.append("\n")
+
+    out.append(_MD_ENHANCEMENTS)
+    out.extend(f"{i}. {hook}\n" for i, hook in enumerate(view["hooks"], 1))
+    out.append("\n### Music Suggestions\n")
+    for m in view["music"]:
+        if isinstance(m, dict):
+            out.append(f"- **{m.get('name', 'Track')}** — {m.get('mood', '')} ({m.get('source', '')})\n")
+        else:
+            out.append(f"- {m}\n")
+    out.append(_MD_LOOKS.render(view))
+    for c in view["captions"]:
+        if isinstance(c, dict):
+            out.append(f"- **{c.get('style', 'caption')}:** {c.get('text', '')}\n")
+        else:
+            out.append(f"- {c}\n")
+
+    out.append(_MD_STORY.render(view))
+    if view["emotion_map"]:
+        out.append("\n### Emotion Map\n")
+        for em in view["emotion_map"]:
+            if isinstance(em, dict):
+                out.append(f"- **{em.get('timestamp', '?')}:** {em.get('emotion', '?')}\n")
+            else:
+                out.append(f"- {em}\n")
+    out.append(_MD_FOOTER)
+    return "".join(out)
+
+
+# ─────────────────────────────────────────────────────────────
+# HTML
+# ─────────────────────────────────────────────────────────────
+_HTML_PAGE = Template(
+    "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+    "<title>Production Blueprint</title>\n"
+    "<style>body{{font-family:system-ui,sans-serif;max-width:52rem;margin:2rem auto;padding:0 1rem;line-height:1.5}}"
+    "pre{{white-space:pre-wrap;background:#f5f5f5;padding:1rem}}table{{border-collapse:collapse;width:100%}}"
+    "td,th{{border:1px solid #ddd;padding:.4rem;vertical-align:top;text-align:left}}"
+    ".note{{background:#fff4e5;padding:.5rem 1rem}}</style>\n</head>\n<body>\n"
+    "{body}</body>\n</html>\n"
+)
+_HTML_HEADER = Template(
+    "<h1>🎬 Production Blueprint</h1>\n"
+    "<p><strong>Prompt:</strong> {prompt}<br>\n"
+    "<strong>Type:</strong> {content_type} | <strong>Platform:</strong> {platform} | "
+    "<strong>Duration:</strong> {duration_seconds}s<br>\n"
+    "<strong>Language:</strong> {language} | <strong>Region:</strong> {region} | <strong>Genre:</strong> {genre}<br>\n"
+    "<strong>Quality Score:</strong> {score}/10 | <strong>Iterations:</strong> {iteration_count}<br>\n"
+    "<strong>Section Scores:</strong> {section_scores_line}</p>\n"
+)
+_HTML_DEGRADED = Template("<p class=\"note\">⚠️ <strong>Degraded run:</strong> the time budget ran out; skipped {skipped}.</p>\n")
+_HTML_ANALYSIS = Template(
+    "<h2>📊 Content Analysis</h2>\n<ul>\n"
+    "<li><strong>Tone:</strong> {tone}</li>\n"
+    "<li><strong>Visual Style:</strong> {visual_style}</li>\n"
+    "<li><strong>Target Audience:</strong> {target_audience}</li>\n"
+    "<li><strong>Key Themes:</strong> {key_themes}</li>\n</ul>\n"
+    "<h2>📝 Script</h2>\n<pre>{script}</pre>\n"
+)
+_HTML_SHOT_ROW = Template(
+    "<tr><td>{n}</td><td>{timestamp}</td><td>{shot_type}</td><td>{visual}</td><td>{audio}</td>"
+    "<td>{text_overlay}</td><td>{transition}</td><td>{notes}</td></tr>\n"
+)
+_HTML_LOOKS = Template(
+    "<h3>Color Grading</h3>\n<p>{color_grading}</p>\n<h3>Hashtags</h3>\n<p>{hashtags}</p>\n"
+)
+_HTML_STORY = Template(
+    "<h2>📖 Story Architecture</h2>\n<ul>\n"
+    "<li><strong>Narrative Arc:</strong> {narrative_arc}</li>\n"
+    "<li><strong>Payoff:</strong> {payoff}</li>\n"
+    "<li><strong>Series Potential:</strong> {series_potential}</li>\n</ul>\n"
+)
+
+
+def _html_list(items: List[Any], fmt: Callable[[Any], str], tag: str = "ul") -> str:
+    if not items:
+        return ""
+    return f"<{tag}>\n" + "".join(f"<li>{fmt(item)}</li>\n" for item in items) + f"</{tag}>\n"
+
+
+def render_html(view: Mapping[str, Any]) -> str:
+    e = html.escape
+    body = [_HTML_HEADER.render(view, e)]
+    if view["degraded"]:
+        body.append(_HTML_DEGRADED.render(view, e))
+    body.append(_HTML_ANALYSIS.render(view, e))
+    body.append("<h2>🎯 Shot-by-Shot Timeline</h2>\n<table>\n<tr><th>#</th>")
+    body.append("".join(f"<th>{name.replace('_', ' ').title()}</th>" for name in SHOT_FIELDS))
+    body.append("</tr>\n")
+    for n, shot in enumerate(view["shots"], 1):
+        body.append(_HTML_SHOT_ROW.render({"n": n, **{f: shot.get(f, "") for f in SHOT_FIELDS}}, e))
+    body.append("</table>\n<h2>🚀 Enhancements</h2>\n<h3>Opening Hooks</h3>\n")
+    body.append(_html_list(view["hooks"], lambda h: e(str(h)), "ol"))
+    body.append("<h3>Music Suggestions</h3>\n")
+    body.append(_html_list(view["music"], lambda m: (
+        f"<strong>{e(str(m.get('name', 'Track')))}</strong> — {e(str(m.get('mood', '')))} ({e(str(m.get('source', '')))})"
+        if isinstance(m, dict) else e(str(m))
+    )))
+    body.append(_HTML_LOOKS.render(view, e))
+    body.append("<h3>Captions</h3>\n")
+    body.append(_html_list(view["captions"], lambda c: (
+        f"<strong>{e(str(c.get('style', 'caption')))}:</strong> {e(str(c.get('text', '')))}"
+        if isinstance(c, dict) else e(str(c))
+    )))
+    body.append(_HTML_STORY.render(view, e))
+    if view["emotion_map"]:
+        body.append("<h3>Emotion Map</h3>\n")
+        body.append(_html_list(view["emotion_map"], lambda em: (
+            f"<strong>{e(str(em.get('timestamp', '?')))}:</strong> {e(str(em.get('emotion', '?')))}"
+            if isinstance(em, dict) else e(str(em))
+        )))
+    return _HTML_PAGE.render({"body": "".join(body)})
+
+
+# ─────────────────────────────────────────────────────────────
+# CSV shot list & JSON
+# ─────────────────────────────────────────────────────────────
+def render_csv(view: Mapping[str, Any]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(("shot", *SHOT_FIELDS))
+    for n, shot in enumerate(view["shots"], 1):
+        writer.writerow((n, *(shot.get(f, "") for f in SHOT_FIELDS)))
+    return buffer.getvalue()
+
+
+def render_json(view: Mapping[str, Any]) -> str:
+    document = {
+        "run_id": view["run_id"],
+        "prompt": view["prompt"],
+        "content_type": view["content_type"],
+        "platform": view["platform"],
+        "duration_seconds": view["duration_seconds"],
+        "language": view["language"],
+        "score": view["score"],
+        "section_scores": view["section_scores"],
+        "degraded": view["degraded"],
+        "skipped_nodes": view["skipped_nodes"],
+        "script": view["script"],
+        "shots": [{f: shot.get(f, "") for f in SHOT_FIELDS} for shot in view["shots"]],
+        "hooks": view["hooks"],
+        "hashtags": view["hashtags"].split(),
+        "captions": view["captions"],
+        "narrative_arc": view["narrative_arc"],
+    }
+    return json.dumps(document, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+_RENDERERS: Dict[str, Callable[[Mapping[str, Any]], str]] = {
+    "markdown": render_markdown,
+    "html": render_html,
+    "csv": render_csv,
+    "json": render_json,
+}
+
+
+def render(state: Mapping[str, Any], fmt: str) -> str:
+    """Render a finished run's state in one of ``FORMATS``."""
+    return _RENDERERS[fmt](blueprint_view(state))
@@ -0,0 +1,66 @@
+"""Output-token budgets per agent, sized to the piece being produced.
+
+Output length is the main driver of LLM latency, and a 30-second reel needs a
+fraction of the script, timeline and enhancement text that a 10-minute video
+does. ``output_token_budget`` starts from the node's base budget (sized for
+30 seconds of short-form), adds the node's per-minute allowance for longer
+pieces, then scales by content type and platform. Every number lives in
+``Settings`` so budgets can be tuned per deployment.
+
+``BudgetTracker`` records how much of its budget each call used, and how often
+a node was cut off, so the base budgets can be tuned from real traffic.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Mapping, Optional
+
+from app.core.config import Settings
+
+SHORT_FORM_CONTENT_TYPES = {"reel", "short", "story", "tiktok"}
+
+
+def is_short_form(state: Mapping[str, Any], settings: Settings) -> bool:
+    return (
+        int(state.get("duration_seconds", 30)) <= settings.short_form_max_seconds
+        and str(state.get("content_type", "")).lower() in SHORT_FORM_CONTENT_TYPES
+    )
+
+
+def output_token_budget(node: str, state: Mapping[str, Any], settings: Settings) -> Optional[int]:
+    """``max_tokens`` for one call of ``node`` in this run, or ``None`` when unbounded."""
+    if not settings.output_budgets_enabled or node not in settings.node_output_tokens:
+        return None
+    extra_minutes = max(0.0, (int(state.get("duration_seconds", 30)) - 30) / 60)
+    budget = settings.node_output_tokens[node] + settings.node_output_tokens_per_minute.get(node, 0) * extra_minutes
+    budget *= settings.content_type_token_scale.get(str(state.get("content_type", "")).lower(), 1.0)
+    budget *= settings.platform_token_scale.get(str(state.get("platform", "")).lower(), 1.0)
+    return max(settings.min_output_tokens, min(settings.max_output_tokens, int(budget)))
+
+
+class BudgetTracker:
+    """Rolling per-node record of output tokens used relative to the budget."""
+
+    def __init__(self, window: int = 200):
+        self._ratios: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self.truncations: Dict[str, int] = defaultdict(int)
+        self.continuations: Dict[str, int] = defaultdict(int)
+
+    def record(self, node: str, output_tokens: int, budget: int, truncated: bool) -> None:
+        self._ratios[node].append(output_tokens / budget if budget else 0.0)
+        if truncated:
+            self.truncations[node] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        report = {}
+        for node, ratios in self._ratios.items():
+            ordered = sorted(ratios)
+            report[node] = {
+                "calls": len(ordered),
+                "p50_utilization": round(ordered[len(ordered) // 2], 3),
+                "p95_utilization": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3),
+                "truncations": self.truncations.get(node, 0),
+                "continuations": self.continuations.get(node, 0),
+            }
+        return report
@@ -0,0 +1,168 @@
+"""Record/replay cassettes of LLM traffic for offline, deterministic runs.
+
+A cassette is a JSONL file (gzip-compressed when the path ends in ``.gz``) with
+one entry per LLM call: node name, formatted prompt, output text, latency and
+token counts. ``CassetteRecorder`` appends entries as calls complete;
+``CassettePlayer`` serves them back without touching the network, either with
+their recorded latency or instantly.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import IO, Any, Deque, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+
+logger = logging.getLogger(__name__)
+
+
+class CassetteMiss(LookupError):
+    """Raised when a replayed run asks for a call the cassette does not contain."""
+
+
+class ReplayOnlyChatModel(BaseChatModel):
+    """Stands in for the chat model in replay mode, where the cassette answers every call.
+
+    Lets a service be built without an API key or network; calling it is a bug.
+    """
+
+    model_name: str = "cassette"
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette-replay"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        raise CassetteMiss(f"'{self.model_name}' is not available while replaying a cassette")
+
+
+def prompt_text(prompt: Any) -> str:
+    """Flatten a string or message-list prompt into the text that is recorded."""
+    if isinstance(prompt, str):
+        return prompt
+    if isinstance(prompt, list):
+        return "\n".join(str(getattr(m, "content", m)) for m in prompt)
+    return str(prompt)
+
+
+def prompt_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:24]
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+def load_cassette(path: str | Path) -> List[Dict[str, Any]]:
+    """Read every complete entry of a cassette, tolerating a truncated tail."""
+    entries: List[Dict[str, Any]] = []
+    try:
+        with _open(Path(path), "r") as handle:
+            for line in handle:
+                if line.strip():
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+    except EOFError:
+        # Recorder was not closed cleanly; everything flushed so far is usable.
+        pass
+    return entries
+
+
+class CassetteRecorder:
+    """Appends one entry per LLM call to a cassette file."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle: Optional[IO[str]] = _open(self.path, "a")
+        self.count = 0
+
+    def record(self, node: str, prompt: Any, response: Any, latency: float) -> None:
+        if self._handle is None:
+            return
+        text = prompt_text(prompt)
+        usage = getattr(response, "usage_metadata", None) or {}
+        entry = {
+            "seq": self.count,
+            "ts": round(time.time(), 3),
+            "node": node,
+            "prompt_hash": prompt_hash(text),
+            "prompt": text,
+            "output": response.content,
+            "latency": round(latency, 4),
+            "input_tokens": usage.get("input_tokens", 0),
+            "output_tokens": usage.get("output_tokens", 0),
+            "finish_reason": (getattr(response, "response_metadata", None) or {}).get("finish_reason"),
+        }
+        self._handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._handle.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class CassettePlayer:
+    """Serves recorded responses, matched by node and exact prompt.
+
+    When a prompt has changed since recording (e.g. while comparing a code change),
+    the next unused entry recorded for the same node is served instead.
+    """
+
+    def __init__(self, path: str | Path, realtime: bool = False):
+        self.realtime = realtime
+        self._by_prompt: Dict[tuple, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._by_node: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._used: set[int] = set()
+        self.hits = 0
+        self.fuzzy_hits = 0
+        entries = load_cassette(path)
+        for i, entry in enumerate(entries):
+            entry["_idx"] = i
+            self._by_prompt[(entry["node"], entry["prompt_hash"])].append(entry)
+            self._by_node[entry["node"]].append(entry)
+        logger.info("Loaded cassette %s with %d entries", path, len(entries))
+
+    def _take(self, queue: Deque[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        while queue:
+            entry = queue.popleft()
+            if entry["_idx"] not in self._used:
+                self._used.add(entry["_idx"])
+                return entry
+        return None
+
+    async def play(self, node: str, prompt: Any) -> AIMessage:
+        entry = self._take(self._by_prompt[(node, prompt_hash(prompt_text(prompt)))])
+        if entry is not None:
+            self.hits += 1
+        else:
+            entry = self._take(self._by_node[node])
+            if entry is None:
+                raise CassetteMiss(f"No recorded LLM call left for node '{node}'")
+            self.fuzzy_hits += 1
+        if self.realtime and entry.get("latency"):
+            await asyncio.sleep(entry["latency"])
+        return AIMessage(
+            content=entry["output"],
+            usage_metadata={
+                "input_tokens": entry.get("input_tokens", 0),
+                "output_tokens": entry.get("output_tokens", 0),
+                "total_tokens": entry.get("input_tokens", 0) + entry.get("output_tokens", 0),
+            },
+            response_metadata={"finish_reason": entry.get("finish_reason"), "cassette": True},
+        )
@@ -0,0 +1,257 @@
+"""Per-node LLM client used by every agent in the creator graph.
+
+Agents call ``LLMClient.ainvoke(node, prompt)`` instead of the chat model directly
+so that cross-cutting behaviour can key on the node name. The client tracks recent
+latency per node and, when hedging is enabled, sends a duplicate request if the
+first one is slower than the node's configured latency percentile; whichever
+response arrives first wins and the other is cancelled. Hedges are capped at
+``llm_hedge_budget_ratio`` of all calls so they cannot add more than that
+fraction to total spend.
+
+With ``llm_cassette_mode`` set to ``record`` every call is also written to a
+cassette; in ``replay`` mode calls are served from the cassette and the chat
+model is never contacted (see ``app.agents.cassette``).
+
+Callers may pass ``max_tokens``. A response cut off at that limit
+(``finish_reason == "length"``) is continued with the partial output as context,
+up to ``max_output_continuations`` times, and the pieces are joined; how much of
+its budget each call used is tracked per node (``stats()["budgets"]``). A
+``temperature`` overrides the model's default for that call (best-of-N
+candidates use it to diversify).
+
+Token usage of every call is added to the ``current_usage`` accumulator when one
+is set for the running task (the scheduler uses it for per-tenant budgets).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.agents.budgets import BudgetTracker
+from app.agents.cassette import CassettePlayer, CassetteRecorder, prompt_text
+from app.agents.prompts import CONTINUATION_PROMPT
+from app.core.config import Settings
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Per-run token accumulator ({"input_tokens": n, "output_tokens": n}), if any.
+current_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar("current_usage", default=None)
+
+
+class NodeLatencyTracker:
+    """Rolling window of recent call latencies, kept separately for each node."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, node: str, seconds: float) -> None:
+        self._samples[node].append(seconds)
+
+    def count(self, node: str) -> int:
+        return len(self._samples.get(node, ()))
+
+    def percentile(self, node: str, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of the node's window, or ``None`` without samples."""
+        samples = self._samples.get(node)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {
+            node: {
+                "count": len(samples),
+                "p50": self.percentile(node, 50) or 0.0,
+                "p95": self.percentile(node, 95) or 0.0,
+            }
+            for node, samples in self._samples.items()
+        }
+
+
+def _finish_reason(response: Any) -> Optional[str]:
+    return (getattr(response, "response_metadata", None) or {}).get("finish_reason")
+
+
+def _output_tokens(response: Any) -> int:
+    usage = getattr(response, "usage_metadata", None) or {}
+    # Rough 4-chars-per-token estimate for models that report no usage.
+    return usage.get("output_tokens") or len(str(response.content)) // 4
+
+
+def _join(parts: List[Any]) -> AIMessage:
+    """One message from a response and its continuations."""
+    usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    for part in parts:
+        for key, value in (getattr(part, "usage_metadata", None) or {}).items():
+            if key in usage:
+                usage[key] += value
+    return AIMessage(
+        content="".join(str(part.content) for part in parts),
+        usage_metadata=usage,
+        response_metadata={**(parts[-1].response_metadata or {}), "continuations": len(parts) - 1},
+    )
+
+
+class LLMClient:
+    """Wraps a chat model with per-node latency tracking and opt-in hedging."""
+
+    def __init__(self, llm: BaseChatModel, settings: Settings, namespace: str = ""):
+        self.llm = llm
+        self.settings = settings
+        # Prefix for node names in latency stats and cassettes (e.g. "draft").
+        self.namespace = namespace
+        self.latency = NodeLatencyTracker(window=settings.llm_hedge_window)
+        self.budgets = BudgetTracker(window=settings.llm_hedge_window)
+        self.total_calls = 0
+        self.hedged_calls = 0
+        self.hedge_wins = 0
+        self.recorder: Optional[CassetteRecorder] = None
+        self.player: Optional[CassettePlayer] = None
+        if settings.llm_cassette_mode == "record":
+            self.recorder = CassetteRecorder(settings.llm_cassette_path)
+        elif settings.llm_cassette_mode == "replay":
+            self.player = CassettePlayer(settings.llm_cassette_path, realtime=settings.llm_cassette_realtime)
+
+    def derive(self, llm: BaseChatModel, namespace: str) -> "LLMClient":
+        """A client for another model that shares this client's cassette."""
+        derived = LLMClient.__new__(LLMClient)
+        derived.__dict__.update(self.__dict__)
+        derived.llm = llm
+        derived.namespace = namespace
+        derived.latency = NodeLatencyTracker(window=self.settings.llm_hedge_window)
+        derived.budgets = BudgetTracker(window=self.settings.llm_hedge_window)
+        derived.total_calls = derived.hedged_calls = derived.hedge_wins = 0
+        return derived
+
+    def _hedge_delay(self, node: str) -> Optional[float]:
+        """How long to wait before hedging this call, or ``None`` to not hedge."""
+        if not self.settings.llm_hedging_enabled or self.player is not None:
+            return None
+        if self.latency.count(node) < self.settings.llm_hedge_min_samples:
+            return None
+        if self.hedged_calls + 1 > self.settings.llm_hedge_budget_ratio * self.total_calls:
+            return None
+        return self.latency.percentile(node, self.settings.llm_hedge_percentile)
+
+    async def _timed(
+        self, node: str, prompt: Any, max_tokens: Optional[int] = None, temperature: Optional[float] = None
+    ) -> tuple[Any, float]:
+        with span("llm.call", node=node, model=getattr(self.llm, "model_name", type(self.llm).__name__)) as call_span:
+            started = time.perf_counter()
+            params: Dict[str, Any] = {}
+            if max_tokens:
+                params["max_tokens"] = max_tokens
+            if temperature is not None:
+                params["temperature"] = temperature
+            if self.player is not None:
+                response = await self.player.play(node, prompt)
+            else:
+                response = await self.llm.ainvoke(prompt, **params)
+            elapsed = time.perf_counter() - started
+            tokens = getattr(response, "usage_metadata", None) or {}
+            call_span.set(
+                input_tokens=tokens.get("input_tokens", 0),
+                output_tokens=tokens.get("output_tokens", 0),
+                max_tokens=max_tokens or 0,
+                finish_reason=_finish_reason(response) or "",
+                cassette=self.player is not None,
+            )
+        usage = current_usage.get()
+        if usage is not None:
+            usage["input_tokens"] = usage.get("input_tokens", 0) + tokens.get("input_tokens", 0)
+            usage["output_tokens"] = usage.get("output_tokens", 0) + tokens.get("output_tokens", 0)
+        if self.recorder is not None:
+            self.recorder.record(node, prompt, response, elapsed)
+        return response, elapsed
+
+    async def ainvoke(
+        self, node: str, prompt: Any, max_tokens: Optional[int] = None, temperature: Optional[float] = None
+    ) -> Any:
+        """Invoke the model for ``node``, continuing output cut off at ``max_tokens``."""
+        if self.namespace:
+            node = f"{self.namespace}:{node}"
+        response = await self._hedged(node, prompt, max_tokens, temperature)
+        if not max_tokens:
+            return response
+
+        parts = [response]
+        while True:
+            truncated = _finish_reason(parts[-1]) == "length"
+            self.budgets.record(node, _output_tokens(parts[-1]), max_tokens, truncated)
+            if not truncated or len(parts) > self.settings.max_output_continuations:
+                break
+            self.budgets.continuations[node] += 1
+            logger.info("%s output hit max_tokens=%d; continuing (%d)", node, max_tokens, len(parts))
+            partial = "".join(str(part.content) for part in parts)
+            messages = [HumanMessage(content=prompt_text(prompt)), AIMessage(content=partial), HumanMessage(content=CONTINUATION_PROMPT)]
+            parts.append(await self._hedged(node, messages, max_tokens, temperature))
+        if truncated:
+            logger.warning("%s output still truncated after %d continuations", node, len(parts) - 1)
+        return parts[0] if len(parts) == 1 else _join(parts)
+
+    async def _hedged(
+        self, node: str, prompt: Any, max_tokens: Optional[int], temperature: Optional[float] = None
+    ) -> Any:
+        """One model call, hedged with a duplicate request when it runs slow."""
+        self.total_calls += 1
+        delay = self._hedge_delay(node)
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(self._timed(node, prompt, max_tokens, temperature))
+        if delay is None:
+            response, elapsed = await primary
+            self.latency.record(node, elapsed)
+            return response
+
+        backup: Optional[asyncio.Future] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                response, elapsed = primary.result()
+                self.latency.record(node, elapsed)
+                return response
+
+            self.hedged_calls += 1
+            logger.info("Hedging %s call after %.2fs (p%g)", node, delay, self.settings.llm_hedge_percentile)
+            backup = asyncio.ensure_future(self._timed(node, prompt, max_tokens, temperature))
+            pending = {primary, backup}
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: t.exception() is not None):
+                    if task.exception() is not None and pending:
+                        continue  # the other request may still succeed
+                    response, _ = task.result()
+                    # What the caller waited, from the primary's start: recording only a
+                    # winning backup's own time would drop the slow samples and drag the
+                    # hedge delay down.
+                    self.latency.record(node, time.perf_counter() - started)
+                    if task is backup:
+                        self.hedge_wins += 1
+                    return response
+        finally:
+            for task in (primary, backup):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def close(self) -> None:
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "total_calls": self.total_calls,
+            "hedged_calls": self.hedged_calls,
+            "hedge_wins": self.hedge_wins,
+            "latency": self.latency.snapshot(),
+            "budgets": self.budgets.snapshot(),
+        }
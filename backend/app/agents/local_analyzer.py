@@ -0,0 +1,415 @@
+"""Local, CPU-only content analyzer used before falling back to the LLM analyzer.
+
+``analyze_locally`` fills the same fields as the LLM analyzer from the brief,
+``content_type``, ``duration_seconds`` and ``platform``:
+
+  - language — an explicit request ("in Tamil language", "(in Hindi)"), else the
+    Unicode script of the brief's letters, else stopword overlap for
+    Latin-script languages
+  - region — place names in the brief, else the language's home region
+  - genre / tone — weighted keyword matches (tone defaults from the genre)
+  - audience, visual style — presets per genre and platform
+  - key themes — proper nouns first, then the most frequent content words
+  - platform optimization — aspect ratio, duration and trends per platform
+
+Every inferred field carries a confidence in [0, 1]. ``LocalAnalysis.confidence``
+is the weakest of the fields every later agent leans on (language, genre, tone),
+so the workflow only uses a local result when all of them are reasonably certain.
+Guesses (a tone taken from the genre, English for a brief with no stopwords, a
+trailing "in <language>") score below the default gate.
+
+``AnalysisCache`` keeps finished analyses, local or LLM, keyed by the
+normalised brief.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# ─── Language ───────────────────────────────────────────────
+# (first code point, last code point, language) — non-Latin scripts.
+_SCRIPT_RANGES: Tuple[Tuple[int, int, str], ...] = (
+    (0x0900, 0x097F, "Hindi"),
+    (0x0980, 0x09FF, "Bengali"),
+    (0x0A00, 0x0A7F, "Punjabi"),
+    (0x0A80, 0x0AFF, "Gujarati"),
+    (0x0B80, 0x0BFF, "Tamil"),
+    (0x0C00, 0x0C7F, "Telugu"),
+    (0x0C80, 0x0CFF, "Kannada"),
+    (0x0D00, 0x0D7F, "Malayalam"),
+    (0x0600, 0x06FF, "Arabic"),
+    (0x0590, 0x05FF, "Hebrew"),
+    (0x0400, 0x04FF, "Russian"),
+    (0x0370, 0x03FF, "Greek"),
+    (0x0E00, 0x0E7F, "Thai"),
+    (0x3040, 0x30FF, "Japanese"),
+    (0xAC00, 0xD7AF, "Korean"),
+    (0x4E00, 0x9FFF, "Chinese"),
+)
+
+# Scripts shared by several languages: the runner-up is disambiguated by stopwords.
+_SCRIPT_ALTERNATIVES = {"Arabic": ("Urdu", {"ہے", "کی", "میں", "اور", "کے", "کا"})}
+
+_STOPWORDS: Dict[str, set] = {
+    "English": {
+        "the", "and", "of", "to", "in", "for", "with", "a", "an", "is", "are", "on", "at", "my", "how", "why",
+        "what", "do", "does", "your", "you", "we", "it", "about", "this", "that", "from", "new", "best",
+    },
+    "Spanish": {"el", "la", "de", "que", "y", "en", "los", "las", "para", "con", "una", "por", "del", "mi"},
+    "French": {"le", "la", "les", "de", "et", "des", "une", "pour", "dans", "avec", "sur", "du", "est", "mon"},
+    "German": {"der", "die", "das", "und", "ist", "mit", "für", "ein", "eine", "den", "von", "auf", "zu", "mein"},
+    "Portuguese": {"o", "os", "de", "que", "e", "em", "para", "com", "uma", "um", "do", "da", "no", "na", "meu"},
+    "Italian": {"il", "di", "che", "e", "per", "con", "una", "del", "della", "nel", "gli", "mio", "sono"},
+    "Indonesian": {"yang", "dan", "di", "ke", "untuk", "dengan", "ini", "itu", "dari", "saya", "kita"},
+    "Hinglish": {"hai", "hain", "ka", "ki", "ke", "mein", "aur", "kya", "nahi", "ko", "se", "bhi", "yeh", "apna"},
+}
+
+# Language names recognised in requests such as "a reel in Tamil language".
+_LANGUAGE_NAMES = {
+    name.lower(): name
+    for name in (
+        "English", "Hindi", "Bengali", "Punjabi", "Gujarati", "Marathi", "Tamil", "Telugu", "Kannada",
+        "Malayalam", "Urdu", "Arabic", "Hebrew", "Russian", "Greek", "Thai", "Japanese", "Korean",
+        "Chinese", "Mandarin", "Spanish", "French", "German", "Portuguese", "Italian", "Indonesian", "Hinglish",
+    )
+}
+_LANGUAGE_ALTERNATION = "|".join(_LANGUAGE_NAMES)
+# Explicit requests: "in Tamil language", "(in Hindi)", "language: Spanish", "write it in Tamil:".
+# A bare "in Italian" inside a sentence is often a style ("pasta in Italian style").
+_LANGUAGE_REQUEST = re.compile(
+    rf"\b(?:in|into)\s+({_LANGUAGE_ALTERNATION})\s+(?:language|lang)\b"
+    rf"|\(\s*(?:in\s+)?({_LANGUAGE_ALTERNATION})\s*\)"
+    rf"|\blanguage\s*[:=-]?\s*({_LANGUAGE_ALTERNATION})\b"
+    rf"|\b(?:write|narrate|voice|voiceover|dub|translate)\b[^.!?]*?\b(?:in|into)\s+({_LANGUAGE_ALTERNATION})\b"
+    r"(?!\s+(?:style|food|cuisine|dish|dishes|recipes?|cooking|music|songs?|films?|movies?|fashion|culture|way)\b)",
+    re.IGNORECASE,
+)
+# "... in Italian" at the end of a clause: likely a language request, but left to the LLM.
+_TRAILING_LANGUAGE = re.compile(rf"\b(?:in|into)\s+({_LANGUAGE_ALTERNATION})\s*(?:[.!?,;:]|$)", re.IGNORECASE)
+
+# Confidence of a fallback guess; below the default gate, so the LLM decides.
+_GUESS_CONFIDENCE = 0.45
+
+_LANGUAGE_REGION = {
+    "English": "Global", "Hindi": "India", "Hinglish": "India", "Bengali": "India", "Punjabi": "India",
+    "Gujarati": "India", "Marathi": "India", "Tamil": "India", "Telugu": "India", "Kannada": "India",
+    "Malayalam": "India", "Urdu": "Pakistan", "Arabic": "Middle East", "Hebrew": "Israel",
+    "Russian": "Russia", "Greek": "Greece", "Thai": "Thailand", "Japanese": "Japan", "Korean": "South Korea",
+    "Chinese": "China", "Mandarin": "China", "Spanish": "Latin America & Spain", "French": "France",
+    "German": "Germany", "Portuguese": "Brazil & Portugal", "Italian": "Italy", "Indonesian": "Indonesia",
+}
+
+# Place names (lower case) → region.
+_PLACES = {
+    **dict.fromkeys(
+        ("india", "jaipur", "mumbai", "delhi", "bangalore", "bengaluru", "kolkata", "chennai", "hyderabad",
+         "goa", "kerala", "rajasthan", "varanasi", "udaipur", "ladakh", "manali", "pune", "agra", "punjab"),
+        "India",
+    ),
+    **dict.fromkeys(("usa", "america", "new york", "california", "los angeles", "texas", "chicago"), "United States"),
+    **dict.fromkeys(("uk", "london", "england", "scotland", "manchester"), "United Kingdom"),
+    **dict.fromkeys(("japan", "tokyo", "kyoto", "osaka"), "Japan"),
+    **dict.fromkeys(("paris", "france"), "France"),
+    **dict.fromkeys(("dubai", "abu dhabi", "uae"), "Middle East"),
+    **dict.fromkeys(("bali", "jakarta", "indonesia"), "Indonesia"),
+    **dict.fromkeys(("mexico", "spain", "madrid", "barcelona", "argentina"), "Latin America & Spain"),
+}
+
+
+def _letters_by_language(text: str) -> Counter:
+    counts: Counter = Counter()
+    for char in text:
+        if not char.isalpha():
+            continue
+        code = ord(char)
+        if code < 0x0250:
+            counts["Latin"] += 1
+            continue
+        for first, last, language in _SCRIPT_RANGES:
+            if first <= code <= last:
+                counts[language] += 1
+                break
+    return counts
+
+
+def detect_language(text: str) -> Tuple[str, float]:
+    """Language to write the script in, with a confidence."""
+    requested = _LANGUAGE_REQUEST.search(text)
+    if requested:
+        name = next(group for group in requested.groups() if group)
+        return _LANGUAGE_NAMES[name.lower()], 0.95
+    trailing = _TRAILING_LANGUAGE.search(text)
+    if trailing:
+        return _LANGUAGE_NAMES[trailing.group(1).lower()], _GUESS_CONFIDENCE
+
+    letters = _letters_by_language(text)
+    total = sum(letters.values())
+    if not total:
+        return "English", 0.3
+    script, count = letters.most_common(1)[0]
+    words = set(re.findall(r"\w+", text.lower()))
+    if script != "Latin":
+        # Kana alongside Han means Japanese, not Chinese.
+        if script == "Chinese" and letters.get("Japanese"):
+            script = "Japanese"
+        alternative = _SCRIPT_ALTERNATIVES.get(script)
+        if alternative and words & alternative[1]:
+            script = alternative[0]
+        return script, round(0.6 + 0.35 * count / total, 3)
+
+    hits = {language: len(words & stopwords) for language, stopwords in _STOPWORDS.items()}
+    ranked = sorted(hits.items(), key=lambda item: -item[1])
+    (best, best_hits), (_, runner_up) = ranked[0], ranked[1]
+    if best_hits == 0:
+        # Short Latin-script briefs ("monsoon reel, Jaipur") are usually English.
+        return "English", _GUESS_CONFIDENCE
+    margin = (best_hits - runner_up) / best_hits
+    return best, round(min(0.95, 0.5 + 0.1 * best_hits + 0.3 * margin), 3)
+
+
+def detect_region(text: str, language: str) -> Tuple[str, float]:
+    lowered = text.lower()
+    found = Counter(region for place, region in _PLACES.items() if re.search(rf"\b{re.escape(place)}\b", lowered))
+    if found:
+        return found.most_common(1)[0][0], 0.85
+    region = _LANGUAGE_REGION.get(language, "Global")
+    return region, 0.5 if region == "Global" else 0.7
+
+
+# ─── Genre and tone ─────────────────────────────────────────
+# Keyword → weight per genre; multi-word keys match as phrases.
+_GENRE_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "tutorial": {"how to": 2, "tutorial": 2, "step by step": 2, "recipe": 2, "diy": 2, "guide": 1, "setup": 1, "tips": 1, "hack": 1},
+    "educational": {"explain": 2, "explained": 2, "why": 1, "facts": 2, "learn": 2, "science": 2, "history of": 2, "lesson": 2, "basics": 1, "what is": 1},
+    "comedy": {"funny": 2, "comedy": 2, "prank": 2, "meme": 2, "joke": 2, "sketch": 1, "parody": 2, "hilarious": 2, "roast": 1},
+    "motivational": {"motivation": 2, "motivational": 2, "inspire": 2, "inspiring": 2, "discipline": 2, "success": 1, "mindset": 2, "grind": 1, "never give up": 2, "journey": 1},
+    "cinematic": {"cinematic": 2, "aerial": 1, "drone": 1, "monsoon": 1, "sunset": 1, "sunrise": 1, "golden hour": 2, "slow motion": 1, "timelapse": 1, "landscape": 1, "travel": 1},
+    "documentary": {"documentary": 2, "behind the scenes": 2, "story of": 2, "untold": 2, "investigation": 2, "history": 1, "interview": 1, "real life": 1},
+    "drama": {"drama": 2, "short film": 2, "love story": 2, "heartbreak": 2, "betrayal": 2, "family": 1, "emotional": 1},
+    "entertainment": {"challenge": 2, "vlog": 2, "day in my life": 2, "reaction": 2, "trend": 1, "trending": 1, "unboxing": 2, "review": 1},
+}
+
+_TONE_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "humorous": {"funny": 2, "hilarious": 2, "comedy": 1, "silly": 2, "meme": 1, "lol": 2},
+    "inspirational": {"inspire": 2, "inspiring": 2, "motivation": 1, "uplifting": 2, "hope": 1, "dream": 1},
+    "dramatic": {"dramatic": 2, "epic": 2, "intense": 2, "cinematic": 1, "emotional": 1, "dark": 1},
+    "professional": {"professional": 2, "corporate": 2, "b2b": 2, "formal": 2, "expert": 1, "business": 1},
+    "calm": {"calm": 2, "peaceful": 2, "relaxing": 2, "asmr": 2, "cozy": 2, "slow living": 2, "soothing": 2},
+    "casual": {"casual": 2, "chill": 2, "vlog": 1, "day in my life": 1, "friends": 1},
+}
+
+_GENRE_DEFAULT_TONE = {
+    "tutorial": "casual", "educational": "professional", "comedy": "humorous", "motivational": "inspirational",
+    "cinematic": "dramatic", "documentary": "professional", "drama": "dramatic", "entertainment": "casual",
+}
+
+_GENRE_VISUAL_STYLE = {
+    "tutorial": "clean top-down and close-up demonstration shots",
+    "educational": "minimalist with on-screen text and simple graphics",
+    "comedy": "raw handheld with quick cuts and reaction close-ups",
+    "motivational": "high-contrast cinematic b-roll with bold text",
+    "cinematic": "cinematic wide shots with slow camera moves",
+    "documentary": "observational footage with interviews and archival inserts",
+    "drama": "moody, shallow depth-of-field close-ups",
+    "entertainment": "vlog-style handheld with jump cuts",
+}
+
+_GENRE_AUDIENCE = {
+    "tutorial": "learners and hobbyists looking for practical how-tos",
+    "educational": "curious viewers who like to learn something new",
+    "comedy": "viewers looking for light, shareable entertainment",
+    "motivational": "self-improvement seekers and young professionals",
+    "cinematic": "visual storytelling and travel enthusiasts",
+    "documentary": "viewers interested in real stories and deeper context",
+    "drama": "fans of character-driven short stories",
+    "entertainment": "general audiences following creators and trends",
+}
+
+
+def _keyword_scores(text: str, keywords: Mapping[str, Mapping[str, float]]) -> Dict[str, float]:
+    lowered = text.lower()
+    return {
+        label: sum(weight for word, weight in words.items() if re.search(rf"\b{re.escape(word)}\b", lowered))
+        for label, words in keywords.items()
+    }
+
+
+def _best(scores: Dict[str, float]) -> Tuple[Optional[str], float]:
+    """Top label and a confidence from its score and its margin over the runner-up."""
+    ranked = sorted(scores.items(), key=lambda item: -item[1])
+    (label, top), (_, second) = ranked[0], ranked[1]
+    if top <= 0:
+        return None, 0.0
+    margin = (top - second) / top
+    return label, round(min(0.95, 0.45 + 0.1 * top + 0.3 * margin), 3)
+
+
+def classify_genre(text: str, content_type: str) -> Tuple[str, float]:
+    genre, confidence = _best(_keyword_scores(f"{text} {content_type}", _GENRE_KEYWORDS))
+    if genre is None:
+        return "entertainment", 0.3
+    return genre, confidence
+
+
+def classify_tone(text: str, genre: str) -> Tuple[str, float]:
+    tone, confidence = _best(_keyword_scores(text, _TONE_KEYWORDS))
+    if tone is None:
+        return _GENRE_DEFAULT_TONE.get(genre, "casual"), _GUESS_CONFIDENCE
+    return tone, confidence
+
+
+# ─── Themes ─────────────────────────────────────────────────
+_THEME_STOPWORDS = set().union(*_STOPWORDS.values()) | {
+    "make", "create", "video", "reel", "reels", "short", "shorts", "about", "want", "need", "content", "post",
+    "style", "seconds", "minute", "minutes", "film", "youtube", "instagram", "tiktok", "from", "that", "into",
+    "some", "like", "best", "very", "more", "should", "will", "would", "could", "their", "them", "what", "when",
+}
+
+
+def extract_themes(text: str, limit: int = 5) -> List[str]:
+    """Proper nouns in order of appearance, then the most frequent content words."""
+    themes: List[str] = []
+    for word in re.findall(r"\b[A-Z][\w'-]+", text):
+        if word.lower() not in _THEME_STOPWORDS and word not in themes:
+            themes.append(word)
+    words = [w for w in re.findall(r"[^\W\d_]{4,}", text.lower()) if w not in _THEME_STOPWORDS]
+    for word, _ in Counter(words).most_common():
+        if len(themes) >= limit:
+            break
+        if word not in {t.lower() for t in themes}:
+            themes.append(word)
+    return themes[:limit]
+
+
+# ─── Platform presets ───────────────────────────────────────
+PLATFORM_PRESETS: Dict[str, Dict[str, Any]] = {
+    "instagram": {"aspect_ratio": "9:16", "ideal_duration": 30, "trending_elements": ["trending audio", "quick cuts", "text hooks"]},
+    "tiktok": {"aspect_ratio": "9:16", "ideal_duration": 30, "trending_elements": ["trending sounds", "fast pacing", "on-screen captions"]},
+    "youtube_shorts": {"aspect_ratio": "9:16", "ideal_duration": 45, "trending_elements": ["loopable ending", "fast hook", "captions"]},
+    "youtube": {"aspect_ratio": "16:9", "ideal_duration": 600, "trending_elements": ["strong thumbnail", "chapters", "pattern interrupts"]},
+    "linkedin": {"aspect_ratio": "1:1", "ideal_duration": 60, "trending_elements": ["subtitles", "professional insight", "clear takeaway"]},
+    "facebook": {"aspect_ratio": "4:5", "ideal_duration": 60, "trending_elements": ["subtitles", "emotional hook", "shareable moments"]},
+    "x": {"aspect_ratio": "16:9", "ideal_duration": 45, "trending_elements": ["subtitles", "punchy opening", "timely topic"]},
+}
+_SHORT_FORMATS = {"reel", "short", "story", "tiktok"}
+
+
+def platform_optimization(platform: str, content_type: str, duration_seconds: int) -> Tuple[Dict[str, Any], float]:
+    key = platform.lower().replace(" ", "_")
+    if key == "youtube" and content_type.lower() in _SHORT_FORMATS:
+        key = "youtube_shorts"
+    preset = PLATFORM_PRESETS.get(key)
+    if preset is None:
+        vertical = content_type.lower() in _SHORT_FORMATS
+        preset = {"aspect_ratio": "9:16" if vertical else "16:9", "ideal_duration": duration_seconds, "trending_elements": []}
+        return {**preset, "ideal_duration": duration_seconds}, 0.5
+    return {**preset, "ideal_duration": duration_seconds, "trending_elements": list(preset["trending_elements"])}, 0.9
+
+
+# ─── Analysis ───────────────────────────────────────────────
+@dataclass
+class LocalAnalysis:
+    analysis: Dict[str, Any]
+    field_confidence: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def confidence(self) -> float:
+        return min(self.field_confidence.get(name, 0.0) for name in ("language", "genre", "tone"))
+
+
+def analyze_locally(prompt: str, content_type: str, duration_seconds: int, platform: str) -> LocalAnalysis:
+    """Fill the analyzer's fields from the brief without calling a model."""
+    language, language_conf = detect_language(prompt)
+    region, region_conf = detect_region(prompt, language)
+    genre, genre_conf = classify_genre(prompt, content_type)
+    tone, tone_conf = classify_tone(prompt, genre)
+    optimization, platform_conf = platform_optimization(platform, content_type, duration_seconds)
+    return LocalAnalysis(
+        analysis={
+            "language": language,
+            "region": region,
+            "genre": genre,
+            "tone": tone,
+            "target_audience": _GENRE_AUDIENCE[genre],
+            "visual_style": _GENRE_VISUAL_STYLE[genre],
+            "key_themes": extract_themes(prompt),
+            "platform_optimization": optimization,
+        },
+        field_confidence={
+            "language": language_conf,
+            "region": region_conf,
+            "genre": genre_conf,
+            "tone": tone_conf,
+            "platform_optimization": platform_conf,
+        },
+    )
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case-, width- and whitespace-insensitive form of a brief, for cache keys."""
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    return " ".join(text.split()).strip(" .!?")
+
+
+def brief_key(state: Mapping[str, Any]) -> Tuple[str, str, str, int]:
+    """(normalised prompt, content type, platform, duration) of a run's brief."""
+    return (
+        normalize_prompt(str(state.get("prompt", ""))),
+        str(state.get("content_type", "")).lower(),
+        str(state.get("platform", "")).lower(),
+        int(state.get("duration_seconds", 30)),
+    )
+
+
+class AnalysisCache:
+    """Thread-safe LRU of analyses keyed by the normalised brief and its format.
+
+    The key includes content type, platform and duration because the platform
+    optimization block depends on them.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, str, int], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.sources: Counter = Counter()
+
+    key = staticmethod(brief_key)
+
+    def get(self, state: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        key = self.key(state)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.sources["cache"] += 1
+            return dict(cached)
+
+    def put(self, state: Mapping[str, Any], analysis: Dict[str, Any], source: str) -> None:
+        with self._lock:
+            self.sources[source] += 1
+            if self.max_entries <= 0:
+                return
+            self._entries[self.key(state)] = dict(analysis)
+            self._entries.move_to_end(self.key(state))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "sources": dict(self.sources),
+            }
@@ -1,16 +1,61 @@
-"""Prompt templates for the bb /create multi-agent content production pipeline."""
+"""Prompt templates for the bb /create multi-agent content production pipeline.
+
+Every agent prompt is assembled by ``render_prompt`` in three layers so that calls
+within a run share the longest possible prefix (for provider-side prefix/KV caching):
+
+  1. ``SYSTEM_PREAMBLE``  — static instructions, identical for every agent and run
+  2. ``shared_context``   — the per-run block (brief + analysis), byte-identical
+                            for every agent in the run
+  3. the agent template   — static task instructions first, then the per-call
+                            material (script, timeline, critique, ...) last
+
+``PromptPrefixMeter`` measures how much of each run's prompts is actually shared.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping
 
 # ─────────────────────────────────────────────────────────────
-# Agent 1: Content Analyzer
+# Layer 1: static preamble shared by every agent
 # ─────────────────────────────────────────────────────────────
-ANALYZER_PROMPT = """You are the Content Analyzer Agent in a multi-agent content production system.
+SYSTEM_PREAMBLE = """You are one of the specialist agents in bb /create, a multi-agent content production pipeline that turns a creator's brief into a production-ready blueprint (analysis, script, shot timeline, enhancements, story structure and quality review).
 
-User's creative brief:
+Ground rules for every agent:
+- Work only from the brief, the content analysis and the material you are given.
+- Write dialogue, voiceover and on-screen text in the target language from the analysis; add English translations in parentheses when it is not English.
+- Keep everything shootable by a solo creator and sized to the target duration and platform.
+- When asked for JSON, return ONLY valid JSON — no markdown fences, no commentary.
+
+"""
+
+# ─────────────────────────────────────────────────────────────
+# Layer 2: shared per-run context
+# ─────────────────────────────────────────────────────────────
+BRIEF_CONTEXT = """## Creative brief
 {prompt}
 
 Content type: {content_type}
 Target duration: {duration_seconds} seconds
 Platform: {platform}
+"""
+
+ANALYSIS_CONTEXT = """
+## Content analysis
+{analysis}
+"""
+
+# ─────────────────────────────────────────────────────────────
+# Layer 3: agent templates (static instructions, then per-call material)
+# ─────────────────────────────────────────────────────────────
+
+# Agent 1: Content Analyzer
+ANALYZER_PROMPT = """## Your task
+You are the Content Analyzer Agent.
 
 Analyze the brief and produce a structured analysis. Determine:
 1. **Language** — What language to produce the script in (detect from prompt or default to English)
@@ -39,53 +84,33 @@ Return ONLY valid JSON:
 }}
 """
 
-# ─────────────────────────────────────────────────────────────
 # Agent 2: Script Writer
-# ─────────────────────────────────────────────────────────────
-SCRIPT_WRITER_PROMPT = """You are the Script Writer Agent. Generate a production-ready script.
-
-Creative brief: {prompt}
-Content type: {content_type}
-Duration: {duration_seconds} seconds
-Platform: {platform}
-
-Content analysis:
-{analysis}
+SCRIPT_WRITER_PROMPT = """## Your task
+You are the Script Writer Agent. Generate a production-ready script.
 
 Write a complete script that includes:
 1. **Opening hook** (first 3 seconds — grab attention)
 2. **Visual directions** — [VISUAL: description] for each shot
-3. **Dialogue / Voiceover** — exact text in the target language: {language}
+3. **Dialogue / Voiceover** — exact text in the target language
 4. **Sound cues** — [SFX: description] and [MUSIC: description]
 5. **Text overlays** — [TEXT: what appears on screen]
-6. **Closing CTA** — call to action appropriate for {platform}
+6. **Closing CTA** — call to action appropriate for the platform
 
 Format guidelines:
-- Use the target language ({language}) for all dialogue and voiceover
-- Include English translations in parentheses if not English
 - Be specific about camera angles: wide, close-up, tracking, aerial, etc.
 - Time-code approximate each section
-- Keep total script aligned to {duration_seconds} seconds
+- Keep the total script aligned to the target duration
+
+Target language: {language}
 
 Return the full script as formatted text.
 """
 
-# ─────────────────────────────────────────────────────────────
 # Agent 3: Timeline Planner
-# ─────────────────────────────────────────────────────────────
-TIMELINE_PLANNER_PROMPT = """You are the Timeline Planner Agent. Create a shot-by-shot production timeline.
-
-Creative brief: {prompt}
-Duration: {duration_seconds} seconds
-Platform: {platform}
-
-Script:
-{script}
+TIMELINE_PLANNER_PROMPT = """## Your task
+You are the Timeline Planner Agent. Create a shot-by-shot production timeline.
 
-Content analysis:
-{analysis}
-
-Break down the script into a precise shot-by-shot timeline. For each shot, specify:
+Break down the script into a precise shot-by-shot timeline covering the full target duration. For each shot, specify:
 1. **timestamp** — start and end time (e.g., "00:00 - 00:03")
 2. **shot_type** — wide, medium, close-up, aerial, tracking, POV, etc.
 3. **visual** — exactly what is on screen
@@ -106,26 +131,14 @@ Return ONLY a valid JSON array:
     "notes": "Shoot at Amer Fort, golden hour"
   }}
 ]
-"""
-
-# ─────────────────────────────────────────────────────────────
-# Agent 4: Enhancement Agent
-# ─────────────────────────────────────────────────────────────
-ENHANCEMENT_PROMPT = """You are the Enhancement Agent. Suggest improvements to maximize content impact.
 
-Creative brief: {prompt}
-Content type: {content_type}
-Platform: {platform}
-Duration: {duration_seconds} seconds
-
-Script:
+## Script
 {script}
+{revision_notes}"""
 
-Timeline:
-{timeline}
-
-Analysis:
-{analysis}
+# Agent 4: Enhancement Agent
+ENHANCEMENT_PROMPT = """## Your task
+You are the Enhancement Agent. Suggest improvements to maximize content impact.
 
 Provide detailed enhancement suggestions:
 
@@ -133,7 +146,7 @@ Provide detailed enhancement suggestions:
 2. **music_suggestions** — 5 specific royalty-free music recommendations with mood/genre (use real track names or describe the vibe precisely)
 3. **color_grading** — specific color palette and grading style (e.g., "warm orange teal, lifted blacks, desaturated greens")
 4. **transitions** — creative transition ideas beyond basic cuts
-5. **hashtags** — 15-20 relevant hashtags for {platform}
+5. **hashtags** — 15-20 relevant hashtags for the platform
 6. **caption** — 3 caption options (short, medium, story-style)
 7. **posting_strategy** — best time to post, frequency, A/B test ideas
 8. **thumbnail_ideas** — 3 thumbnail concepts with text overlay suggestions
@@ -153,22 +166,17 @@ Return ONLY valid JSON:
   "accessibility": {{...}},
   "viral_elements": ["..."]
 }}
-"""
-
-# ─────────────────────────────────────────────────────────────
-# Agent 5: Story Architect
-# ─────────────────────────────────────────────────────────────
-STORY_ARCHITECT_PROMPT = """You are the Story Architect Agent. Structure the narrative for maximum emotional impact.
-
-Creative brief: {prompt}
-Content type: {content_type}
-Duration: {duration_seconds} seconds
 
-Script:
+## Script
 {script}
 
-Analysis:
-{analysis}
+## Timeline
+{timeline}
+{revision_notes}"""
+
+# Agent 5: Story Architect
+STORY_ARCHITECT_PROMPT = """## Your task
+You are the Story Architect Agent. Structure the narrative for maximum emotional impact.
 
 Design the narrative architecture:
 
@@ -192,54 +200,216 @@ Return ONLY valid JSON:
   "rewatch_hooks": ["..."],
   "series_potential": "..."
 }}
-"""
 
-# ─────────────────────────────────────────────────────────────
+## Script
+{script}
+{revision_notes}"""
+
+# Agent 4 (short-form): compact brief for reels/shorts — fewer items, no
+# posting-strategy / thumbnail / accessibility / virality blocks.
+ENHANCEMENT_PROMPT_SHORT = """## Your task
+You are the Enhancement Agent. Suggest the few improvements that matter most for a short-form piece.
+
+Keep every item brief:
+1. **hooks** — 2 alternative opening hooks, strongest first
+2. **music_suggestions** — 3 royalty-free tracks or precisely described vibes
+3. **color_grading** — one line describing palette and grade
+4. **transitions** — 2-3 transition ideas
+5. **hashtags** — 8-10 relevant hashtags for the platform
+6. **captions** — 2 caption options (short, story-style)
+
+Return ONLY valid JSON:
+{{
+  "hooks": ["hook 1", "hook 2"],
+  "music_suggestions": [{{"name": "...", "mood": "...", "source": "..."}}],
+  "color_grading": "...",
+  "transitions": ["..."],
+  "hashtags": ["..."],
+  "captions": [{{"style": "short", "text": "..."}}]
+}}
+
+## Script
+{script}
+
+## Timeline
+{timeline}
+{revision_notes}"""
+
 # Critic & Refiner (quality loop)
-# ─────────────────────────────────────────────────────────────
-CRITIC_PROMPT = """You are the Quality Critic for a content production pipeline.
+CRITIC_PROMPT = """## Your task
+You are the Quality Critic for a content production pipeline.
 
 Evaluate the complete production blueprint on:
 - **Hook strength** (0-10): Will the first 3 seconds stop the scroll?
 - **Script quality** (0-10): Is the script engaging, clear, and well-paced?
 - **Production feasibility** (0-10): Can a solo creator actually shoot this?
-- **Platform fit** (0-10): Is this optimized for {platform}?
+- **Platform fit** (0-10): Is this optimized for the platform?
 - **Emotional impact** (0-10): Does this make viewers feel something?
 
-Creative brief: {prompt}
-Content type: {content_type}
-Platform: {platform}
+Also score each section of the script separately (1-10):
+- **hook** — the opening 3 seconds
+- **dialogue** — dialogue / voiceover lines
+- **visual_cues** — [VISUAL: ...] directions and camera work
+- **sound_cues** — [SFX: ...] and [MUSIC: ...] cues
+- **text_overlays** — [TEXT: ...] on-screen text
+- **cta** — the closing call to action
 
-Script:
+Return ONLY valid JSON:
+{{
+  "score": 8,
+  "section_scores": {{"hook": 8, "dialogue": 7, "visual_cues": 8, "sound_cues": 7, "text_overlays": 6, "cta": 5}},
+  "section_feedback": {{"cta": "Specific fix for this section.", "text_overlays": "..."}},
+  "critique": "Specific actionable feedback with bullet points for improvement."
+}}
+
+## Script
 {script}
 
-Timeline:
+## Timeline
 {timeline}
 
-Enhancements:
+## Enhancements
 {enhancements}
+{revision_notes}"""
+
+REFINER_PROMPT = """## Your task
+You are the Script Refiner Agent.
+Fix ONLY the weak sections of the script listed below. Everything else must stay exactly as it is.
+
+Do NOT rewrite the script. Return targeted edits: each "find" must be an exact,
+verbatim excerpt of the current script (as short as possible while unique), and
+"replace" is the improved text for that excerpt.
 
 Return ONLY valid JSON:
 {{
-  "score": 8,
-  "critique": "Specific actionable feedback with bullet points for improvement."
+  "edits": [
+    {{"section": "cta", "find": "exact text from the current script", "replace": "improved text"}}
+  ]
 }}
+
+## Current script
+{script}
+
+## Weak sections and critic feedback
+{weak_sections}
+
+## Overall critique
+{critique}
 """
 
-REFINER_PROMPT = """You are the Script Refiner Agent.
-Improve the script based on the critic's feedback. Keep what works, fix what doesn't.
 
-Creative brief: {prompt}
-Platform: {platform}
+# Best-of-N: appended to the script writer prompt so each candidate takes its
+# own angle (the shared prefix stays identical across candidates).
+SCRIPT_CANDIDATE_ANGLES = (
+    "play it straight: the clearest, most faithful take on the brief.",
+    "lead with the most surprising or emotional hook you can find in the brief.",
+    "take a bolder creative angle — an unexpected structure, point of view or format.",
+    "optimise hard for the platform: pacing, on-screen text and a strong CTA.",
+)
 
-Current script:
-{script}
+SCRIPT_CANDIDATE_NOTE = """
+This is candidate {index} of {total}. For this candidate, {angle}
+"""
 
-Critic feedback:
-{critique}
+# Best-of-N: one batched critic call that ranks every candidate script.
+SCRIPT_RANKER_PROMPT = """## Your task
+You are the Script Ranker Agent, the Quality Critic for competing script candidates.
 
-Analysis:
-{analysis}
+Score every candidate script (1-10) on hook strength, script quality, production
+feasibility, platform fit and emotional impact, and score each of its sections
+(hook, dialogue, visual_cues, sound_cues, text_overlays, cta) separately.
+Judge each candidate on its own merits; then pick the single best one.
 
-Rewrite the entire improved script. Return the full refined script text only.
+Return ONLY valid JSON:
+{{
+  "rankings": [
+    {{"candidate": 1, "score": 8, "section_scores": {{"hook": 8, "dialogue": 7, "visual_cues": 8, "sound_cues": 7, "text_overlays": 6, "cta": 5}}, "critique": "Specific strengths and weaknesses."}}
+  ],
+  "winner": 1
+}}
+
+{candidates}
 """
+
+# Sent after a response was cut off at max_tokens, with the partial output as context.
+CONTINUATION_PROMPT = (
+    "Your previous reply was cut off by the length limit. Continue exactly where it stopped: "
+    "output only the remaining text, without repeating anything or adding commentary."
+)
+
+
+# ─────────────────────────────────────────────────────────────
+# Assembly
+# ─────────────────────────────────────────────────────────────
+def shared_context(state: Mapping[str, Any]) -> str:
+    """The per-run context block: the brief, plus the analysis once it exists.
+
+    Deterministic for a given state so every agent in a run sends identical bytes.
+    """
+    block = BRIEF_CONTEXT.format(
+        prompt=state["prompt"],
+        content_type=state["content_type"],
+        duration_seconds=state["duration_seconds"],
+        platform=state["platform"],
+    )
+    analysis = state.get("analysis")
+    if analysis:
+        block += ANALYSIS_CONTEXT.format(analysis=json.dumps(analysis, indent=2, ensure_ascii=False))
+    return block
+
+
+def render_prompt(template: str, context: str, **values: Any) -> str:
+    """Assemble preamble + shared run context + agent-specific template."""
+    return f"{SYSTEM_PREAMBLE}{context}\n{template.format(**values)}"
+
+
+class PromptPrefixMeter:
+    """Tracks, per run, how much of each prompt repeats an earlier prompt's prefix.
+
+    ``report(run_id)`` returns the prefix common to every prompt in the run, and
+    the characters each call could reuse from the longest matching earlier prompt
+    (what a prefix/KV cache could skip re-processing).
+
+    A run's prompts are kept until ``discard``; runs that never get there (a
+    failed or abandoned run) are dropped after ``max_age_seconds`` without a call.
+    """
+
+    def __init__(self, max_age_seconds: float = 3600.0, max_chars: int = 32_000):
+        self.max_age_seconds = max_age_seconds
+        # Prefixes are all that is compared, so long prompts are stored truncated.
+        self.max_chars = max_chars
+        self._runs: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._last_seen: Dict[str, float] = {}
+
+    def observe(self, run_id: str, prompt: str) -> None:
+        now = time.monotonic()
+        prompts = self._runs.setdefault(run_id, [])
+        self._runs.move_to_end(run_id)
+        self._last_seen[run_id] = now
+        prompts.append(prompt[: self.max_chars])
+        # Least recently observed first, so only stale runs are at the front.
+        while self._runs:
+            oldest = next(iter(self._runs))
+            if now - self._last_seen[oldest] <= self.max_age_seconds:
+                break
+            self.discard(oldest)
+
+    def report(self, run_id: str) -> Dict[str, Any]:
+        prompts = self._runs.get(run_id, [])
+        total = sum(len(p) for p in prompts)
+        reusable = sum(
+            max(len(os.path.commonprefix([prompt, earlier])) for earlier in prompts[:i])
+            for i, prompt in enumerate(prompts)
+            if i
+        )
+        return {
+            "calls": len(prompts),
+            "prompt_chars": total,
+            "common_prefix_chars": len(os.path.commonprefix(prompts)) if prompts else 0,
+            "reusable_prefix_chars": reusable,
+            "reuse_ratio": round(reusable / total, 3) if total else 0.0,
+        }
+
+    def discard(self, run_id: str) -> None:
+        self._runs.pop(run_id, None)
+        self._last_seen.pop(run_id, None)
@@ -0,0 +1,191 @@
+"""Rule-based quality gate run before the LLM critic.
+
+``evaluate_gate`` checks what can be measured without a model:
+
+  - the timeline is not empty (e.g. after a JSON parse fallback)
+  - timeline timestamps cover ``duration_seconds`` without a large overrun
+  - the script ends with a call to action
+  - the spoken script fits the duration (words per second)
+  - enough hashtags were suggested (when the enhancer ran)
+
+A decisive failure sends the run straight to the refiner with a machine-written
+critique, saving the critic call. A pass with margin can skip the critic too
+when ``gate_skip_critic_on_pass`` is set. Anything else goes to the LLM critic.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Literal, Mapping, Optional
+
+from app.core.config import Settings
+
+_TIMECODE = re.compile(r"(\d{1,2}):(\d{2})(?::(\d{2}))?")
+_CUE = re.compile(r"\[[^\]]*\]")
+_PAREN = re.compile(r"\([^)]*\)")
+_LABEL = re.compile(r"^\s*[A-Z][A-Z /_-]{1,20}:\s*", re.MULTILINE)
+# Imperative phrasings that close a piece; whole words only ("shop" but not "shopkeeper").
+_CTA = re.compile(
+    r"\b(?:cta|call to action|follow|subscribe|comments?|share|save (?:this|it)|like|tap|click|join|visit|dm"
+    r"|sign up|book now|shop|tag|drop|let (?:me|us) know|tell (?:me|us)|link in (?:the )?bio|check out"
+    r"|download|try (?:this|it)|hit (?:the|that)|turn on|don'?t forget|send (?:this|it)|repost|stitch|duet"
+    r"|grab|register|swipe|watch (?:part|till|until|the full))\b",
+    re.IGNORECASE,
+)
+
+Verdict = Literal["fail", "pass", "uncertain"]
+
+
+@dataclass
+class Finding:
+    check: str
+    section: str
+    message: str
+    decisive: bool
+
+
+@dataclass
+class GateResult:
+    verdict: Verdict
+    findings: List[Finding] = field(default_factory=list)
+    metrics: Dict[str, Optional[float]] = field(default_factory=dict)
+
+    def critique(self) -> str:
+        return "\n".join(f"- [{f.check}] {f.message}" for f in self.findings)
+
+    def section_feedback(self) -> Dict[str, str]:
+        feedback: Dict[str, str] = {}
+        for finding in self.findings:
+            if finding.decisive:
+                feedback[finding.section] = " ".join(filter(None, [feedback.get(finding.section), finding.message]))
+        return feedback
+
+
+def _seconds(match: "re.Match[str]") -> int:
+    a, b, c = match.groups()
+    if c is not None:
+        return int(a) * 3600 + int(b) * 60 + int(c)
+    return int(a) * 60 + int(b)
+
+
+def timeline_end_seconds(timeline: List[Dict[str, Any]]) -> Optional[int]:
+    """Latest timestamp mentioned in the timeline, or ``None`` if none parse."""
+    ends = [
+        _seconds(matches[-1])
+        for shot in timeline
+        if isinstance(shot, dict) and (matches := list(_TIMECODE.finditer(str(shot.get("timestamp", "")))))
+    ]
+    return max(ends) if ends else None
+
+
+def spoken_words(script: str, translated: bool = False) -> int:
+    """Words a viewer hears or reads: the script minus [cues] and line labels.
+
+    Non-English scripts carry English translations in parentheses (see the
+    system preamble); with ``translated`` those are not counted either.
+    """
+    if translated:
+        script = _PAREN.sub(" ", script)
+    return len(_LABEL.sub("", _CUE.sub(" ", script)).split())
+
+
+def has_cta(script: str) -> bool:
+    lines = [line for line in script.strip().splitlines() if line.strip()]
+    tail = "\n".join(lines[-max(2, len(lines) * 2 // 5):])
+    return bool(_CTA.search(tail))
+
+
+def evaluate_gate(state: Mapping[str, Any], settings: Settings) -> GateResult:
+    duration = max(1, int(state.get("duration_seconds", 30)))
+    script = state.get("script") or ""
+    timeline = state.get("timeline") or []
+    findings: List[Finding] = []
+    metrics: Dict[str, Optional[float]] = {}
+
+    # Timeline
+    end = timeline_end_seconds(timeline)
+    metrics["timeline_coverage"] = round(end / duration, 3) if end is not None else None
+    if not timeline:
+        findings.append(Finding("empty_timeline", "visual_cues",
+                                "The timeline is empty; give every beat of the script a clear [VISUAL: ...] cue.", True))
+    elif end is not None and end < settings.gate_min_timeline_coverage * duration:
+        findings.append(Finding("timeline_coverage", "visual_cues",
+                                f"The shots only cover {end}s of the {duration}s target; extend the visual beats "
+                                "so the piece fills the full duration.", True))
+    elif end is not None and end > settings.gate_max_timeline_overrun * duration:
+        findings.append(Finding("timeline_overrun", "visual_cues",
+                                f"The shots run to {end}s against a {duration}s target; cut or merge beats.", True))
+
+    # Script
+    language = str((state.get("analysis") or {}).get("language") or "English")
+    words = spoken_words(script, translated=language.lower() != "english")
+    budget = duration * settings.gate_words_per_second
+    metrics["script_length_ratio"] = round(words / budget, 3)
+    if script and not has_cta(script):
+        findings.append(Finding("missing_cta", "cta",
+                                "The script has no closing call to action; end with a specific, platform-appropriate CTA.", True))
+    if words > settings.gate_max_script_ratio * budget:
+        findings.append(Finding("script_too_long", "dialogue",
+                                f"About {words} spoken words cannot be delivered in {duration}s "
+                                f"(~{int(budget)} fit); tighten the dialogue.", True))
+    elif words < 0.25 * budget:
+        findings.append(Finding("script_too_short", "dialogue",
+                                f"Only {words} spoken words for {duration}s; the piece may feel empty.", False))
+
+    # Enhancements (only judged when the enhancer actually ran)
+    if "enhancer" not in (state.get("skipped_nodes") or []):
+        hashtags = (state.get("enhancements") or {}).get("hashtags")
+        count = len(hashtags) if isinstance(hashtags, list) else 0
+        metrics["hashtags"] = count
+        if count < settings.gate_min_hashtags:
+            findings.append(Finding("few_hashtags", "cta",
+                                    f"Only {count} hashtags suggested (want {settings.gate_min_hashtags}+).", False))
+
+    if any(f.decisive for f in findings):
+        verdict: Verdict = "fail"
+    elif (
+        not findings
+        and metrics["timeline_coverage"] is not None
+        and 0.95 <= metrics["timeline_coverage"] <= 1.1
+        and metrics["script_length_ratio"] <= 1.0
+    ):
+        verdict = "pass"
+    else:
+        verdict = "uncertain"
+    return GateResult(verdict=verdict, findings=findings, metrics=metrics)
+
+
+class GateStats:
+    """Process-wide counts of gate verdicts and the critic calls they saved."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {"fail": 0, "pass": 0, "uncertain": 0}
+        self.critic_calls_saved = 0
+        self.checks_failed: Dict[str, int] = {}
+
+    def record(self, result: GateResult, saved_call: bool) -> None:
+        with self._lock:
+            self.counts[result.verdict] += 1
+            self.critic_calls_saved += int(saved_call)
+            for finding in result.findings:
+                self.checks_failed[finding.check] = self.checks_failed.get(finding.check, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            evaluated = sum(self.counts.values())
+            return {
+                "evaluated": evaluated,
+                "verdicts": dict(self.counts),
+                "critic_calls_saved": self.critic_calls_saved,
+                "saved_ratio": round(self.critic_calls_saved / evaluated, 3) if evaluated else 0.0,
+                "checks_failed": dict(self.checks_failed),
+            }
+
+
+@lru_cache(maxsize=1)
+def get_gate_stats() -> GateStats:
+    return GateStats()
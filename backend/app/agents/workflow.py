@@ -2,31 +2,82 @@
 
 Pipeline:
   START → Analyzer → Script Writer → Timeline Planner → Enhancement → Story Architect
-       → Critic ──[score<7 & loops<max]──→ Refiner → Script Writer (loop)
+       → Quality Gate ──[decisive fail]──→ Refiner
+                      ──[clean pass, if gate_skip_critic_on_pass]──→ Finalizer
+       → Critic ──[score<7 & loops<max]──→ Refiner → Timeline Planner (loop)
               └──[score>=7 OR max_loops]──→ Finalizer → END
+
+The quality gate (``app.agents.quality_gate``) runs cheap deterministic checks
+and only spends the LLM critic call when the outcome is not already obvious.
+
+The refiner does not regenerate the script: it emits find/replace edits for the
+sections the critic scored below ``min_quality_score`` and the patched script goes
+straight back to the timeline planner, with ``revised_sections`` telling every
+downstream agent what changed. A pass that applies no edit goes to the finalizer
+instead, since the unchanged script would get the same verdict.
+
+With ``quality_mode="best_of_n"`` the loop is replaced by breadth:
+  START → Analyzer → Script Writer (N candidates in parallel + one batched ranking)
+       → Timeline Planner → Enhancement → Story Architect → Finalizer → END
+Each candidate gets its own temperature and creative angle; the ranking call
+plays the critic's role, so a run costs about one pass of wall-clock time.
+
+With ``draft=True`` the same agents are wired into a reduced preview graph:
+  START → Analyzer → Script Writer → Finalizer → END
+
+When a run carries a deadline (``deadline_at``), the optional agents (enhancer,
+story architect, critic) run inside the remaining budget and are dropped when it
+is exhausted, the refine loop is skipped once too little time is left, and the
+finalizer marks the blueprint as degraded.
+
+The analyzer first tries the local, CPU-only classifier
+(``app.agents.local_analyzer``) and only calls the LLM when its confidence is
+below ``local_analyzer_min_confidence``; analyses are cached per normalised brief.
+
+Every LLM call is capped at its node's output-token budget for the run's
+duration, content type and platform (``app.agents.budgets``); reels and shorts
+get the compact enhancement brief.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Literal
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Literal
 
 from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.runnables import RunnableConfig
 from pydantic import BaseModel, Field
 
 from langgraph.graph import END, START, StateGraph
 
+from app.agents.blueprint import blueprint_view, render_markdown
+from app.agents.budgets import is_short_form, output_token_budget
+from app.agents.llm import LLMClient
+from app.agents.local_analyzer import AnalysisCache, analyze_locally
+from app.agents.quality_gate import evaluate_gate, get_gate_stats, has_cta, spoken_words
 from app.agents.prompts import (
     ANALYZER_PROMPT,
     CRITIC_PROMPT,
     ENHANCEMENT_PROMPT,
+    ENHANCEMENT_PROMPT_SHORT,
     REFINER_PROMPT,
+    SCRIPT_CANDIDATE_ANGLES,
+    SCRIPT_CANDIDATE_NOTE,
+    SCRIPT_RANKER_PROMPT,
     SCRIPT_WRITER_PROMPT,
     STORY_ARCHITECT_PROMPT,
     TIMELINE_PLANNER_PROMPT,
+    PromptPrefixMeter,
+    render_prompt,
+    shared_context,
 )
 from app.core.config import Settings
+from app.core.logging import log_context
+from app.core.tracing import span
 from app.schemas.state import CreatorState
 
 logger = logging.getLogger(__name__)
@@ -47,6 +98,18 @@ class AnalyzerOutput(BaseModel):
 class CriticOutput(BaseModel):
     score: int = Field(..., ge=1, le=10)
     critique: str = Field(..., min_length=10)
+    section_scores: Dict[str, int] = Field(default_factory=dict)
+    section_feedback: Dict[str, str] = Field(default_factory=dict)
+
+
+class ScriptEdit(BaseModel):
+    section: str = ""
+    find: str
+    replace: str
+
+
+# Script sections the critic scores individually and the refiner patches.
+SCRIPT_SECTIONS = ("hook", "dialogue", "visual_cues", "sound_cues", "text_overlays", "cta")
 
 
 def _safe_json_parse(text: str, fallback: Any = None) -> Any:
@@ -57,59 +120,306 @@ def _safe_json_parse(text: str, fallback: Any = None) -> Any:
         lines = cleaned.split("\n")
         lines = [l for l in lines if not l.strip().startswith("```")]
         cleaned = "\n".join(lines)
+    with span("json.parse", chars=len(cleaned)) as parse_span:
+        try:
+            return json.loads(cleaned)
+        except json.JSONDecodeError:
+            parse_span.set(fallback=True)
+            logger.warning("JSON parse failed, using fallback. Raw: %s", cleaned[:200])
+            return fallback if fallback is not None else {}
+
+
+def _parse_section_scores(raw: Any) -> Dict[str, int]:
+    """Keep known sections only, clamped to the 1-10 scale."""
+    if not isinstance(raw, dict):
+        return {}
+    scores: Dict[str, int] = {}
+    for section, value in raw.items():
+        if section not in SCRIPT_SECTIONS:
+            continue
+        try:
+            scores[section] = max(1, min(10, int(value)))
+        except (TypeError, ValueError):
+            continue
+    return scores
+
+
+def _apply_script_edits(script: str, edits: List[ScriptEdit]) -> tuple[str, List[str], int]:
+    """Apply find/replace edits to the script.
+
+    Returns the patched script, the sections touched and how many edits applied.
+    Edits whose ``find`` text is not in the script are skipped rather than guessed at.
+    """
+    touched: List[str] = []
+    applied = 0
+    for edit in edits:
+        if not edit.find or edit.find not in script:
+            logger.warning("Refiner edit for '%s' not found in script; skipped", edit.section)
+            continue
+        script = script.replace(edit.find, edit.replace, 1)
+        applied += 1
+        if edit.section and edit.section not in touched:
+            touched.append(edit.section)
+    return script, touched, applied
+
+
+def _parse_rankings(raw: Any, candidates: List[int]) -> tuple[Dict[int, Dict[str, Any]], int | None]:
+    """Per-candidate scores from the ranker's JSON, plus its pick if it is a ranked candidate."""
+    if not isinstance(raw, dict):
+        return {}, None
+    rankings: Dict[int, Dict[str, Any]] = {}
+    for entry in raw.get("rankings") or []:
+        try:
+            number, score = int(entry["candidate"]), int(entry["score"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if number in candidates:
+            rankings[number] = {
+                "score": max(1, min(10, score)),
+                "section_scores": _parse_section_scores(entry.get("section_scores")),
+                "critique": str(entry.get("critique", "")).strip(),
+            }
     try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
-        logger.warning("JSON parse failed, using fallback. Raw: %s", cleaned[:200])
-        return fallback if fallback is not None else {}
+        winner = int(raw.get("winner"))
+    except (TypeError, ValueError):
+        winner = None
+    return rankings, winner if winner in rankings else None
+
+
+def _rank_by_rules(scripts: Dict[int, str], state: CreatorState, settings: Settings) -> int:
+    """Fallback pick without a critic: has a CTA, then spoken length closest to the duration."""
+    budget = max(1, int(state.get("duration_seconds", 30))) * settings.gate_words_per_second
+    return min(scripts, key=lambda n: (not has_cta(scripts[n]), abs(spoken_words(scripts[n]) / budget - 1), n))
+
+
+def _time_left(state: CreatorState) -> float:
+    """Seconds until the run's deadline, or ``inf`` when it has none."""
+    deadline_at = state.get("deadline_at") or 0.0
+    if deadline_at <= 0:
+        return math.inf
+    return deadline_at - time.time()
+
+
+def _skipped(state: CreatorState, node: str) -> Dict[str, Any]:
+    """State patch recording that ``node`` was dropped to meet the deadline.
+
+    Outputs from a previous loop iteration are left in place, so a dropped
+    agent degrades to its last result rather than to nothing.
+    """
+    skipped = list(state.get("skipped_nodes") or [])
+    if node not in skipped:
+        skipped.append(node)
+    logger.warning("%s dropped: deadline budget exhausted", node)
+    return {"degraded": True, "skipped_nodes": skipped}
+
+
+def _bind_node(
+    node: str, fn: Callable[[CreatorState], Awaitable[Dict[str, Any]]]
+) -> Callable[[CreatorState, RunnableConfig], Awaitable[Dict[str, Any]]]:
+    """Run a node inside a trace span, with its name and the run id bound to every log record.
+
+    When the caller passes a ``node_timings`` dict in ``configurable``, the node's
+    own run time is added to it, so it never includes time the stream's consumer
+    takes between updates.
+    """
+
+    async def bound(state: CreatorState, config: RunnableConfig) -> Dict[str, Any]:
+        timings = (config.get("configurable") or {}).get("node_timings")
+        started = time.perf_counter()
+        try:
+            with log_context(run_id=state.get("run_id", ""), node=node), span(f"node {node}", node=node):
+                return await fn(state)
+        finally:
+            if timings is not None:
+                timings[node] = round(timings.get(node, 0.0) + time.perf_counter() - started, 3)
+
+    # Not functools.wraps: LangGraph reads the signature to decide whether to pass ``config``.
+    bound.__name__ = bound.__qualname__ = fn.__name__
+    bound.__doc__ = fn.__doc__
+    return bound
+
+
+def _revision_notes(state: CreatorState) -> str:
+    """Tell downstream agents which script sections the refiner just changed."""
+    revised = state.get("revised_sections") or []
+    if not revised:
+        return ""
+    return (
+        f"\nRevised script sections since the previous pass: {', '.join(revised)}. "
+        "All other sections are unchanged; keep their treatment consistent.\n"
+    )
 
 
-def build_creator_graph(llm: BaseChatModel, settings: Settings):
-    """Build and compile the StateGraph for the multi-agent creator pipeline."""
+def build_creator_graph(
+    llm: BaseChatModel | LLMClient,
+    settings: Settings,
+    draft: bool = False,
+    prefix_meter: PromptPrefixMeter | None = None,
+    analysis_cache: AnalysisCache | None = None,
+):
+    """Build and compile the StateGraph for the multi-agent creator pipeline.
+
+    ``draft=True`` compiles the reduced analyzer → script writer → finalizer
+    graph used for fast previews. Every prompt sent is recorded in
+    ``prefix_meter`` (when given) under the run's id. Graphs that analyze the
+    same briefs can share an ``analysis_cache``.
+    """
+    client = llm if isinstance(llm, LLMClient) else LLMClient(llm, settings)
+    if analysis_cache is None:
+        analysis_cache = AnalysisCache(max_entries=settings.analysis_cache_size)
+
+    async def ask(node: str, state: CreatorState, prompt: str, temperature: float | None = None) -> Any:
+        if prefix_meter is not None:
+            prefix_meter.observe(state.get("run_id", ""), prompt)
+        return await client.ainvoke(
+            node, prompt, max_tokens=output_token_budget(node, state, settings), temperature=temperature
+        )
+
+    async def invoke_optional(node: str, state: CreatorState, prompt: str) -> Any | None:
+        """Invoke the LLM for a non-critical agent within the run's remaining budget.
+
+        Returns ``None`` when there is no budget left or the call overruns it.
+        """
+        budget = _time_left(state) - settings.deadline_finalize_reserve_seconds
+        if budget == math.inf:
+            return await ask(node, state, prompt)
+        if budget <= 0:
+            return None
+        try:
+            return await asyncio.wait_for(ask(node, state, prompt), timeout=budget)
+        except asyncio.TimeoutError:
+            return None
 
     # ─── Agent 1: Content Analyzer ──────────────────────────
     async def analyzer_node(state: CreatorState) -> Dict[str, Any]:
-        prompt = ANALYZER_PROMPT.format(
-            prompt=state["prompt"],
-            content_type=state["content_type"],
-            duration_seconds=state["duration_seconds"],
-            platform=state["platform"],
-        )
-        response = await llm.ainvoke(prompt)
+        cached = analysis_cache.get(state)
+        if cached is not None:
+            logger.info("Analyzer: cached analysis, language=%s genre=%s", cached.get("language"), cached.get("genre"))
+            return {"analysis": cached, "analysis_source": "cache", "analysis_confidence": 1.0}
+
+        if settings.local_analyzer_enabled:
+            local = analyze_locally(
+                state["prompt"], state["content_type"], state["duration_seconds"], state["platform"]
+            )
+            confidence = local.confidence
+            if confidence >= settings.local_analyzer_min_confidence:
+                analysis = AnalyzerOutput(**local.analysis).model_dump()
+                analysis_cache.put(state, analysis, "local")
+                logger.info(
+                    "Analyzer: local (confidence %.2f) language=%s genre=%s tone=%s",
+                    confidence, analysis["language"], analysis["genre"], analysis["tone"],
+                )
+                return {"analysis": analysis, "analysis_source": "local", "analysis_confidence": confidence}
+            logger.info("Analyzer: local confidence %.2f too low %s; asking the LLM", confidence, local.field_confidence)
+
+        prompt = render_prompt(ANALYZER_PROMPT, shared_context(state))
+        response = await ask("analyzer", state, prompt)
         data = _safe_json_parse(response.content, fallback={})
         # Build with defaults for any missing fields
         valid_fields = AnalyzerOutput.model_fields.keys()
         filtered = {k: v for k, v in data.items() if k in valid_fields}
         result = AnalyzerOutput(**filtered)
         analysis = result.model_dump()
+        if filtered:
+            analysis_cache.put(state, analysis, "llm")
         logger.info("Analyzer: language=%s genre=%s tone=%s", analysis.get("language"), analysis.get("genre"), analysis.get("tone"))
-        return {"analysis": analysis}
+        return {"analysis": analysis, "analysis_source": "llm", "analysis_confidence": 1.0}
 
     # ─── Agent 2: Script Writer ─────────────────────────────
     async def script_writer_node(state: CreatorState) -> Dict[str, Any]:
         analysis = state.get("analysis", {})
-        prompt = SCRIPT_WRITER_PROMPT.format(
-            prompt=state["prompt"],
-            content_type=state["content_type"],
-            duration_seconds=state["duration_seconds"],
-            platform=state["platform"],
-            analysis=json.dumps(analysis, indent=2, ensure_ascii=False),
+        prompt = render_prompt(
+            SCRIPT_WRITER_PROMPT,
+            shared_context(state),
             language=analysis.get("language", "English"),
         )
-        response = await llm.ainvoke(prompt)
+        response = await ask("script_writer", state, prompt)
         logger.info("Script Writer: generated %d chars", len(response.content))
         return {"script": response.content}
 
+    # ─── Agent 2 (best-of-N): Script candidates + ranking ───
+    async def script_candidates_node(state: CreatorState) -> Dict[str, Any]:
+        analysis = state.get("analysis", {})
+        prompt = render_prompt(
+            SCRIPT_WRITER_PROMPT,
+            shared_context(state),
+            language=analysis.get("language", "English"),
+        )
+        total = settings.script_candidates
+        temperatures = settings.candidate_temperatures or [None]
+
+        def variant(index: int) -> str:
+            angle = SCRIPT_CANDIDATE_ANGLES[index % len(SCRIPT_CANDIDATE_ANGLES)]
+            return prompt + SCRIPT_CANDIDATE_NOTE.format(index=index + 1, total=total, angle=angle)
+
+        results = await asyncio.gather(
+            *(ask("script_writer", state, variant(i), temperatures[i % len(temperatures)]) for i in range(total)),
+            return_exceptions=True,
+        )
+        scripts = {i + 1: r.content for i, r in enumerate(results) if not isinstance(r, BaseException)}
+        if not scripts:
+            raise results[0]
+        for i, r in enumerate(results):
+            if isinstance(r, BaseException):
+                logger.warning("Script candidate %d failed: %s", i + 1, r)
+
+        update: Dict[str, Any] = {}
+        rankings: Dict[int, Dict[str, Any]] = {}
+        winner = None
+        if len(scripts) > 1:
+            listing = "\n\n".join(f"## Candidate {n}\n{text}" for n, text in scripts.items())
+            response = await invoke_optional(
+                "ranker", state, render_prompt(SCRIPT_RANKER_PROMPT, shared_context(state), candidates=listing)
+            )
+            if response is None:
+                update = _skipped(state, "ranker")
+            else:
+                rankings, winner = _parse_rankings(_safe_json_parse(response.content, fallback={}), list(scripts))
+        if winner is None and rankings:
+            winner = max(rankings, key=lambda n: (rankings[n]["score"], -n))
+        if winner is None:
+            winner = _rank_by_rules(scripts, state, settings)
+        chosen = rankings.get(winner) or {
+            "score": settings.min_quality_score,
+            "section_scores": {},
+            "critique": "Picked by automated checks (closing CTA, length for the duration); no critic scores available.",
+        }
+
+        candidates = [
+            {
+                "candidate": n,
+                "temperature": temperatures[(n - 1) % len(temperatures)],
+                "chars": len(text),
+                "score": rankings.get(n, {}).get("score"),
+                "critique": rankings.get(n, {}).get("critique", ""),
+                "winner": n == winner,
+            }
+            for n, text in scripts.items()
+        ]
+        logger.info(
+            "Script candidates: %d/%d written, winner=%d scores=%s",
+            len(scripts), total, winner, {n: r["score"] for n, r in rankings.items()},
+        )
+        return {
+            **update,
+            "script": scripts[winner],
+            "candidates": candidates,
+            "score": chosen["score"],
+            "critique": chosen["critique"],
+            "section_scores": chosen["section_scores"],
+            "section_feedback": {},
+            "iteration_count": 1,
+        }
+
     # ─── Agent 3: Timeline Planner ──────────────────────────
     async def timeline_planner_node(state: CreatorState) -> Dict[str, Any]:
-        prompt = TIMELINE_PLANNER_PROMPT.format(
-            prompt=state["prompt"],
-            duration_seconds=state["duration_seconds"],
-            platform=state["platform"],
+        prompt = render_prompt(
+            TIMELINE_PLANNER_PROMPT,
+            shared_context(state),
             script=state.get("script", ""),
-            analysis=json.dumps(state.get("analysis", {}), indent=2, ensure_ascii=False),
+            revision_notes=_revision_notes(state),
         )
-        response = await llm.ainvoke(prompt)
+        response = await ask("timeline_planner", state, prompt)
         timeline = _safe_json_parse(response.content, fallback=[])
         if not isinstance(timeline, list):
             timeline = []
@@ -118,167 +428,174 @@ def build_creator_graph(llm: BaseChatModel, settings: Settings):
 
     # ─── Agent 4: Enhancement Agent ─────────────────────────
     async def enhancement_node(state: CreatorState) -> Dict[str, Any]:
-        prompt = ENHANCEMENT_PROMPT.format(
-            prompt=state["prompt"],
-            content_type=state["content_type"],
-            platform=state["platform"],
-            duration_seconds=state["duration_seconds"],
+        prompt = render_prompt(
+            ENHANCEMENT_PROMPT_SHORT if is_short_form(state, settings) else ENHANCEMENT_PROMPT,
+            shared_context(state),
             script=state.get("script", ""),
             timeline=json.dumps(state.get("timeline", []), indent=2, ensure_ascii=False),
-            analysis=json.dumps(state.get("analysis", {}), indent=2, ensure_ascii=False),
+            revision_notes=_revision_notes(state),
         )
-        response = await llm.ainvoke(prompt)
+        response = await invoke_optional("enhancer", state, prompt)
+        if response is None:
+            return _skipped(state, "enhancer")
         enhancements = _safe_json_parse(response.content, fallback={})
         logger.info("Enhancement Agent: %d keys", len(enhancements))
         return {"enhancements": enhancements}
 
     # ─── Agent 5: Story Architect ───────────────────────────
     async def story_architect_node(state: CreatorState) -> Dict[str, Any]:
-        prompt = STORY_ARCHITECT_PROMPT.format(
-            prompt=state["prompt"],
-            content_type=state["content_type"],
-            duration_seconds=state["duration_seconds"],
+        prompt = render_prompt(
+            STORY_ARCHITECT_PROMPT,
+            shared_context(state),
             script=state.get("script", ""),
-            analysis=json.dumps(state.get("analysis", {}), indent=2, ensure_ascii=False),
+            revision_notes=_revision_notes(state),
         )
-        response = await llm.ainvoke(prompt)
+        response = await invoke_optional("story_architect", state, prompt)
+        if response is None:
+            return _skipped(state, "story_architect")
         story = _safe_json_parse(response.content, fallback={})
         logger.info("Story Architect: arc=%s", story.get("narrative_arc", "?")[:50])
         return {"story_structure": story}
 
     # ─── Critic ─────────────────────────────────────────────
     async def critic_node(state: CreatorState) -> Dict[str, Any]:
-        prompt = CRITIC_PROMPT.format(
-            prompt=state["prompt"],
-            content_type=state["content_type"],
-            platform=state["platform"],
+        prompt = render_prompt(
+            CRITIC_PROMPT,
+            shared_context(state),
             script=state.get("script", ""),
             timeline=json.dumps(state.get("timeline", []), indent=2, ensure_ascii=False),
             enhancements=json.dumps(state.get("enhancements", {}), indent=2, ensure_ascii=False),
+            revision_notes=_revision_notes(state),
         )
-        response = await llm.ainvoke(prompt)
+        response = await invoke_optional("critic", state, prompt)
+        if response is None:
+            return _skipped(state, "critic")
         data = _safe_json_parse(response.content, fallback={"score": 7, "critique": "Good quality content."})
         score = max(1, min(10, int(data.get("score", 7))))
         critique_text = str(data.get("critique", "Good quality content.")).strip()
+        section_scores = _parse_section_scores(data.get("section_scores"))
+        feedback = data.get("section_feedback")
+        section_feedback = (
+            {k: str(v) for k, v in feedback.items() if k in SCRIPT_SECTIONS}
+            if isinstance(feedback, dict)
+            else {}
+        )
         new_iter = state.get("iteration_count", 0) + 1
-        logger.info("Critic: score=%d iteration=%d", score, new_iter)
+        logger.info("Critic: score=%d iteration=%d sections=%s", score, new_iter, section_scores)
         return {
             "score": score,
             "critique": critique_text,
+            "section_scores": section_scores,
+            "section_feedback": section_feedback,
             "iteration_count": new_iter,
         }
 
+    # ─── Quality Gate ───────────────────────────────────────
+    async def quality_gate_node(state: CreatorState) -> Dict[str, Any]:
+        """Deterministic pre-critic checks; may stand in for the critic's verdict."""
+        result = evaluate_gate(state, settings)
+        loops = state.get("iteration_count", 0)
+        update: Dict[str, Any] = {
+            "gate_verdict": result.verdict,
+            "gate_action": "critic",
+            "gate_findings": [f"{f.check}: {f.message}" for f in result.findings],
+        }
+        if (
+            result.verdict == "fail"
+            and loops + 1 < settings.max_iterations
+            and _time_left(state) >= settings.deadline_min_refine_seconds
+        ):
+            decisive = [f for f in result.findings if f.decisive]
+            feedback = result.section_feedback()
+            update.update(
+                gate_action="refine",
+                score=max(1, settings.min_quality_score - 2 * len(decisive)),
+                critique="Automated checks failed:\n" + result.critique(),
+                section_scores={s: max(1, settings.min_quality_score - 3) for s in feedback},
+                section_feedback=feedback,
+                iteration_count=loops + 1,
+            )
+        elif result.verdict == "pass" and settings.gate_skip_critic_on_pass:
+            update.update(
+                gate_action="finalize",
+                score=settings.min_quality_score,
+                critique="Passed every automated check with margin; LLM critic skipped.",
+                section_scores={},
+                section_feedback={},
+                iteration_count=loops + 1,
+            )
+        get_gate_stats().record(result, saved_call=update["gate_action"] != "critic")
+        logger.info(
+            "Quality gate: %s → %s %s", result.verdict, update["gate_action"],
+            [f.check for f in result.findings],
+        )
+        return update
+
     # ─── Refiner ────────────────────────────────────────────
     async def refiner_node(state: CreatorState) -> Dict[str, Any]:
-        prompt = REFINER_PROMPT.format(
-            prompt=state["prompt"],
-            platform=state["platform"],
-            script=state.get("script", ""),
+        section_scores = state.get("section_scores", {})
+        feedback = state.get("section_feedback", {})
+        weak = [s for s in SCRIPT_SECTIONS if section_scores.get(s, 10) < settings.min_quality_score]
+        if not weak:
+            # No usable per-section scores: let the refiner pick from every section.
+            weak = [s for s in SCRIPT_SECTIONS if s not in section_scores] or list(SCRIPT_SECTIONS)
+        weak_lines = [
+            f"- {s} ({section_scores[s]}/10): {feedback.get(s, 'see overall critique')}"
+            if s in section_scores
+            else f"- {s}: {feedback.get(s, 'see overall critique')}"
+            for s in weak
+        ]
+        script = state.get("script", "")
+        prompt = render_prompt(
+            REFINER_PROMPT,
+            shared_context(state),
+            script=script,
+            weak_sections="\n".join(weak_lines),
             critique=state.get("critique", ""),
-            analysis=json.dumps(state.get("analysis", {}), indent=2, ensure_ascii=False),
         )
-        response = await llm.ainvoke(prompt)
-        return {"script": response.content}
+        response = await ask("refiner", state, prompt)
+        data = _safe_json_parse(response.content, fallback={})
+        raw_edits = data.get("edits", []) if isinstance(data, dict) else []
+        edits = [
+            ScriptEdit(section=str(e.get("section", "")), find=e["find"], replace=e["replace"])
+            for e in raw_edits
+            if isinstance(e, dict) and isinstance(e.get("find"), str) and isinstance(e.get("replace"), str)
+        ]
+        patched, revised, applied = _apply_script_edits(script, edits)
+        logger.info(
+            "Refiner: %d/%d edits applied, sections=%s, output %d chars",
+            applied, len(edits), revised, len(response.content),
+        )
+        if not applied:
+            logger.warning("Refiner changed nothing; finalizing instead of re-running the loop")
+        return {"script": patched, "revised_sections": revised, "refiner_stalled": not applied}
 
     # ─── Finalizer ──────────────────────────────────────────
     async def finalizer_node(state: CreatorState) -> Dict[str, Any]:
-        """Assemble the final production blueprint in markdown."""
-        analysis = state.get("analysis", {})
-        enhancements = state.get("enhancements", {})
-        story = state.get("story_structure", {})
-        timeline = state.get("timeline", [])
-
-        blueprint_lines = [
-            f"# 🎬 Production Blueprint",
-            f"",
-            f"**Prompt:** {state['prompt']}",
-            f"**Type:** {state['content_type']} | **Platform:** {state['platform']} | **Duration:** {state['duration_seconds']}s",
-            f"**Language:** {analysis.get('language', 'English')} | **Region:** {analysis.get('region', 'Global')} | **Genre:** {analysis.get('genre', 'general')}",
-            f"**Quality Score:** {state.get('score', 0)}/10 | **Iterations:** {state.get('iteration_count', 0)}",
-            f"",
-            f"---",
-            f"",
-            f"## 📊 Content Analysis",
-            f"- **Tone:** {analysis.get('tone', 'N/A')}",
-            f"- **Visual Style:** {analysis.get('visual_style', 'N/A')}",
-            f"- **Target Audience:** {analysis.get('target_audience', 'N/A')}",
-            f"- **Key Themes:** {', '.join(analysis.get('key_themes', []))}",
-            f"",
-            f"## 📝 Script",
-            f"",
-            state.get("script", "_No script generated._"),
-            f"",
-            f"## 🎯 Shot-by-Shot Timeline",
-            f"",
-        ]
+        """Assemble the final production blueprint in markdown.
+
+        Other formats (HTML, CSV shot list, JSON) are rendered on request from
+        the stored state, outside the graph (``app.services.render_service``).
+        """
+        skipped = list(state.get("skipped_nodes") or [])
+        if (
+            settings.quality_mode == "refine"
+            and state.get("iteration_count", 0)
+            and state.get("score", 0) < settings.min_quality_score
+            and state.get("iteration_count", 0) < settings.max_iterations
+            and "critic" not in skipped
+            and not state.get("refiner_stalled")
+        ):
+            # The critic asked for another pass but the deadline cut the loop short.
+            skipped.append("refiner")
+        degraded = bool(skipped)
+        view = blueprint_view({**state, "degraded": degraded, "skipped_nodes": skipped})
 
-        for i, shot in enumerate(timeline, 1):
-            blueprint_lines.append(f"### Shot {i}: {shot.get('timestamp', '??:??')}")
-            blueprint_lines.append(f"- **Type:** {shot.get('shot_type', 'N/A')}")
-            blueprint_lines.append(f"- **Visual:** {shot.get('visual', 'N/A')}")
-            blueprint_lines.append(f"- **Audio:** {shot.get('audio', 'N/A')}")
-            if shot.get("text_overlay"):
-                blueprint_lines.append(f"- **Text Overlay:** {shot['text_overlay']}")
-            blueprint_lines.append(f"- **Transition:** {shot.get('transition', 'cut')}")
-            if shot.get("notes"):
-                blueprint_lines.append(f"- **Notes:** {shot['notes']}")
-            blueprint_lines.append("")
-
-        blueprint_lines.extend([
-            f"## 🚀 Enhancements",
-            f"",
-            f"### Opening Hooks",
-        ])
-        for i, hook in enumerate(enhancements.get("hooks", []), 1):
-            blueprint_lines.append(f"{i}. {hook}")
-
-        blueprint_lines.extend(["", "### Music Suggestions"])
-        for m in enhancements.get("music_suggestions", []):
-            if isinstance(m, dict):
-                blueprint_lines.append(f"- **{m.get('name', 'Track')}** — {m.get('mood', '')} ({m.get('source', '')})")
-            else:
-                blueprint_lines.append(f"- {m}")
-
-        blueprint_lines.extend([
-            f"",
-            f"### Color Grading",
-            f"{enhancements.get('color_grading', 'N/A')}",
-            f"",
-            f"### Hashtags",
-            f"{' '.join(enhancements.get('hashtags', []))}",
-            f"",
-            f"### Captions",
-        ])
-        for c in enhancements.get("captions", []):
-            if isinstance(c, dict):
-                blueprint_lines.append(f"- **{c.get('style', 'caption')}:** {c.get('text', '')}")
-            else:
-                blueprint_lines.append(f"- {c}")
-
-        blueprint_lines.extend([
-            f"",
-            f"## 📖 Story Architecture",
-            f"- **Narrative Arc:** {story.get('narrative_arc', 'N/A')}",
-            f"- **Payoff:** {story.get('payoff', 'N/A')}",
-            f"- **Series Potential:** {story.get('series_potential', 'N/A')}",
-        ])
-
-        if story.get("emotion_map"):
-            blueprint_lines.append(f"")
-            blueprint_lines.append(f"### Emotion Map")
-            for em in story["emotion_map"]:
-                if isinstance(em, dict):
-                    blueprint_lines.append(f"- **{em.get('timestamp', '?')}:** {em.get('emotion', '?')}")
-                else:
-                    blueprint_lines.append(f"- {em}")
-
-        blueprint_lines.extend([
-            f"",
-            f"---",
-            f"*Generated by bb /create — Multi-Agent Content Production Engine*",
-        ])
-
-        return {"final_blueprint": "\n".join(blueprint_lines)}
+        return {
+            "final_blueprint": render_markdown(view, draft=draft),
+            "degraded": degraded,
+            "skipped_nodes": skipped,
+        }
 
     # ─── Routing ────────────────────────────────────────────
     def route_after_critic(state: CreatorState) -> Literal["refine", "finalize"]:
@@ -288,32 +605,67 @@ def build_creator_graph(llm: BaseChatModel, settings: Settings):
             return "finalize"
         if loops >= settings.max_iterations:
             return "finalize"
+        if "critic" in (state.get("skipped_nodes") or []):
+            return "finalize"
+        if _time_left(state) < settings.deadline_min_refine_seconds:
+            logger.warning("Skipping refine loop: %.1fs left before deadline", _time_left(state))
+            return "finalize"
         return "refine"
 
+    def route_after_gate(state: CreatorState) -> Literal["refine", "finalize", "critic"]:
+        return state.get("gate_action") or "critic"
+
+    def route_after_refiner(state: CreatorState) -> Literal["replan", "finalize"]:
+        # An unchanged script would only buy another full pass of the same verdict.
+        return "finalize" if state.get("refiner_stalled") else "replan"
+
     # ─── Build graph ────────────────────────────────────────
+    # Every mode runs the same chain from the analyzer; only the tail differs.
+    writer = script_candidates_node if settings.quality_mode == "best_of_n" and not draft else script_writer_node
+    chain = [("analyzer", analyzer_node), ("script_writer", writer)]
+    if not draft:
+        chain += [
+            ("timeline_planner", timeline_planner_node),
+            ("enhancer", enhancement_node),
+            ("story_architect", story_architect_node),
+        ]
+
     graph_builder = StateGraph(CreatorState)
-    graph_builder.add_node("analyzer", analyzer_node)
-    graph_builder.add_node("script_writer", script_writer_node)
-    graph_builder.add_node("timeline_planner", timeline_planner_node)
-    graph_builder.add_node("enhancer", enhancement_node)
-    graph_builder.add_node("story_architect", story_architect_node)
-    graph_builder.add_node("critic", critic_node)
-    graph_builder.add_node("refiner", refiner_node)
-    graph_builder.add_node("finalizer", finalizer_node)
-
-    graph_builder.add_edge(START, "analyzer")
-    graph_builder.add_edge("analyzer", "script_writer")
-    graph_builder.add_edge("script_writer", "timeline_planner")
-    graph_builder.add_edge("timeline_planner", "enhancer")
-    graph_builder.add_edge("enhancer", "story_architect")
-    graph_builder.add_edge("story_architect", "critic")
+    previous = START
+    for name, node in chain:
+        graph_builder.add_node(name, _bind_node(name, node))
+        graph_builder.add_edge(previous, name)
+        previous = name
+    graph_builder.add_node("finalizer", _bind_node("finalizer", finalizer_node))
+    graph_builder.add_edge("finalizer", END)
+
+    if draft or settings.quality_mode == "best_of_n":
+        graph_builder.add_edge(previous, "finalizer")
+        return graph_builder.compile()
+
+    # Refine mode: quality gate and critic, with the refiner looping back to the timeline planner.
+    graph_builder.add_node("critic", _bind_node("critic", critic_node))
+    if settings.quality_gate_enabled:
+        graph_builder.add_node("quality_gate", _bind_node("quality_gate", quality_gate_node))
+    graph_builder.add_node("refiner", _bind_node("refiner", refiner_node))
+    if settings.quality_gate_enabled:
+        graph_builder.add_edge("story_architect", "quality_gate")
+        graph_builder.add_conditional_edges(
+            "quality_gate",
+            route_after_gate,
+            {"refine": "refiner", "finalize": "finalizer", "critic": "critic"},
+        )
+    else:
+        graph_builder.add_edge("story_architect", "critic")
     graph_builder.add_conditional_edges(
         "critic",
         route_after_critic,
         {"refine": "refiner", "finalize": "finalizer"},
     )
-    graph_builder.add_edge("refiner", "script_writer")
-    graph_builder.add_edge("finalizer", END)
-
+    graph_builder.add_conditional_edges(
+        "refiner",
+        route_after_refiner,
+        {"replan": "timeline_planner", "finalize": "finalizer"},
+    )
     return graph_builder.compile()
 
@@ -1,17 +1,37 @@
 """API routes for health checks and the bb /create content pipeline."""
 
 import logging
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 
-from app.schemas.models import CreateRequest, CreateResponse, HealthResponse
+from app.agents.blueprint import MEDIA_TYPES
+from app.agents.quality_gate import get_gate_stats
+from app.core.profiling import SamplingProfiler, get_profiler
+from app.schemas.models import (
+    CreateRequest,
+    CreateResponse,
+    HealthResponse,
+    RunDetail,
+    RunListResponse,
+    RunSummary,
+)
+from app.services.cache_warmer import CacheWarmer, get_cache_warmer
+from app.services.history_service import RunHistoryStore, get_history_store
+from app.services.render_service import RenderCache, get_render_cache, negotiate_format
 from app.services.report_service import (
     CreatorWorkflowService,
     format_sse,
     get_creator_service,
 )
+from app.services.scheduler import (
+    FairScheduler,
+    SchedulerRejected,
+    get_priority,
+    get_scheduler,
+    get_tenant,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,14 +47,24 @@ async def health() -> HealthResponse:
 async def create_content(
     request: CreateRequest,
     service: CreatorWorkflowService = Depends(get_creator_service),
+    scheduler: FairScheduler = Depends(get_scheduler),
+    tenant: str = Depends(get_tenant),
+    priority: str = Depends(get_priority),
 ) -> CreateResponse:
-    state = await service.run_create(
-        prompt=request.prompt,
-        content_type=request.content_type,
-        duration_seconds=request.duration_seconds,
-        platform=request.platform,
-    )
+    try:
+        async with scheduler.slot(tenant, priority):
+            state = await service.run_create(
+                prompt=request.prompt,
+                content_type=request.content_type,
+                duration_seconds=request.duration_seconds,
+                platform=request.platform,
+                deadline_seconds=request.deadline_seconds,
+                fresh=request.fresh,
+            )
+    except SchedulerRejected as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
     return CreateResponse(
+        run_id=state["run_id"],
         prompt=state["prompt"],
         content_type=state["content_type"],
         platform=state["platform"],
@@ -45,7 +75,11 @@ async def create_content(
         story_structure=state["story_structure"],
         final_blueprint=state["final_blueprint"],
         score=state["score"],
+        section_scores=state.get("section_scores", {}),
+        degraded=state.get("degraded", False),
+        skipped_nodes=state.get("skipped_nodes", []),
         iteration_count=state["iteration_count"],
+        warm=state.get("warm") or {},
     )
 
 
@@ -55,17 +89,33 @@ async def stream_create(
     content_type: str = Query("reel"),
     duration: int = Query(30, ge=5, le=3600),
     platform: str = Query("instagram"),
+    deadline: Optional[float] = Query(None, gt=0, le=3600),
+    preview: bool = Query(False, description="Stream a fast draft blueprint before the full result"),
+    fresh: bool = Query(False, description="Always run the pipeline, even if a precomputed blueprint exists"),
     service: CreatorWorkflowService = Depends(get_creator_service),
+    scheduler: FairScheduler = Depends(get_scheduler),
+    tenant: str = Depends(get_tenant),
 ) -> StreamingResponse:
+    # Refuse up front so the client gets a 429 rather than an error event.
+    try:
+        scheduler.check_admission(tenant)
+    except SchedulerRejected as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
+
     async def event_generator() -> AsyncGenerator[str, None]:
         try:
-            async for payload in service.stream_create(
-                prompt=prompt,
-                content_type=content_type,
-                duration_seconds=duration,
-                platform=platform,
-            ):
-                yield format_sse(payload["event"], payload)
+            # Streams are watched by a person, so they always run as interactive.
+            async with scheduler.slot(tenant, "interactive"):
+                async for payload in service.stream_create(
+                    prompt=prompt,
+                    content_type=content_type,
+                    duration_seconds=duration,
+                    platform=platform,
+                    deadline_seconds=deadline,
+                    preview=preview,
+                    fresh=fresh,
+                ):
+                    yield format_sse(payload["event"], payload)
         except Exception as exc:  # pragma: no cover
             logger.exception("Streaming failed")
             yield format_sse("error", {"event": "error", "message": str(exc)})
@@ -79,3 +129,106 @@ async def stream_create(
             "X-Accel-Buffering": "no",
         },
     )
+
+
+@router.get("/metrics/scheduler")
+async def scheduler_metrics(scheduler: FairScheduler = Depends(get_scheduler)) -> Dict[str, Any]:
+    return scheduler.metrics()
+
+
+@router.get("/metrics/llm")
+async def llm_metrics(service: CreatorWorkflowService = Depends(get_creator_service)) -> Dict[str, Any]:
+    """Per-node latency, hedging and output-budget utilization of the LLM client."""
+    return service.llm_client.stats()
+
+
+@router.get("/metrics/analyzer")
+async def analyzer_metrics(service: CreatorWorkflowService = Depends(get_creator_service)) -> Dict[str, Any]:
+    """Analysis cache hits and how many analyses came from the local classifier vs the LLM."""
+    return service.analysis_cache.snapshot()
+
+
+@router.get("/metrics/quality-gate")
+async def quality_gate_metrics() -> Dict[str, Any]:
+    """Quality gate verdicts and how many LLM critic calls they saved."""
+    return get_gate_stats().snapshot()
+
+
+@router.get("/metrics/cache-warming")
+async def cache_warming_metrics(warmer: Optional[CacheWarmer] = Depends(get_cache_warmer)) -> Dict[str, Any]:
+    """Warm-cache hits and the warmer's cycles, quota and last result."""
+    if warmer is None:
+        return {"enabled": False}
+    return {"enabled": True, **warmer.stats()}
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: str, profiler: Optional[SamplingProfiler] = Depends(get_profiler)) -> str:
+    """Collapsed-stack profile of a request sent with ``X-Profile: 1`` (id from ``X-Profile-Id``)."""
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    profile = profiler.load(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found (or the request is still running)")
+    return profile
+
+
+def require_history(store: Optional[RunHistoryStore] = Depends(get_history_store)) -> RunHistoryStore:
+    if store is None:
+        raise HTTPException(status_code=404, detail="Run history is disabled")
+    return store
+
+
+# Sync handlers: SQLite reads run in FastAPI's threadpool, off the event loop.
+@router.get("/runs", response_model=RunListResponse)
+def list_runs(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    platform: Optional[str] = Query(None),
+    store: RunHistoryStore = Depends(require_history),
+) -> RunListResponse:
+    try:
+        runs, next_cursor = store.list_runs(limit=limit, cursor=cursor, platform=platform)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return RunListResponse(runs=runs, next_cursor=next_cursor)
+
+
+@router.get("/runs/search", response_model=List[RunSummary])
+def search_runs(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    sort: Literal["recent", "relevance"] = Query("recent"),
+    store: RunHistoryStore = Depends(require_history),
+) -> List[RunSummary]:
+    return store.search(q, limit=limit, offset=offset, sort=sort)
+
+
+@router.get("/runs/{run_id}", response_model=RunDetail)
+def get_run(run_id: str, store: RunHistoryStore = Depends(require_history)) -> RunDetail:
+    record = store.get(run_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return record
+
+
+@router.get("/runs/{run_id}/blueprint")
+def get_blueprint(
+    run_id: str,
+    format: Optional[str] = Query(None, description="markdown, html, csv (shot list) or json"),
+    accept: Optional[str] = Header(None),
+    store: RunHistoryStore = Depends(require_history),
+    cache: RenderCache = Depends(get_render_cache),
+) -> Response:
+    """A finished run's blueprint, rendered on first request per format and cached."""
+    fmt = negotiate_format(format, accept)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{format}'")
+    record = store.get(run_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    headers = {"Vary": "Accept"}
+    if fmt == "csv":
+        headers["Content-Disposition"] = f'attachment; filename="shot-list-{run_id}.csv"'
+    return Response(cache.render(record["state"], fmt), media_type=MEDIA_TYPES[fmt], headers=headers)
@@ -0,0 +1,168 @@
+"""WebSocket endpoint multiplexing many pipeline runs over one connection.
+
+Client → server messages (JSON):
+  {"type": "start", "request_id": "c1", "prompt": "...", "content_type": "reel",
+   "duration_seconds": 30, "platform": "instagram", "deadline_seconds": null, "preview": false}
+  {"type": "watch", "run_id": "...", "after": 12}     resume from the last seq received
+  {"type": "unwatch", "run_id": "..."}
+  {"type": "cancel", "run_id": "..."}
+
+Server → client messages are the ``stream_create`` events (``start``, ``preview``,
+``node``, ``done``) tagged with ``run_id`` and a per-run ``seq``, followed by a
+``closed`` event when the run ends (``cancelled`` / ``error`` replace ``done``).
+Replies to control messages are ``started``, ``watching`` and ``error`` events.
+
+Run events pass through one bounded queue per connection. When the client reads
+slowly the queue fills and the per-run forwarders wait; runs keep executing and
+their events stay in the run registry buffer until forwarded. Control replies
+have their own small queue, sent first, so a backed-up run never delays them.
+
+A connection only sees runs of its own tenant: watching or cancelling anyone
+else's run gets the same error as an unknown run id.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from app.core.config import get_settings
+from app.schemas.models import CreateRequest
+from app.services.report_service import CreatorWorkflowService, get_creator_service
+from app.services.run_registry import RunHandle, RunRegistry, get_run_registry
+from app.services.scheduler import FairScheduler, SchedulerRejected, get_scheduler, resolve_tenant
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Control replies waiting to be sent; past this the client isn't reading at all.
+_CONTROL_QUEUE_SIZE = 64
+
+
+@router.websocket("/ws")
+async def runs_socket(
+    websocket: WebSocket,
+    service: CreatorWorkflowService = Depends(get_creator_service),
+    scheduler: FairScheduler = Depends(get_scheduler),
+    registry: RunRegistry = Depends(get_run_registry),
+) -> None:
+    await websocket.accept()
+    settings = get_settings()
+    tenant = resolve_tenant(websocket, settings)
+    outbox: asyncio.Queue = asyncio.Queue(maxsize=settings.ws_send_queue_size)
+    control: asyncio.Queue = asyncio.Queue(maxsize=_CONTROL_QUEUE_SIZE)
+    wakeup = asyncio.Event()
+    watchers: Dict[str, asyncio.Task] = {}
+    started: Dict[str, RunHandle] = {}
+
+    async def send_loop() -> None:
+        while True:
+            if not control.empty():
+                message = control.get_nowait()
+            elif not outbox.empty():
+                message = outbox.get_nowait()
+            else:
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+            await websocket.send_text(json.dumps(message, ensure_ascii=False))
+
+    async def forward(handle: RunHandle, after: int) -> None:
+        async for event in handle.events(after):
+            await outbox.put(event)  # blocks while the client is behind
+            wakeup.set()
+        watchers.pop(handle.run_id, None)
+
+    def watch(handle: RunHandle, after: int = -1) -> None:
+        previous = watchers.pop(handle.run_id, None)
+        if previous is not None:
+            previous.cancel()
+        watchers[handle.run_id] = asyncio.create_task(forward(handle, after))
+
+    def reply(message: Dict[str, Any]) -> None:
+        try:
+            control.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("Dropping WebSocket reply for tenant %s: client is not reading", tenant)
+            return
+        wakeup.set()
+
+    def active_runs() -> int:
+        for run_id in [run_id for run_id, handle in started.items() if handle.finished]:
+            del started[run_id]
+        return len(started)
+
+    async def handle_message(message: Dict[str, Any]) -> None:
+        kind = message.get("type")
+        run_id = str(message.get("run_id", ""))
+        if kind == "start":
+            if active_runs() >= settings.ws_max_runs_per_connection:
+                reply({"event": "error", "request_id": message.get("request_id"),
+                       "message": "Too many runs on this connection"})
+                return
+            try:
+                request = CreateRequest(**{k: v for k, v in message.items() if k in CreateRequest.model_fields})
+                handle = registry.start(
+                    service,
+                    scheduler,
+                    tenant,
+                    prompt=request.prompt,
+                    content_type=request.content_type,
+                    duration_seconds=request.duration_seconds,
+                    platform=request.platform,
+                    deadline_seconds=request.deadline_seconds,
+                    preview=bool(message.get("preview", False)),
+                    fresh=request.fresh,
+                )
+            except ValidationError as exc:
+                reply({"event": "error", "request_id": message.get("request_id"),
+                       "message": exc.errors()[0]["msg"]})
+                return
+            except SchedulerRejected as exc:
+                reply({"event": "error", "request_id": message.get("request_id"), "message": str(exc)})
+                return
+            started[handle.run_id] = handle
+            reply({"event": "started", "request_id": message.get("request_id"), "run_id": handle.run_id})
+            watch(handle)
+        elif kind in ("watch", "cancel", "unwatch"):
+            handle = registry.get(run_id)
+            if handle is None or handle.tenant != tenant:
+                reply({"event": "error", "run_id": run_id, "message": "Unknown or expired run"})
+            elif kind == "watch":
+                try:
+                    after = int(message.get("after", -1))
+                except (TypeError, ValueError):
+                    reply({"event": "error", "run_id": run_id, "message": "'after' must be an integer seq"})
+                    return
+                reply({"event": "watching", "run_id": run_id, "status": handle.status})
+                watch(handle, after)
+            elif kind == "cancel":
+                registry.cancel(run_id)
+            else:
+                task = watchers.pop(run_id, None)
+                if task is not None:
+                    task.cancel()
+        else:
+            reply({"event": "error", "message": f"Unknown message type: {kind!r}"})
+
+    sender = asyncio.create_task(send_loop())
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                message = json.loads(raw)
+            except json.JSONDecodeError:
+                reply({"event": "error", "message": "Messages must be JSON"})
+                continue
+            if isinstance(message, dict):
+                await handle_message(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Runs keep going after a disconnect; the client can watch them again.
+        for task in [sender, *watchers.values()]:
+            task.cancel()
@@ -0,0 +1,42 @@
+"""Command-line entry point for offline batch runs.
+
+Usage:
+  python -m app.batch briefs.jsonl results.jsonl [--concurrency 4] [--rpm 30]
+
+Each input line is a ``CreateRequest``-shaped object with an optional ``id``.
+Results are appended to the output file as runs finish; rerunning the same
+command after a crash skips the IDs that already completed.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from app.core.config import get_settings
+from app.core.logging import configure_logging
+from app.services.batch_service import BatchRunner
+from app.services.report_service import get_creator_service
+
+
+def main(argv: list[str] | None = None) -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run a JSONL file of briefs through the creator pipeline.")
+    parser.add_argument("input", type=Path, help="JSONL file of CreateRequest records")
+    parser.add_argument("output", type=Path, help="JSONL file that results are appended to")
+    parser.add_argument("--concurrency", type=int, default=settings.batch_concurrency)
+    parser.add_argument(
+        "--rpm", type=float, default=settings.batch_requests_per_minute,
+        help="Maximum runs started per minute (0 = unlimited)",
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    runner = BatchRunner(get_creator_service(), concurrency=args.concurrency, requests_per_minute=args.rpm)
+    report = asyncio.run(runner.run(args.input, args.output))
+    print(report.summary())
+    return 1 if report.failed or report.invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
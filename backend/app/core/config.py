@@ -1,7 +1,7 @@
 """Application settings and environment loading."""
 
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Literal
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -23,10 +23,171 @@ class Settings(BaseSettings):
 
     groq_api_key: str = Field("", description="Groq API key")
     groq_model: str = "llama-3.3-70b-versatile"
+    # Small, fast model for the draft preview (analyzer → script → finalizer).
+    draft_model: str = "llama-3.1-8b-instant"
+
+    # Logging: JSON lines (or "text") written by a background thread.
+    log_format: Literal["json", "text"] = "json"
+    log_level: str = "INFO"
+    log_queue_size: int = 10_000
+    # Per message template: first N records per window pass, then 1 in every M.
+    log_sample_burst: int = 20
+    log_sample_every: int = 10
+    log_sample_window_seconds: float = 10.0
+
+    # Tracing: OTLP/JSON spans to a file and/or an OTLP/HTTP collector.
+    tracing_enabled: bool = False
+    trace_export_path: str = "./data/traces/spans.jsonl"
+    trace_otlp_endpoint: str = ""
+    # Per-request sampling profiles, requested with the X-Profile: 1 header.
+    profiling_enabled: bool = False
+    profile_interval_ms: float = 5.0
+    profile_dir: str = "./data/profiles"
+
+    # Local analyzer: briefs it classifies with at least this confidence skip
+    # the LLM analyzer call. Analyses are cached per normalised brief.
+    local_analyzer_enabled: bool = True
+    local_analyzer_min_confidence: float = 0.6
+    analysis_cache_size: int = 1024
 
     max_iterations: int = 2
     min_quality_score: int = 7
 
+    # Quality strategy. "refine" runs the critic → refiner loop; "best_of_n"
+    # writes script_candidates scripts concurrently (one temperature each, in
+    # turn), ranks them in one batched critic call and sends only the winner
+    # through timeline/enhancement/story, with no refine loop.
+    quality_mode: Literal["refine", "best_of_n"] = "refine"
+    script_candidates: int = Field(3, ge=1, le=8)
+    candidate_temperatures: List[float] = Field(default_factory=lambda: [0.4, 0.8, 1.0])
+
+    # Rule-based quality gate before the LLM critic. A decisive failure goes
+    # straight to the refiner; a clean pass may skip the critic when enabled.
+    quality_gate_enabled: bool = True
+    gate_skip_critic_on_pass: bool = False
+    gate_min_timeline_coverage: float = 0.8
+    gate_max_timeline_overrun: float = 1.3
+    gate_words_per_second: float = 2.5
+    gate_max_script_ratio: float = 1.6
+    gate_min_hashtags: int = 5
+
+    # Per-request time budget (seconds, 0 = unbounded). Requests may override it.
+    request_deadline_seconds: float = 0.0
+    # Time kept back for the finalizer when bounding optional agents.
+    deadline_finalize_reserve_seconds: float = 2.0
+    # Minimum time left to start another critic → refiner loop.
+    deadline_min_refine_seconds: float = 25.0
+
+    # Output-token budgets (max_tokens) per agent. Base values fit 30 s of
+    # short-form; per-minute allowances are added for longer pieces, then the
+    # result is scaled by content type and platform and clamped.
+    output_budgets_enabled: bool = True
+    node_output_tokens: Dict[str, int] = Field(
+        default_factory=lambda: {
+            "analyzer": 400,
+            "script_writer": 700,
+            "timeline_planner": 900,
+            "enhancer": 700,
+            "story_architect": 600,
+            "critic": 450,
+            "refiner": 600,
+            "ranker": 900,
+        }
+    )
+    node_output_tokens_per_minute: Dict[str, int] = Field(
+        default_factory=lambda: {
+            "script_writer": 450,
+            "timeline_planner": 600,
+            "story_architect": 120,
+            "refiner": 200,
+        }
+    )
+    content_type_token_scale: Dict[str, float] = Field(
+        default_factory=lambda: {"youtube": 1.2, "film": 1.4, "podcast": 1.3}
+    )
+    platform_token_scale: Dict[str, float] = Field(default_factory=lambda: {"youtube": 1.1})
+    min_output_tokens: int = 256
+    max_output_tokens: int = 6000
+    # Calls cut off at max_tokens are continued up to this many times.
+    max_output_continuations: int = 2
+    # Reels/shorts up to this length get the compact enhancement brief.
+    short_form_max_seconds: int = 90
+
+    # Hedged LLM requests: duplicate a call once it is slower than the node's
+    # recent latency percentile, capped at a fraction of all calls.
+    llm_hedging_enabled: bool = False
+    llm_hedge_percentile: float = 95.0
+    llm_hedge_min_samples: int = 20
+    llm_hedge_window: int = 200
+    llm_hedge_budget_ratio: float = 0.1
+
+    # LLM cassettes: "record" captures every call, "replay" serves them offline.
+    llm_cassette_mode: Literal["off", "record", "replay"] = "off"
+    llm_cassette_path: str = "./data/cassettes/llm.jsonl.gz"
+    # Replay with the recorded latencies instead of instantly.
+    llm_cassette_realtime: bool = False
+
+    # Run history (SQLite + FTS5). Retention/max of 0 keeps everything.
+    history_enabled: bool = True
+    history_db_path: str = "./data/history/runs.db"
+    history_retention_days: float = 0.0
+    history_max_runs: int = 0
+    history_compact_interval_seconds: float = 3600.0
+
+    # Cache warming: during quiet periods, precompute blueprints for the most
+    # frequent and fastest-rising briefs in the run history (top-K, under a daily
+    # quota) and serve identical briefs from them with freshness metadata.
+    cache_warming_enabled: bool = False
+    warm_top_k: int = 20
+    warm_min_runs: int = 3
+    warm_recent_hours: float = 24.0
+    warm_baseline_days: float = 7.0
+    # Extra score per run above a brief's baseline rate (rising briefs first).
+    warm_rising_weight: float = 2.0
+    warm_daily_quota: int = 100
+    warm_interval_seconds: float = 900.0
+    # UTC hours when warming may run (empty = any hour) and the most active
+    # runs (running + queued) at which the service still counts as quiet.
+    warm_quiet_hours_utc: List[int] = Field(default_factory=list)
+    warm_max_active_runs: int = 0
+    warm_ttl_seconds: float = 6 * 3600
+    # Entries older than this fraction of the TTL are recomputed if still trending.
+    warm_refresh_fraction: float = 0.5
+    warm_cache_size: int = 256
+
+    # Fair scheduling of pipeline runs across tenants (by X-API-Key).
+    scheduler_max_concurrency: int = 8
+    scheduler_max_queue: int = 200
+    tenant_max_concurrency: int = 2
+    # Relative share per tenant (default 1.0), e.g. {"acme": 3}.
+    tenant_weights: Dict[str, float] = Field(default_factory=dict)
+    # Maps API keys to tenant names; unknown keys share the "unknown" tenant.
+    tenant_api_keys: Dict[str, str] = Field(default_factory=dict)
+    # Give each unknown key its own hashed tenant; only where keys are verified
+    # upstream, or rotating keys escapes per-tenant limits.
+    tenant_hash_unknown_keys: bool = False
+    # Take the tenant from X-Tenant-ID; only behind a proxy that authenticates
+    # callers and sets the header itself.
+    trust_tenant_header: bool = False
+    # LLM tokens each tenant may use per window (0 = unlimited).
+    tenant_token_budget: int = 0
+    tenant_budget_window_seconds: float = 3600.0
+
+    # WebSocket runs (/api/ws): events buffered per run for watchers and resume.
+    run_event_buffer: int = 256
+    run_retention_seconds: float = 300.0
+    # Unfinished runs one connection may have started.
+    ws_max_runs_per_connection: int = 16
+    # Outgoing messages queued per connection before watchers wait on the client.
+    ws_send_queue_size: int = 64
+
+    # Rendered blueprints (HTML / CSV / JSON) kept per run.
+    render_cache_size: int = 256
+
+    # Offline batch runner (python -m app.batch)
+    batch_concurrency: int = 4
+    batch_requests_per_minute: float = 0.0
+
     cors_origins: List[str] = Field(
         default_factory=lambda: [
             "http://localhost:5173",
@@ -1,13 +1,184 @@
-"""Logging setup helpers."""
+"""Logging setup helpers.
 
+Records are handed to a bounded in-memory queue on the calling thread and written
+by a ``QueueListener`` thread, so a slow stdout (e.g. a Docker log driver under
+back-pressure) never blocks the event loop. Output is one JSON object per line
+carrying the ``run_id`` and ``node`` bound with ``log_context``. Repetitive
+INFO/DEBUG messages are sampled after a per-window burst; warnings and errors are
+never sampled. ``shutdown_logging`` drains the queue at exit and switches the
+root logger to writing synchronously.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import IO, Any, Dict, Iterator, Optional, Tuple
+
+from app.core.config import Settings, get_settings
+
+_run_id: contextvars.ContextVar[str] = contextvars.ContextVar("log_run_id", default="")
+_node: contextvars.ContextVar[str] = contextvars.ContextVar("log_node", default="")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+@contextmanager
+def log_context(run_id: Optional[str] = None, node: Optional[str] = None) -> Iterator[None]:
+    """Bind ``run_id`` / ``node`` to every record logged inside the block."""
+    tokens = []
+    if run_id is not None:
+        tokens.append((_run_id, _run_id.set(run_id)))
+    if node is not None:
+        tokens.append((_node, _node.set(node)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the bound run/node context onto each record, on the calling thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.run_id = _run_id.get()
+        record.node = _node.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Passes the first ``burst`` records per message template and window, then 1 in ``every``."""
+
+    def __init__(self, burst: int = 20, every: int = 10, window_seconds: float = 10.0):
+        super().__init__()
+        self.burst = burst
+        self.every = max(1, every)
+        self.window_seconds = window_seconds
+        self._counts: Dict[Tuple[str, Any], Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.burst <= 0:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            started, count = self._counts.get(key, (now, 0))
+            if now - started >= self.window_seconds:
+                started, count = now, 0
+            count += 1
+            self._counts[key] = (started, count)
+            if len(self._counts) > 10_000:
+                self._counts.clear()
+        if count <= self.burst or (count - self.burst) % self.every == 0:
+            return True
+        self.suppressed += 1
+        return False
+
 
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in ("run_id", "node"):
+            value = getattr(record, field, "")
+            if value:
+                entry[field] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        elif record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
 
-def configure_logging() -> None:
-    """Configure structured-ish, production-safe console logging."""
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        handlers=[logging.StreamHandler(sys.stdout)],
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues without blocking; drops (and counts) records when the queue is full."""
+
+    def __init__(self, log_queue: "queue.Queue[Any]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args and render tracebacks now (the objects may change later), but
+        # leave the JSON formatting to the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(settings: Optional[Settings] = None, stream: Optional[IO[str]] = None) -> None:
+    """Install the queue-backed logging pipeline on the root logger (writing to stdout)."""
+    global _listener
+    settings = settings or get_settings()
+    shutdown_logging()
+
+    sink = logging.StreamHandler(stream or sys.stdout)
+    if settings.log_format == "json":
+        sink.setFormatter(JsonFormatter())
+    else:
+        sink.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s"))
+
+    log_queue: "queue.Queue[Any]" = queue.Queue(maxsize=settings.log_queue_size)
+    handler = _NonBlockingQueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+    handler.addFilter(
+        SamplingFilter(settings.log_sample_burst, settings.log_sample_every, settings.log_sample_window_seconds)
     )
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.log_level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, sink, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Write out every queued record and stop the listener thread.
+
+    The root logger then writes to the sink directly, so records logged later
+    (lifespan teardown, atexit hooks) are not left in a queue nobody drains.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, _NonBlockingQueueHandler) and handler.queue is _listener.queue:
+            root.removeHandler(handler)
+            for sink in _listener.handlers:
+                for log_filter in handler.filters:
+                    sink.addFilter(log_filter)
+                root.addHandler(sink)
+    _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,130 @@
+"""Opt-in sampling profiler for single requests.
+
+A request sent with ``X-Profile: 1`` (when ``profiling_enabled``) is sampled by
+a background thread that reads the event loop thread's stack every
+``profile_interval_ms``. The samples are saved as collapsed stacks
+(``frame;frame;frame count`` lines, the input format of flamegraph.pl and
+speedscope) under ``profile_dir`` and served by ``GET /api/profiles/{id}``.
+
+The event loop is shared, so a profile also contains whatever other requests
+ran on the loop at the same time.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from types import FrameType
+from typing import Dict, Optional
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+@dataclass
+class ProfileSession:
+    profile_id: str
+    thread_id: int
+    started: float = field(default_factory=time.perf_counter)
+    samples: Counter = field(default_factory=Counter)
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    path = Path(code.co_filename)
+    return f"{code.co_name} ({path.parent.name}/{path.name}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame: Optional[FrameType]) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Samples the stacks of profiled requests' threads from one background thread."""
+
+    def __init__(self, out_dir: str, interval_ms: float = 5.0, max_sessions: int = 2, max_seconds: float = 300.0):
+        self.out_dir = Path(out_dir)
+        self.interval = interval_ms / 1000
+        self.max_sessions = max_sessions
+        self.max_seconds = max_seconds
+        self._sessions: Dict[str, ProfileSession] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> Optional[ProfileSession]:
+        """Begin sampling the calling thread; ``None`` if too many profiles are running."""
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                logger.warning("Profile request ignored: %d profiles already running", len(self._sessions))
+                return None
+            session = ProfileSession(profile_id=uuid.uuid4().hex, thread_id=threading.get_ident())
+            self._sessions[session.profile_id] = session
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+                self._thread.start()
+        return session
+
+    def _sample_loop(self) -> None:
+        while True:
+            with self._lock:
+                sessions = list(self._sessions.values())
+                if not sessions:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            now = time.perf_counter()
+            for session in sessions:
+                if now - session.started > self.max_seconds:
+                    continue
+                frame = frames.get(session.thread_id)
+                if frame is not None:
+                    session.samples[collapse_stack(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+    def stop(self, session: ProfileSession) -> Path:
+        """Stop sampling and write the collapsed-stack artifact."""
+        with self._lock:
+            self._sessions.pop(session.profile_id, None)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / f"{session.profile_id}.folded"
+        lines = [f"{stack} {count}" for stack, count in session.samples.most_common()]
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, path)
+        logger.info(
+            "Profile %s: %d samples over %.2fs",
+            session.profile_id, sum(session.samples.values()), time.perf_counter() - session.started,
+        )
+        return path
+
+    def load(self, profile_id: str) -> Optional[str]:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = self.out_dir / f"{profile_id}.folded"
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+
+@lru_cache(maxsize=1)
+def get_profiler() -> Optional[SamplingProfiler]:
+    """Process-wide profiler, or ``None`` when profiling is disabled."""
+    settings = get_settings()
+    if not settings.profiling_enabled:
+        return None
+    return SamplingProfiler(settings.profile_dir, interval_ms=settings.profile_interval_ms)
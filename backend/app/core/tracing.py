@@ -0,0 +1,245 @@
+"""Lightweight request tracing with OTLP/JSON export.
+
+``span(name, **attributes)`` times a block and nests under the span active in the
+current context, so one request yields a tree: the HTTP handler, each graph node,
+each LLM call, JSON parsing and SSE serialization. Finished spans are batched by
+a background thread and written as OTLP ``ExportTraceServiceRequest`` JSON, one
+request per line, to ``trace_export_path`` and/or POSTed to an OTLP/HTTP
+collector at ``trace_otlp_endpoint`` (``/v1/traces``). With tracing disabled,
+``span`` is a no-op.
+
+``TracingMiddleware`` opens the root span for every API request, returns its id
+in ``X-Trace-Id`` and, when the client sends ``X-Profile: 1`` and profiling is
+enabled, samples the request with ``app.core.profiling``.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+from app.core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+_exporter: Optional["SpanExporter"] = None
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str = ""
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: str = ""
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        otlp: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            otlp["parentSpanId"] = self.parent_id
+        return otlp
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class _NoopSpan:
+    trace_id = span_id = ""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class SpanExporter:
+    """Batches finished spans and writes them as OTLP/JSON from a worker thread."""
+
+    def __init__(self, service_name: str, path: str = "", endpoint: str = "", batch_size: int = 512):
+        self.service_name = service_name
+        self.path = Path(path) if path else None
+        self.endpoint = endpoint.rstrip("/")
+        self.batch_size = batch_size
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=50_000)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{"scope": {"name": "bb-create"}, "spans": [s.to_otlp() for s in spans]}],
+            }]
+        }
+
+    def _write(self, spans: List[Span]) -> None:
+        payload = self._payload(spans)
+        if self.path is not None:
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(payload, default=str) + "\n")
+        if self.endpoint:
+            try:
+                httpx.post(f"{self.endpoint}/v1/traces", json=payload, timeout=5.0)
+            except httpx.HTTPError as exc:
+                logger.warning("OTLP export to %s failed: %s", self.endpoint, exc)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [] if item is None else [item]
+            stop = item is None
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=0.5)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                try:
+                    self._write(batch)
+                except OSError:
+                    logger.exception("Failed to export %d spans", len(batch))
+            if stop:
+                return
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=10)
+
+
+def configure_tracing(settings: Optional[Settings] = None) -> None:
+    """Start the exporter when tracing is enabled (call once at startup)."""
+    global _exporter
+    settings = settings or get_settings()
+    shutdown_tracing()
+    if settings.tracing_enabled:
+        _exporter = SpanExporter(
+            settings.app_name,
+            path=settings.trace_export_path,
+            endpoint=settings.trace_otlp_endpoint,
+        )
+
+
+def shutdown_tracing() -> None:
+    global _exporter
+    if _exporter is not None:
+        _exporter.close()
+        _exporter = None
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Record ``name`` as a child of the current span (a no-op when tracing is off)."""
+    if _exporter is None:
+        yield _NOOP
+        return
+    parent = _current.get()
+    current = Span(
+        name=name,
+        trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+        span_id=os.urandom(8).hex(),
+        parent_id=parent.span_id if parent else "",
+        attributes=attributes,
+    )
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        exporter = _exporter
+        if exporter is not None:
+            exporter.export(current)
+
+
+class TracingMiddleware:
+    """ASGI middleware: root span per request, ``X-Trace-Id`` and opt-in profiling."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        from app.core.profiling import get_profiler
+
+        headers = dict(scope.get("headers") or [])
+        profiler = get_profiler() if headers.get(b"x-profile") in (b"1", b"true") else None
+        session = profiler.start() if profiler is not None else None
+
+        with span(f"{scope['method']} {scope['path']}", **{"http.method": scope["method"], "http.target": scope["path"]}) as root:
+
+            async def send_with_headers(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    root.set(**{"http.status_code": message["status"]})
+                    extra = []
+                    if root.trace_id:
+                        extra.append((b"x-trace-id", root.trace_id.encode()))
+                    if session is not None:
+                        extra.append((b"x-profile-id", session.profile_id.encode()))
+                    if extra:
+                        message = {**message, "headers": [*message.get("headers", []), *extra]}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                if session is not None:
+                    profiler.stop(session)
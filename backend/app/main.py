@@ -1,16 +1,44 @@
 """FastAPI entrypoint."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import router
+from app.api.ws import router as ws_router
 from app.core.config import get_settings
-from app.core.logging import configure_logging
+from app.core.logging import configure_logging, shutdown_logging
+from app.core.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
+from app.services.cache_warmer import get_cache_warmer
+from app.services.history_service import get_history_store
+from app.services.report_service import get_creator_service
 
 configure_logging()
+configure_tracing()
 settings = get_settings()
 
-app = FastAPI(title=settings.app_name)
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    warmer = get_cache_warmer() if settings.cache_warming_enabled else None
+    if warmer is not None:
+        warmer.start()
+    yield
+    if warmer is not None:
+        await warmer.stop()
+    # Only tear down the service if a request actually created it.
+    if get_creator_service.cache_info().currsize:
+        get_creator_service().llm_client.close()
+    if get_history_store.cache_info().currsize and get_history_store() is not None:
+        get_history_store().close()
+    shutdown_tracing()
+    shutdown_logging()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+
+app.add_middleware(TracingMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,6 +46,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id", "X-Profile-Id"],
 )
 
 app.include_router(router, prefix=settings.api_prefix)
+app.include_router(ws_router, prefix=settings.api_prefix)
@@ -1,6 +1,6 @@
 """Request/response models for the API layer."""
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -10,9 +10,14 @@ class CreateRequest(BaseModel):
     content_type: str = Field("reel", description="reel, short, youtube, film, podcast")
     duration_seconds: int = Field(30, ge=5, le=3600)
     platform: str = Field("instagram", description="instagram, youtube, tiktok, general")
+    deadline_seconds: Optional[float] = Field(
+        None, gt=0, le=3600, description="Time budget for this run; overrides the server default"
+    )
+    fresh: bool = Field(False, description="Always run the pipeline, even if a precomputed blueprint exists")
 
 
 class CreateResponse(BaseModel):
+    run_id: str
     prompt: str
     content_type: str
     platform: str
@@ -23,7 +28,34 @@ class CreateResponse(BaseModel):
     story_structure: Dict[str, Any]
     final_blueprint: str
     score: int
+    section_scores: Dict[str, int] = Field(default_factory=dict)
+    degraded: bool = False
+    skipped_nodes: List[str] = Field(default_factory=list)
     iteration_count: int
+    warm: Dict[str, Any] = Field(default_factory=dict, description="Freshness metadata for precomputed blueprints")
+
+
+class RunSummary(BaseModel):
+    run_id: str
+    created_at: float
+    prompt: str
+    content_type: str
+    platform: str
+    duration_seconds: int
+    score: int
+    iteration_count: int
+    degraded: bool
+    elapsed_seconds: float
+
+
+class RunListResponse(BaseModel):
+    runs: List[RunSummary]
+    next_cursor: Optional[str] = None
+
+
+class RunDetail(RunSummary):
+    timings: Dict[str, float]
+    state: Dict[str, Any]
 
 
 class HealthResponse(BaseModel):
@@ -6,17 +6,23 @@ from typing import Any, Dict, List, TypedDict
 class CreatorState(TypedDict):
     """State object read/written by every agent in the creator graph."""
 
+    run_id: str                        # Unique id of this pipeline run
+
     # ── User input ──
     prompt: str                        # Raw user prompt
     content_type: str                  # reel, short, youtube, film, podcast, etc.
     duration_seconds: int              # Target duration in seconds
     platform: str                      # instagram, youtube, tiktok, etc.
+    deadline_at: float                 # Wall-clock (epoch) deadline; 0 = unbounded
 
     # ── Analyzer output ──
     analysis: Dict[str, Any]           # genre, language, region, tone, audience, etc.
+    analysis_source: str               # local / llm / cache
+    analysis_confidence: float         # local analyzer confidence (1.0 for LLM and cached analyses)
 
     # ── Script Writer output ──
     script: str                        # Full script with dialogue + visual cues
+    candidates: List[Dict[str, Any]]   # best-of-N: temperature, score and critique per candidate
 
     # ── Timeline Planner output ──
     timeline: List[Dict[str, Any]]     # Shot-by-shot breakdown
@@ -27,11 +33,25 @@ class CreatorState(TypedDict):
     # ── Story Architect output ──
     story_structure: Dict[str, Any]    # narrative arc, pacing, emotion beats
 
+    # ── Quality gate (rule-based, before the critic) ──
+    gate_verdict: str                  # fail / pass / uncertain
+    gate_action: str                   # refine / finalize / critic
+    gate_findings: List[str]           # failed checks with their messages
+
     # ── Quality loop ──
     critique: str
     score: int
+    section_scores: Dict[str, int]     # per-section critic scores (hook, dialogue, cta, ...)
+    section_feedback: Dict[str, str]   # per-section critic feedback
+    revised_sections: List[str]        # sections patched by the last refiner pass
+    refiner_stalled: bool              # the last refiner pass applied no edits
     iteration_count: int
 
+    # ── Deadline handling ──
+    degraded: bool                     # True when agents were dropped to meet the deadline
+    skipped_nodes: List[str]           # Agents dropped or cut short by the deadline
+
     # ── Final output ──
     final_blueprint: str               # Complete production blueprint (markdown)
+    warm: Dict[str, Any]               # Freshness metadata when served from the warm cache, else {}
 
@@ -0,0 +1,194 @@
+"""Offline batch runner: JSONL briefs in, JSONL ``CreatorState`` results out."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Set
+
+from pydantic import ValidationError
+
+from app.schemas.models import CreateRequest
+from app.services.report_service import CreatorWorkflowService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchReport:
+    total: int = 0
+    skipped: int = 0
+    completed: int = 0
+    failed: int = 0
+    invalid: int = 0
+    elapsed_seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def runs_per_minute(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return (self.completed + self.failed) * 60 / self.elapsed_seconds
+
+    def summary(self) -> str:
+        return (
+            f"{self.completed} completed, {self.failed} failed, {self.skipped} skipped "
+            f"(already done), {self.invalid} invalid of {self.total} in "
+            f"{self.elapsed_seconds:.1f}s — {self.runs_per_minute:.1f} runs/min"
+        )
+
+
+class RateLimiter:
+    """Token bucket limiting how many runs may start per minute (0 = unlimited)."""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def record_id(record: Dict[str, Any]) -> str:
+    """Use the record's ``id`` or a stable hash of its request fields, so reruns match."""
+    if record.get("id") not in (None, ""):
+        return str(record["id"])
+    fields = {k: record.get(k) for k in CreateRequest.model_fields}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def read_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield JSON objects from a JSONL file, skipping blank and corrupt lines."""
+    with path.open("r", encoding="utf-8") as handle:
+        for lineno, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Typically the torn last line of a crashed run.
+                logger.warning("%s:%d is not valid JSON; ignored", path, lineno)
+
+
+def finished_ids(output_path: Path) -> Set[str]:
+    """IDs already completed successfully in a previous (possibly crashed) run."""
+    if not output_path.exists():
+        return set()
+    return {str(r["id"]) for r in read_jsonl(output_path) if r.get("status") == "ok" and "id" in r}
+
+
+def _has_torn_tail(path: Path) -> bool:
+    if not path.exists() or path.stat().st_size == 0:
+        return False
+    with path.open("rb") as handle:
+        handle.seek(-1, 2)
+        return handle.read(1) != b"\n"
+
+
+class BatchRunner:
+    """Runs many briefs through ``CreatorWorkflowService`` with bounded concurrency."""
+
+    def __init__(
+        self,
+        service: CreatorWorkflowService,
+        concurrency: int = 4,
+        requests_per_minute: float = 0.0,
+        progress_every: int = 10,
+    ):
+        self.service = service
+        self.concurrency = max(1, concurrency)
+        self.limiter = RateLimiter(requests_per_minute)
+        self.progress_every = progress_every
+
+    async def run(self, input_path: Path, output_path: Path) -> BatchReport:
+        """Process every unfinished record in ``input_path``, appending results to ``output_path``."""
+        report = BatchReport()
+        started = time.perf_counter()
+        done = finished_ids(output_path)
+        queue: asyncio.Queue = asyncio.Queue()
+
+        for record in read_jsonl(input_path):
+            report.total += 1
+            rid = record_id(record)
+            if rid in done:
+                report.skipped += 1
+                continue
+            try:
+                request = CreateRequest(**{k: v for k, v in record.items() if k != "id"})
+            except ValidationError as exc:
+                report.invalid += 1
+                report.errors.append(f"{rid}: {exc.errors()[0]['msg']}")
+                continue
+            done.add(rid)  # guards against duplicate ids inside the input file
+            queue.put_nowait((rid, request))
+
+        if report.skipped:
+            logger.info("Resuming batch: %d records already finished", report.skipped)
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        torn = _has_torn_tail(output_path)
+        with output_path.open("a", encoding="utf-8") as out:
+            if torn:
+                out.write("\n")  # terminate the partial line left by a crash
+
+            def write(result: Dict[str, Any]) -> None:
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+
+            async def worker() -> None:
+                while True:
+                    try:
+                        rid, request = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    await self.limiter.acquire()
+                    run_started = time.perf_counter()
+                    try:
+                        state = await self.service.run_create(
+                            prompt=request.prompt,
+                            content_type=request.content_type,
+                            duration_seconds=request.duration_seconds,
+                            platform=request.platform,
+                            deadline_seconds=request.deadline_seconds,
+                        )
+                    except Exception as exc:
+                        logger.exception("Batch record %s failed", rid)
+                        report.failed += 1
+                        report.errors.append(f"{rid}: {exc}")
+                        write({"id": rid, "status": "error", "error": str(exc)})
+                    else:
+                        report.completed += 1
+                        write({
+                            "id": rid,
+                            "status": "ok",
+                            "elapsed_seconds": round(time.perf_counter() - run_started, 3),
+                            "state": dict(state),
+                        })
+                    finished = report.completed + report.failed
+                    if self.progress_every and finished % self.progress_every == 0:
+                        report.elapsed_seconds = time.perf_counter() - started
+                        logger.info("Batch progress: %s", report.summary())
+
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+        report.elapsed_seconds = time.perf_counter() - started
+        logger.info("Batch finished: %s", report.summary())
+        return report
@@ -0,0 +1,229 @@
+"""Predictive cache warming from the run history.
+
+Traffic is seasonal and repetitive: the same festival, trend and
+"monsoon in Jaipur" briefs arrive from many users. ``trending_briefs`` mines the
+history for (prompt, content type, platform, duration) briefs that are frequent
+in the last ``warm_recent_hours`` and scores the ones rising above their
+``warm_baseline_days`` rate higher. ``CacheWarmer`` then precomputes the top
+``warm_top_k`` through the full pipeline:
+
+  - only in quiet periods: inside ``warm_quiet_hours_utc`` (if set) and with at
+    most ``warm_max_active_runs`` runs running or queued in the scheduler
+  - as the low-priority ``batch`` class of its own tenant, so interactive
+    traffic always goes first and tenant token budgets still apply
+  - under ``warm_daily_quota`` runs per rolling 24 hours
+  - skipping briefs whose warm entry is younger than ``warm_refresh_fraction``
+    of the TTL
+
+Warm runs are not written to the history, so warming never feeds its own
+trend signal; requests served from the warm cache are.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional
+
+from app.agents.local_analyzer import brief_key
+from app.core.config import Settings, get_settings
+from app.services.history_service import RunHistoryStore, get_history_store
+from app.services.report_service import CreatorWorkflowService, get_creator_service
+from app.services.scheduler import FairScheduler, SchedulerRejected, get_scheduler
+from app.services.warm_cache import WarmCache
+
+logger = logging.getLogger(__name__)
+
+WARMER_TENANT = "cache-warmer"
+
+
+@dataclass
+class TrendingBrief:
+    prompt: str
+    content_type: str
+    platform: str
+    duration_seconds: int
+    recent: int
+    total: int
+    score: float
+
+
+def trending_briefs(rows: List[Dict[str, Any]], settings: Settings) -> List[TrendingBrief]:
+    """Top-K briefs by recent frequency plus a bonus for growth over the baseline rate.
+
+    ``rows`` come from ``RunHistoryStore.brief_counts``; spellings of the same
+    brief (case, spacing, trailing punctuation) are merged first.
+    """
+    merged: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        key = brief_key(row)
+        group = merged.get(key)
+        if group is None:
+            merged[key] = dict(row)
+            continue
+        group["recent"] += row["recent"]
+        group["total"] += row["total"]
+        if row["last_seen"] > group["last_seen"]:
+            group["prompt"], group["last_seen"] = row["prompt"], row["last_seen"]
+
+    baseline_hours = max(settings.warm_baseline_days * 24 - settings.warm_recent_hours, 1e-9)
+    scale = settings.warm_recent_hours / baseline_hours
+    briefs = []
+    for group in merged.values():
+        if group["total"] < settings.warm_min_runs or not group["recent"]:
+            continue
+        expected = (group["total"] - group["recent"]) * scale
+        score = group["recent"] + settings.warm_rising_weight * max(0.0, group["recent"] - expected)
+        briefs.append(
+            TrendingBrief(
+                prompt=group["prompt"],
+                content_type=group["content_type"],
+                platform=group["platform"],
+                duration_seconds=int(group["duration_seconds"]),
+                recent=group["recent"],
+                total=group["total"],
+                score=round(score, 2),
+            )
+        )
+    briefs.sort(key=lambda b: (-b.score, -b.recent, b.prompt))
+    return briefs[: settings.warm_top_k]
+
+
+class CacheWarmer:
+    """Periodically precomputes trending briefs into the service's warm cache."""
+
+    def __init__(
+        self,
+        service: CreatorWorkflowService,
+        store: RunHistoryStore,
+        scheduler: FairScheduler,
+        cache: WarmCache,
+        settings: Settings,
+    ):
+        self.service = service
+        self.store = store
+        self.scheduler = scheduler
+        self.cache = cache
+        self.settings = settings
+        self._spent: Deque[float] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self.cycles = 0
+        self.warmed = 0
+        self.failures = 0
+        self.last_cycle: Dict[str, Any] = {}
+
+    # ── Admission ──
+    def quota_left(self, now: Optional[float] = None) -> int:
+        cutoff = (now or time.time()) - 86400
+        while self._spent and self._spent[0] < cutoff:
+            self._spent.popleft()
+        return max(0, self.settings.warm_daily_quota - len(self._spent))
+
+    def is_quiet(self, now: Optional[float] = None) -> bool:
+        hours = self.settings.warm_quiet_hours_utc
+        if hours and datetime.fromtimestamp(now or time.time(), timezone.utc).hour not in hours:
+            return False
+        load = self.scheduler.metrics()
+        return load["running"] + load["queued"] <= self.settings.warm_max_active_runs
+
+    def _needs_refresh(self, brief: TrendingBrief) -> bool:
+        entry = self.cache.peek(asdict(brief))
+        return entry is None or entry.age() >= self.settings.warm_ttl_seconds * self.settings.warm_refresh_fraction
+
+    # ── Work ──
+    async def run_cycle(self) -> Dict[str, Any]:
+        """Warm what the current trends, quota and load allow; returns a summary."""
+        self.cycles += 1
+        summary: Dict[str, Any] = {"at": time.time(), "candidates": 0, "warmed": [], "stopped": None}
+        if not self.is_quiet():
+            summary["stopped"] = "busy"
+        elif not self.quota_left():
+            summary["stopped"] = "quota"
+        else:
+            now = time.time()
+            rows = await asyncio.to_thread(
+                self.store.brief_counts,
+                now - self.settings.warm_baseline_days * 86400,
+                now - self.settings.warm_recent_hours * 3600,
+            )
+            briefs = [b for b in trending_briefs(rows, self.settings) if self._needs_refresh(b)]
+            summary["candidates"] = len(briefs)
+            for brief in briefs:
+                if not self.quota_left():
+                    summary["stopped"] = "quota"
+                    break
+                if not self.is_quiet():
+                    summary["stopped"] = "busy"
+                    break
+                try:
+                    async with self.scheduler.slot(WARMER_TENANT, "batch"):
+                        self._spent.append(time.time())
+                        await self.service.precompute(
+                            prompt=brief.prompt,
+                            content_type=brief.content_type,
+                            duration_seconds=brief.duration_seconds,
+                            platform=brief.platform,
+                        )
+                except SchedulerRejected as exc:
+                    summary["stopped"] = f"rejected: {exc}"
+                    break
+                except Exception:
+                    self.failures += 1
+                    logger.exception("Warming '%s' failed", brief.prompt)
+                    continue
+                self.warmed += 1
+                summary["warmed"].append(brief.prompt)
+        self.last_cycle = summary
+        logger.info(
+            "Cache warming: %d/%d briefs warmed%s, %d runs of quota left",
+            len(summary["warmed"]), summary["candidates"],
+            f" (stopped: {summary['stopped']})" if summary["stopped"] else "", self.quota_left(),
+        )
+        return summary
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_cycle()
+            except Exception:
+                logger.exception("Cache warming cycle failed")
+            await asyncio.sleep(self.settings.warm_interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cycles": self.cycles,
+            "warmed": self.warmed,
+            "failures": self.failures,
+            "quota_left": self.quota_left(),
+            "last_cycle": self.last_cycle,
+            "cache": self.cache.snapshot(),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_cache_warmer() -> Optional[CacheWarmer]:
+    """Process-wide warmer, or ``None`` when warming is disabled or there is no history."""
+    settings = get_settings()
+    service = get_creator_service() if settings.cache_warming_enabled else None
+    store = get_history_store()
+    if service is None or service.warm_cache is None or store is None:
+        return None
+    return CacheWarmer(service, store, get_scheduler(), service.warm_cache, settings)
@@ -0,0 +1,339 @@
+"""Persistent run history: every finished run stored in SQLite with full-text search.
+
+Writes are queued and committed in batches by a background thread, so request
+handlers never wait on disk. Listing uses keyset pagination over an index on
+``created_at`` and search goes through an FTS5 index on the prompt and the
+blueprint, so both stay in the millisecond range at hundreds of thousands of
+runs. The same thread applies retention (age and row-count limits) and
+periodically compacts the FTS index and the database file.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id           TEXT PRIMARY KEY,
+    created_at       REAL    NOT NULL,
+    prompt           TEXT    NOT NULL,
+    content_type     TEXT    NOT NULL,
+    platform         TEXT    NOT NULL,
+    duration_seconds INTEGER NOT NULL,
+    score            INTEGER NOT NULL,
+    iteration_count  INTEGER NOT NULL,
+    degraded         INTEGER NOT NULL DEFAULT 0,
+    elapsed_seconds  REAL    NOT NULL DEFAULT 0,
+    timings          TEXT    NOT NULL DEFAULT '{}',
+    final_blueprint  TEXT    NOT NULL,
+    state            BLOB    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_runs_platform_created ON runs(platform, created_at DESC);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS runs_fts USING fts5(
+    prompt, final_blueprint, content='runs', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS runs_ai AFTER INSERT ON runs BEGIN
+    INSERT INTO runs_fts(rowid, prompt, final_blueprint)
+    VALUES (new.rowid, new.prompt, new.final_blueprint);
+END;
+CREATE TRIGGER IF NOT EXISTS runs_ad AFTER DELETE ON runs BEGIN
+    INSERT INTO runs_fts(runs_fts, rowid, prompt, final_blueprint)
+    VALUES ('delete', old.rowid, old.prompt, old.final_blueprint);
+END;
+"""
+
+_SUMMARY_COLUMNS = (
+    "rowid, run_id, created_at, prompt, content_type, platform, duration_seconds, "
+    "score, iteration_count, degraded, elapsed_seconds"
+)
+
+_STOP = object()
+
+
+def _summary(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "run_id": row["run_id"],
+        "created_at": row["created_at"],
+        "prompt": row["prompt"],
+        "content_type": row["content_type"],
+        "platform": row["platform"],
+        "duration_seconds": row["duration_seconds"],
+        "score": row["score"],
+        "iteration_count": row["iteration_count"],
+        "degraded": bool(row["degraded"]),
+        "elapsed_seconds": row["elapsed_seconds"],
+    }
+
+
+def _encode_cursor(row: sqlite3.Row) -> str:
+    return f"{row['created_at']!r}:{row['rowid']}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, int]:
+    created_at, rowid = cursor.rsplit(":", 1)
+    return float(created_at), int(rowid)
+
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query of quoted prefix terms (no query syntax)."""
+    terms = [t.replace('"', "") for t in text.split()]
+    return " ".join(f'"{t}"*' for t in terms if t)
+
+
+class RunHistoryStore:
+    """SQLite-backed store of finished runs with a background writer thread."""
+
+    def __init__(
+        self,
+        db_path: str,
+        retention_days: float = 0.0,
+        max_runs: int = 0,
+        compact_interval_seconds: float = 3600.0,
+        queue_size: int = 1000,
+    ):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self.max_runs = max_runs
+        self.compact_interval_seconds = compact_interval_seconds
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+        conn = self._connect()
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.executescript(_SCHEMA)
+        conn.commit()
+
+        self._writer = threading.Thread(target=self._write_loop, name="run-history-writer", daemon=True)
+        self._writer.start()
+
+    # ── Connections ──
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # REPLACE must fire the delete trigger so the FTS index stays in sync.
+            conn.execute("PRAGMA recursive_triggers=ON")
+            self._local.conn = conn
+        return conn
+
+    # ── Writes (off the request path) ──
+    def submit(self, state: Dict[str, Any], elapsed_seconds: float = 0.0, timings: Optional[Dict[str, float]] = None) -> None:
+        """Queue a finished run for persistence; never blocks the caller."""
+        record = (
+            state["run_id"],
+            time.time(),
+            state["prompt"],
+            state["content_type"],
+            state["platform"],
+            int(state["duration_seconds"]),
+            int(state.get("score", 0)),
+            int(state.get("iteration_count", 0)),
+            int(bool(state.get("degraded", False))),
+            round(elapsed_seconds, 3),
+            json.dumps(timings or {}),
+            state.get("final_blueprint", ""),
+            zlib.compress(json.dumps(dict(state), ensure_ascii=False, default=str).encode("utf-8")),
+        )
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Run history queue full; dropped run %s", state["run_id"])
+
+    def _write_loop(self) -> None:
+        last_compact = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                item = None
+            batch = [] if item is None else [item]
+            while len(batch) < 500:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = _STOP in batch
+            records = [r for r in batch if r is not _STOP]
+            if records:
+                try:
+                    self._write(records)
+                except sqlite3.Error:
+                    logger.exception("Failed to persist %d runs", len(records))
+            for _ in batch:
+                self._queue.task_done()
+            if time.monotonic() - last_compact >= self.compact_interval_seconds:
+                last_compact = time.monotonic()
+                try:
+                    self.compact()
+                except sqlite3.Error:
+                    logger.exception("Run history compaction failed")
+            if stop:
+                return
+
+    def _write(self, records: List[tuple]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO runs (run_id, created_at, prompt, content_type, platform, "
+                "duration_seconds, score, iteration_count, degraded, elapsed_seconds, timings, "
+                "final_blueprint, state) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                records,
+            )
+
+    def flush(self) -> None:
+        """Block until every queued run has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout=10)
+
+    # ── Retention & compaction ──
+    def compact(self) -> int:
+        """Apply retention limits, then optimise the FTS index and reclaim pages."""
+        conn = self._connect()
+        removed = 0
+        with conn:
+            if self.retention_days > 0:
+                cutoff = time.time() - self.retention_days * 86400
+                removed += conn.execute("DELETE FROM runs WHERE created_at < ?", (cutoff,)).rowcount
+            if self.max_runs > 0:
+                removed += conn.execute(
+                    "DELETE FROM runs WHERE rowid IN (SELECT rowid FROM runs "
+                    "ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_runs,),
+                ).rowcount
+            conn.execute("INSERT INTO runs_fts(runs_fts) VALUES ('optimize')")
+        conn.execute("PRAGMA incremental_vacuum")
+        if removed:
+            logger.info("Run history compaction removed %d runs", removed)
+        return removed
+
+    # ── Reads ──
+    def list_runs(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        platform: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Newest-first page of run summaries and the cursor for the next page."""
+        clauses, params = [], []
+        if platform:
+            clauses.append("platform = ?")
+            params.append(platform)
+        if cursor:
+            created_at, rowid = _decode_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND rowid < ?))")
+            params.extend([created_at, created_at, rowid])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(
+            f"SELECT {_SUMMARY_COLUMNS} FROM runs {where} "
+            "ORDER BY created_at DESC, rowid DESC LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+        next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return [_summary(r) for r in rows[:limit]], next_cursor
+
+    def search(
+        self,
+        text: str,
+        limit: int = 20,
+        offset: int = 0,
+        sort: str = "recent",
+    ) -> List[Dict[str, Any]]:
+        """Runs matching a free-text query over prompts and blueprints.
+
+        ``sort="recent"`` walks the FTS index newest-first and stops at ``limit``;
+        ``sort="relevance"`` ranks by bm25, which must score every match and is
+        slower for common terms.
+        """
+        match = _fts_query(text)
+        if not match:
+            return []
+        order = "runs_fts.rank" if sort == "relevance" else "runs_fts.rowid DESC"
+        rows = self._connect().execute(
+            f"SELECT {', '.join('runs.' + c.strip() for c in _SUMMARY_COLUMNS.split(','))} "
+            f"FROM runs_fts JOIN runs ON runs.rowid = runs_fts.rowid "
+            f"WHERE runs_fts MATCH ? ORDER BY {order} LIMIT ? OFFSET ?",
+            (match, limit, offset),
+        ).fetchall()
+        return [_summary(r) for r in rows]
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Full record of one run, including the complete final state."""
+        row = self._connect().execute(
+            f"SELECT {_SUMMARY_COLUMNS}, timings, state FROM runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        record = _summary(row)
+        record["timings"] = json.loads(row["timings"])
+        record["state"] = json.loads(zlib.decompress(row["state"]).decode("utf-8"))
+        return record
+
+    def brief_counts(self, since: float, recent_since: float) -> List[Dict[str, Any]]:
+        """Runs per brief (prompt, content type, platform, duration) created since ``since``.
+
+        ``recent`` counts the runs at or after ``recent_since``; ``prompt`` is the
+        latest spelling of the brief. Prompts are grouped case-insensitively here,
+        callers may normalise further.
+        """
+        # With a single max() aggregate, SQLite takes the bare ``prompt`` from the latest row.
+        rows = self._connect().execute(
+            "SELECT lower(trim(prompt)) AS brief, content_type, platform, duration_seconds, "
+            "SUM(created_at >= ?) AS recent, COUNT(*) AS total, MAX(created_at) AS last_seen, prompt "
+            "FROM runs WHERE created_at >= ? GROUP BY brief, content_type, platform, duration_seconds",
+            (recent_since, since),
+        ).fetchall()
+        return [
+            {
+                "prompt": row["prompt"],
+                "content_type": row["content_type"],
+                "platform": row["platform"],
+                "duration_seconds": row["duration_seconds"],
+                "recent": row["recent"],
+                "total": row["total"],
+                "last_seen": row["last_seen"],
+            }
+            for row in rows
+        ]
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+
+@lru_cache(maxsize=1)
+def get_history_store() -> Optional[RunHistoryStore]:
+    """Process-wide history store, or ``None`` when history is disabled."""
+    settings = get_settings()
+    if not settings.history_enabled:
+        return None
+    return RunHistoryStore(
+        settings.history_db_path,
+        retention_days=settings.history_retention_days,
+        max_runs=settings.history_max_runs,
+        compact_interval_seconds=settings.history_compact_interval_seconds,
+    )
@@ -1,11 +1,20 @@
-"""RAG (Retrieval-Augmented Generation) service using ChromaDB for persistent knowledge."""
+"""RAG (Retrieval-Augmented Generation) service using ChromaDB for persistent knowledge.
+
+Indexing goes through ``RAGIndexer``: research results are chunked, deduplicated
+against a persisted set of already-stored ids, coalesced across calls into
+size-bounded batches and upserted on a background thread, so callers of
+``RAGService.index_research_async`` never wait on ChromaDB.
+"""
 
 from __future__ import annotations
 
 import hashlib
 import logging
+import queue
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +26,220 @@ except ImportError:
     logger.warning("chromadb not installed — RAG features disabled")
 
 
+Chunk = Tuple[str, str, Dict[str, Any]]  # (id, document, metadata)
+
+_STOP = object()
+
+
+def _doc_id(text: str) -> str:
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def _split_text(text: str, chunk_chars: int, overlap: int) -> List[str]:
+    """Split long text into overlapping chunks, preferring paragraph/sentence breaks."""
+    if len(text) <= chunk_chars:
+        return [text]
+    chunks: List[str] = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + chunk_chars)
+        if end < len(text):
+            cut = max(text.rfind("\n", start, end), text.rfind(". ", start, end))
+            if cut > start + chunk_chars // 2:
+                end = cut + 1
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return [c for c in chunks if c]
+
+
+def build_chunks(
+    topic: str,
+    research_data: List[Dict[str, Any]],
+    chunk_chars: int = 1500,
+    overlap: int = 150,
+) -> Iterator[Chunk]:
+    """Turn research blocks into (id, document, metadata) chunks ready for upsert."""
+    for block in research_data:
+        sub_q = block.get("sub_question", "")
+        summary = block.get("summary", "")
+        if summary:
+            header = f"Topic: {topic}\nQuestion: {sub_q}\nAnswer: "
+            for i, part in enumerate(_split_text(summary, chunk_chars, overlap)):
+                doc = header + part
+                yield _doc_id(doc), doc, {"topic": topic, "type": "summary", "sub_question": sub_q, "chunk": i}
+
+        for source in block.get("sources", []):
+            snippet = source.get("snippet", "")
+            if snippet:
+                header = f"Source: {source.get('title', '')}\nURL: {source.get('url', '')}\nContent: "
+                for i, part in enumerate(_split_text(snippet, chunk_chars, overlap)):
+                    doc = header + part
+                    yield _doc_id(doc), doc, {
+                        "topic": topic,
+                        "type": "source",
+                        "url": source.get("url", ""),
+                        "title": source.get("title", ""),
+                        "chunk": i,
+                    }
+
+
+class SeenIds:
+    """Append-only, persisted set of document ids already stored in the collection.
+
+    Ids are MD5 digests kept as 16 raw bytes each, in memory and on disk.
+    """
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ids: Set[bytes] = set()
+        if path is not None and path.exists():
+            data = path.read_bytes()
+            usable = len(data) - len(data) % 16
+            if usable != len(data):
+                # Drop a torn trailing record so later appends stay 16-byte aligned.
+                with path.open("r+b") as handle:
+                    handle.truncate(usable)
+            self._ids = {data[i:i + 16] for i in range(0, usable, 16)}
+
+    def __contains__(self, doc_id: str) -> bool:
+        return bytes.fromhex(doc_id) in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add_many(self, doc_ids: List[str]) -> None:
+        with self._lock:
+            new = list(dict.fromkeys(d for d in (bytes.fromhex(i) for i in doc_ids) if d not in self._ids))
+            if not new:
+                return
+            self._ids.update(new)
+            if self.path is not None:
+                with self.path.open("ab") as handle:
+                    handle.write(b"".join(new))
+
+
+class RAGIndexer:
+    """Background indexing queue in front of a Chroma collection.
+
+    ``submit`` only enqueues. A worker thread chunks the research, drops ids that
+    are already stored (or already pending), coalesces documents from many
+    submissions and upserts them ``batch_size`` at a time, flushing a partial
+    batch once it has waited ``max_batch_wait`` seconds.
+    """
+
+    def __init__(
+        self,
+        collection: Any,
+        seen_path: Optional[Path] = None,
+        batch_size: int = 256,
+        max_batch_wait: float = 1.0,
+        chunk_chars: int = 1500,
+        queue_size: int = 10000,
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.max_batch_wait = max_batch_wait
+        self.chunk_chars = chunk_chars
+        self.seen = SeenIds(seen_path)
+        if seen_path is not None and not len(self.seen) and collection.count():
+            self._seed_seen()
+        self.indexed = 0
+        self.skipped_duplicates = 0
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._worker = threading.Thread(target=self._run, name="rag-indexer", daemon=True)
+        self._worker.start()
+
+    def _seed_seen(self, page: int = 5000) -> None:
+        """Backfill the seen-id file from an existing collection (first start only)."""
+        offset = 0
+        while True:
+            ids = self.collection.get(limit=page, offset=offset, include=[]).get("ids", [])
+            if not ids:
+                break
+            self.seen.add_many(ids)
+            offset += len(ids)
+        logger.info("RAG indexer seeded %d known ids from the collection", len(self.seen))
+
+    def submit(self, topic: str, research_data: List[Dict[str, Any]]) -> bool:
+        """Queue research for indexing; returns False if the queue is full."""
+        try:
+            self._queue.put_nowait((topic, research_data))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("RAG indexing queue full; dropped research for '%s'", topic[:60])
+            return False
+
+    def _run(self) -> None:
+        pending: Dict[str, Chunk] = {}
+        oldest = 0.0
+        while True:
+            timeout = None
+            if pending:
+                timeout = max(0.0, oldest + self.max_batch_wait - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._flush(pending)  # partial batch waited long enough
+                continue
+            try:
+                if item is _STOP or isinstance(item, threading.Event):
+                    self._flush(pending)
+                    if item is _STOP:
+                        return
+                    item.set()
+                    continue
+                topic, research_data = item
+                for chunk in build_chunks(topic, research_data, self.chunk_chars):
+                    doc_id = chunk[0]
+                    if doc_id in pending or doc_id in self.seen:
+                        self.skipped_duplicates += 1
+                        continue
+                    if not pending:
+                        oldest = time.monotonic()
+                    pending[doc_id] = chunk
+                    if len(pending) >= self.batch_size:
+                        self._flush(pending)
+            except Exception:
+                logger.exception("RAG indexing worker failed on one submission")
+            finally:
+                self._queue.task_done()
+
+    def _flush(self, pending: Dict[str, Chunk]) -> None:
+        if not pending:
+            return
+        chunks = list(pending.values())
+        pending.clear()
+        ids = [c[0] for c in chunks]
+        try:
+            self.collection.upsert(
+                ids=ids,
+                documents=[c[1] for c in chunks],
+                metadatas=[c[2] for c in chunks],
+            )
+        except Exception:
+            logger.exception("RAG upsert of %d chunks failed", len(chunks))
+            return
+        self.seen.add_many(ids)
+        self.indexed += len(chunks)
+        logger.info("RAG indexed %d chunks (%d known ids)", len(chunks), len(self.seen))
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Block until everything submitted so far has been upserted."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 30.0) -> None:
+        if self._worker.is_alive():
+            self._queue.put(_STOP)
+            self._worker.join(timeout)
+
+
 class RAGService:
     """Persistent vector knowledge base that enriches research over time."""
 
@@ -39,51 +262,47 @@ class RAGService:
             name="research_knowledge",
             metadata={"hnsw:space": "cosine"},
         )
+        self.indexer = RAGIndexer(self.collection, seen_path=Path(persist_dir) / "seen_ids.bin")
         logger.info(
             "RAG knowledge base ready — %d documents stored", self.collection.count()
         )
 
     @staticmethod
     def _doc_id(text: str) -> str:
-        return hashlib.md5(text.encode("utf-8")).hexdigest()
+        return _doc_id(text)
 
     def index_research(self, topic: str, research_data: List[Dict[str, Any]]) -> int:
-        """Upsert research results into the knowledge base. Returns doc count."""
+        """Synchronously upsert research results, skipping stored ids. Returns new chunk count."""
         if not self.enabled:
             return 0
 
-        documents, metadatas, ids = [], [], []
-
-        for i, block in enumerate(research_data):
-            sub_q = block.get("sub_question", "")
-            summary = block.get("summary", "")
-            if summary:
-                doc = f"Topic: {topic}\nQuestion: {sub_q}\nAnswer: {summary}"
-                documents.append(doc)
-                metadatas.append({"topic": topic, "type": "summary", "sub_question": sub_q})
-                ids.append(self._doc_id(doc))
-
-            for source in block.get("sources", []):
-                snippet = source.get("snippet", "")
-                if snippet:
-                    doc = (
-                        f"Source: {source.get('title', '')}\n"
-                        f"URL: {source.get('url', '')}\n"
-                        f"Content: {snippet}"
-                    )
-                    documents.append(doc)
-                    metadatas.append({
-                        "topic": topic,
-                        "type": "source",
-                        "url": source.get("url", ""),
-                        "title": source.get("title", ""),
-                    })
-                    ids.append(self._doc_id(doc))
+        chunks: Dict[str, Chunk] = {}
+        for chunk in build_chunks(topic, research_data):
+            if chunk[0] not in self.indexer.seen:
+                chunks.setdefault(chunk[0], chunk)
+        new = list(chunks.values())
+        for start in range(0, len(new), self.indexer.batch_size):
+            batch = new[start:start + self.indexer.batch_size]
+            ids = [c[0] for c in batch]
+            self.collection.upsert(
+                ids=ids,
+                documents=[c[1] for c in batch],
+                metadatas=[c[2] for c in batch],
+            )
+            self.indexer.seen.add_many(ids)
+        if new:
+            logger.info("RAG indexed %d chunks for '%s'", len(new), topic[:60])
+        return len(new)
+
+    def index_research_async(self, topic: str, research_data: List[Dict[str, Any]]) -> bool:
+        """Queue research for background indexing without waiting on ChromaDB."""
+        if not self.enabled:
+            return False
+        return self.indexer.submit(topic, research_data)
 
-        if documents:
-            self.collection.upsert(documents=documents, metadatas=metadatas, ids=ids)
-            logger.info("RAG indexed %d chunks for '%s'", len(documents), topic[:60])
-        return len(documents)
+    def close(self) -> None:
+        if self.enabled:
+            self.indexer.close()
 
     def retrieve(self, query: str, n_results: int = 10) -> List[Dict[str, Any]]:
         """Semantic search against the knowledge base."""
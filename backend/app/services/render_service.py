@@ -0,0 +1,85 @@
+"""On-demand blueprint rendering with a per-run cache.
+
+Finished runs are immutable, so each (run_id, format) is rendered at most once
+while it stays in the LRU cache. Markdown is already in the stored state and is
+served as is.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Mapping, Optional, Tuple
+
+from app.agents.blueprint import FORMATS, render
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_ACCEPT_FORMATS = {
+    "text/markdown": "markdown",
+    "text/html": "html",
+    "text/csv": "csv",
+    "application/json": "json",
+}
+
+
+def negotiate_format(requested: Optional[str], accept: Optional[str]) -> Optional[str]:
+    """Pick a format from an explicit ``format`` value, else from the Accept header.
+
+    Returns ``None`` when ``requested`` is not a known format; anything the Accept
+    header does not name falls back to markdown.
+    """
+    if requested:
+        return requested if requested in FORMATS else None
+    candidates = []
+    for position, part in enumerate((accept or "").split(",")):
+        media, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        fmt = _ACCEPT_FORMATS.get(media.strip().lower())
+        if fmt and quality > 0:
+            candidates.append((-quality, position, fmt))
+    return min(candidates)[2] if candidates else "markdown"
+
+
+class RenderCache:
+    """Thread-safe LRU of rendered blueprints keyed by (run_id, format)."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, state: Mapping[str, Any], fmt: str) -> str:
+        if fmt == "markdown" and state.get("final_blueprint"):
+            return state["final_blueprint"]
+        key = (state["run_id"], fmt)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        rendered = render(state, fmt)
+        with self._lock:
+            self._entries[key] = rendered
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return rendered
+
+
+@lru_cache(maxsize=1)
+def get_render_cache() -> RenderCache:
+    return RenderCache(max_entries=get_settings().render_cache_size)
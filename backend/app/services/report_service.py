@@ -2,16 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import time
+import uuid
 from functools import lru_cache
-from typing import Any, AsyncGenerator, Dict
+from typing import Any, AsyncGenerator, Dict, Optional
 
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_groq import ChatGroq
 
+from app.agents.cassette import ReplayOnlyChatModel
+from app.agents.llm import LLMClient
+from app.agents.local_analyzer import AnalysisCache
+from app.agents.prompts import PromptPrefixMeter
 from app.agents.workflow import build_creator_graph
 from app.core.config import Settings, get_settings
+from app.core.logging import log_context
+from app.core.tracing import span
 from app.schemas.state import CreatorState
+from app.services.history_service import RunHistoryStore, get_history_store
+from app.services.warm_cache import WarmCache, get_warm_cache
 
 logger = logging.getLogger(__name__)
 
@@ -21,52 +33,134 @@ def create_initial_state(
     content_type: str = "reel",
     duration_seconds: int = 30,
     platform: str = "instagram",
+    deadline_seconds: float = 0.0,
+    run_id: Optional[str] = None,
 ) -> CreatorState:
     """Construct the initial shared state for each run."""
     return CreatorState(
+        run_id=run_id or uuid.uuid4().hex,
         prompt=prompt,
         content_type=content_type,
         duration_seconds=duration_seconds,
         platform=platform,
+        deadline_at=time.time() + deadline_seconds if deadline_seconds > 0 else 0.0,
         analysis={},
+        analysis_source="",
+        analysis_confidence=0.0,
         script="",
+        candidates=[],
         timeline=[],
         enhancements={},
         story_structure={},
+        gate_verdict="",
+        gate_action="",
+        gate_findings=[],
         critique="",
         score=0,
+        section_scores={},
+        section_feedback={},
+        revised_sections=[],
+        refiner_stalled=False,
         iteration_count=0,
+        degraded=False,
+        skipped_nodes=[],
         final_blueprint="",
+        warm={},
     )
 
 
 class CreatorWorkflowService:
     """Stateless orchestrator wrapper around the compiled creator LangGraph."""
 
-    def __init__(self, settings: Settings):
+    def __init__(
+        self,
+        settings: Settings,
+        history: Optional[RunHistoryStore] = None,
+        warm_cache: Optional[WarmCache] = None,
+    ):
         self.settings = settings
-        if not settings.groq_api_key:
+        self.history = history
+        self.warm_cache = warm_cache
+        if not settings.groq_api_key and settings.llm_cassette_mode != "replay":
             raise ValueError("Missing GROQ_API_KEY in environment.")
-        self.llm = ChatGroq(
-            model=settings.groq_model,
-            api_key=settings.groq_api_key,
-            temperature=0.4,
-        )
+        self.llm = self._chat_model(settings.groq_model)
+        self.llm_client = LLMClient(self.llm, settings)
+        self.prefix_meter = PromptPrefixMeter()
+        # Shared by the full and draft graphs: both analyze the same brief.
+        self.analysis_cache = AnalysisCache(max_entries=settings.analysis_cache_size)
         self.graph = build_creator_graph(
-            llm=self.llm,
+            llm=self.llm_client,
+            settings=settings,
+            prefix_meter=self.prefix_meter,
+            analysis_cache=self.analysis_cache,
+        )
+        self.draft_llm = self._chat_model(settings.draft_model)
+        self.draft_graph = build_creator_graph(
+            llm=self.llm_client.derive(self.draft_llm, namespace="draft"),
             settings=settings,
+            draft=True,
+            analysis_cache=self.analysis_cache,
         )
 
+    def _chat_model(self, model: str) -> BaseChatModel:
+        """Groq chat model, or an offline stand-in when replaying a cassette."""
+        if self.settings.llm_cassette_mode == "replay":
+            return ReplayOnlyChatModel(model_name=model)
+        return ChatGroq(model=model, api_key=self.settings.groq_api_key, temperature=0.4)
+
+    def _deadline(self, deadline_seconds: Optional[float]) -> float:
+        if deadline_seconds:
+            return deadline_seconds
+        return self.settings.request_deadline_seconds
+
+    def _serve_warm(
+        self,
+        prompt: str,
+        content_type: str,
+        duration_seconds: int,
+        platform: str,
+        run_id: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """The precomputed run for this brief as a new run (with ``warm`` metadata), if fresh."""
+        if self.warm_cache is None:
+            return None
+        hit = self.warm_cache.get(
+            {"prompt": prompt, "content_type": content_type, "duration_seconds": duration_seconds, "platform": platform}
+        )
+        if hit is None:
+            return None
+        state, freshness = hit
+        state.update(run_id=run_id or uuid.uuid4().hex, prompt=prompt, deadline_at=0.0, warm=freshness)
+        if self.history is not None:
+            # Served runs are demand too: they keep the brief trending for the warmer.
+            self.history.submit(state)
+        logger.info("Served run %s from the warm cache (%.0fs old)", state["run_id"], freshness["age_seconds"])
+        return state
+
     async def run_create(
         self,
         prompt: str,
         content_type: str = "reel",
         duration_seconds: int = 30,
         platform: str = "instagram",
+        deadline_seconds: Optional[float] = None,
+        fresh: bool = False,
     ) -> CreatorState:
-        """Run graph end-to-end and return final state."""
-        initial = create_initial_state(prompt, content_type, duration_seconds, platform)
-        final_state = await self.graph.ainvoke(initial)
+        """Run graph end-to-end and return final state.
+
+        A fresh precomputed blueprint for the same brief is returned instead
+        unless ``fresh`` is set.
+        """
+        warm = None if fresh else self._serve_warm(prompt, content_type, duration_seconds, platform)
+        if warm is not None:
+            return CreatorState(**warm)
+        initial = create_initial_state(
+            prompt, content_type, duration_seconds, platform, self._deadline(deadline_seconds)
+        )
+        final_state: Dict[str, Any] = dict(initial)
+        async for event in self._stream_graph(initial):
+            if event["event"] == "done":
+                final_state = event["state"]
         return CreatorState(**final_state)
 
     async def stream_create(
@@ -75,45 +169,189 @@ class CreatorWorkflowService:
         content_type: str = "reel",
         duration_seconds: int = 30,
         platform: str = "instagram",
+        deadline_seconds: Optional[float] = None,
+        preview: bool = False,
+        run_id: Optional[str] = None,
+        fresh: bool = False,
     ) -> AsyncGenerator[Dict[str, Any], None]:
-        """Yield structured events as each graph node updates shared state."""
-        initial = create_initial_state(prompt, content_type, duration_seconds, platform)
-        current_state: Dict[str, Any] = dict(initial)
+        """Yield structured events as each graph node updates shared state.
+
+        With ``preview=True`` the reduced draft graph runs alongside the full
+        pipeline on the fast model and its blueprint is emitted as a ``preview``
+        event as soon as it is ready; the final ``done`` event supersedes it.
+        A brief served from the warm cache yields only ``start`` and ``done``.
+        """
+        warm = None if fresh else self._serve_warm(prompt, content_type, duration_seconds, platform, run_id)
+        if warm is not None:
+            yield {
+                "event": "start",
+                "message": "Serving a precomputed blueprint",
+                "run_id": warm["run_id"],
+                "prompt": prompt,
+                "preview": False,
+                "warm": warm["warm"],
+            }
+            yield {"event": "done", "state": warm, "warm": warm["warm"]}
+            return
+
+        initial = create_initial_state(
+            prompt, content_type, duration_seconds, platform, self._deadline(deadline_seconds), run_id
+        )
 
         yield {
             "event": "start",
             "message": "Creator pipeline started",
+            "run_id": initial["run_id"],
             "prompt": prompt,
+            "preview": preview,
         }
 
-        async for update in self.graph.astream(initial, stream_mode="updates"):
-            if not isinstance(update, dict):
-                continue
-
-            for node_name, patch in update.items():
-                if isinstance(patch, dict):
-                    current_state.update(patch)
-                yield {
-                    "event": "node",
-                    "node": node_name,
-                    "patch": patch,
-                    "state": current_state,
-                }
-
-        if not current_state.get("final_blueprint"):
-            logger.warning("No final_blueprint in stream state; recovering via ainvoke")
-            final_state = await self.graph.ainvoke(initial)
-            current_state.update(final_state)
+        events = self._stream_graph(initial)
+        if preview:
+            events = self._with_preview(initial, events)
+        async for event in events:
+            yield event
+
+    async def precompute(
+        self,
+        prompt: str,
+        content_type: str = "reel",
+        duration_seconds: int = 30,
+        platform: str = "instagram",
+    ) -> CreatorState:
+        """Run the full pipeline for a brief into the warm cache (not the run history)."""
+        if self.warm_cache is None:
+            raise RuntimeError("Cache warming is disabled")
+        initial = create_initial_state(prompt, content_type, duration_seconds, platform)
+        final_state: Dict[str, Any] = dict(initial)
+        async for event in self._stream_graph(initial, record=False):
+            if event["event"] == "done":
+                final_state = event["state"]
+        if final_state.get("final_blueprint") and not final_state.get("degraded"):
+            self.warm_cache.put(final_state)
+        return CreatorState(**final_state)
+
+    async def _stream_graph(self, initial: CreatorState, record: bool = True) -> AsyncGenerator[Dict[str, Any], None]:
+        """Run the full graph, yielding a ``node`` event per update and a final ``done``.
+
+        Finished runs are handed to the run history store along with per-node
+        timings, unless ``record`` is off.
+        """
+        current_state: Dict[str, Any] = dict(initial)
+        # Filled by the nodes themselves, so a slow consumer of this stream does
+        # not show up in the stored timings; time spent waiting on it is left out
+        # of ``elapsed`` too.
+        timings: Dict[str, float] = {}
+        config = {"configurable": {"node_timings": timings}}
+        started = time.perf_counter()
+        paused = 0.0
+
+        try:
+            async for update in self.graph.astream(initial, config, stream_mode="updates"):
+                if not isinstance(update, dict):
+                    continue
+
+                for node_name, patch in update.items():
+                    if isinstance(patch, dict):
+                        current_state.update(patch)
+                    handed_over = time.perf_counter()
+                    yield {
+                        "event": "node",
+                        "node": node_name,
+                        "patch": patch,
+                        "state": current_state,
+                    }
+                    paused += time.perf_counter() - handed_over
+
+            if not current_state.get("final_blueprint"):
+                logger.warning("No final_blueprint in stream state; recovering via ainvoke")
+                final_state = await self.graph.ainvoke(initial, config)
+                current_state.update(final_state)
+        except BaseException:
+            # Failed, cancelled or abandoned by the consumer: no report is coming.
+            self.prefix_meter.discard(initial["run_id"])
+            raise
+
+        elapsed = time.perf_counter() - started - paused
+        if record and self.history is not None:
+            self.history.submit(current_state, elapsed_seconds=elapsed, timings=timings)
+        prompt_prefix = self.prefix_meter.report(initial["run_id"])
+        self.prefix_meter.discard(initial["run_id"])
+        with log_context(run_id=initial["run_id"]):
+            logger.info(
+                "Run %s prompts: %d calls, %d-char common prefix, %.0f%% reusable",
+                initial["run_id"], prompt_prefix["calls"], prompt_prefix["common_prefix_chars"],
+                prompt_prefix["reuse_ratio"] * 100,
+            )
 
         yield {
             "event": "done",
             "state": current_state,
+            "prompt_prefix": prompt_prefix,
         }
 
+    async def _with_preview(
+        self,
+        initial: CreatorState,
+        events: AsyncGenerator[Dict[str, Any], None],
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Interleave the draft graph's ``preview`` event into the full run's events.
+
+        The preview is dropped if the full pipeline finishes first, and a failing
+        draft never affects the full run.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+
+        async def pump_full() -> None:
+            try:
+                async for event in events:
+                    await queue.put(event)
+            except Exception as exc:
+                await queue.put(exc)
+            finally:
+                await queue.put(finished)
+
+        async def run_draft() -> None:
+            started = time.perf_counter()
+            try:
+                draft_state = await self.draft_graph.ainvoke(dict(initial))
+            except Exception:
+                logger.exception("Draft preview failed; continuing with the full pipeline")
+                return
+            await queue.put({
+                "event": "preview",
+                "elapsed_seconds": round(time.perf_counter() - started, 3),
+                "state": draft_state,
+            })
+
+        full_task = asyncio.create_task(pump_full())
+        draft_task = asyncio.create_task(run_draft())
+        done = False
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                if item["event"] == "preview" and done:
+                    continue
+                if item["event"] == "done":
+                    done = True
+                    draft_task.cancel()
+                yield item
+        finally:
+            for task in (full_task, draft_task):
+                if not task.done():
+                    task.cancel()
+
 
 def format_sse(event_name: str, payload: Dict[str, Any]) -> str:
     """Format an SSE event packet."""
-    data = json.dumps(payload, ensure_ascii=False)
+    with span("sse.serialize", event=event_name) as sse_span:
+        data = json.dumps(payload, ensure_ascii=False)
+        sse_span.set(bytes=len(data))
     return f"event: {event_name}\ndata: {data}\n\n"
 
 
@@ -121,4 +359,4 @@ def format_sse(event_name: str, payload: Dict[str, Any]) -> str:
 def get_creator_service() -> CreatorWorkflowService:
     """Singleton-style dependency for FastAPI routes."""
     settings = get_settings()
-    return CreatorWorkflowService(settings)
+    return CreatorWorkflowService(settings, history=get_history_store(), warm_cache=get_warm_cache())
@@ -0,0 +1,126 @@
+"""Registry of pipeline runs that outlive the connection that started them.
+
+Runs started over the WebSocket execute as background tasks and publish the
+same events as ``CreatorWorkflowService.stream_create`` into a bounded,
+sequence-numbered buffer. Any number of watchers read that buffer at their own
+pace, so a slow or disconnected client never holds up the run, and a client can
+resume after reconnecting by watching from the last ``seq`` it received.
+Finished runs stay resumable for ``run_retention_seconds``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from functools import lru_cache
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from app.core.config import get_settings
+from app.services.report_service import CreatorWorkflowService
+from app.services.scheduler import FairScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class RunHandle:
+    """One run's task plus its replayable event buffer."""
+
+    def __init__(self, run_id: str, tenant: str, max_events: int):
+        self.run_id = run_id
+        self.tenant = tenant
+        self.created_at = time.time()
+        self.task: Optional[asyncio.Task] = None
+        self.finished = False
+        self.status = "running"
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._next_seq = 0
+        self._changed = asyncio.Event()
+
+    def publish(self, payload: Dict[str, Any]) -> None:
+        self._events.append({**payload, "run_id": self.run_id, "seq": self._next_seq})
+        self._next_seq += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def events(self, after: int = -1) -> AsyncIterator[Dict[str, Any]]:
+        """Buffered events with ``seq > after``, then live ones until the run ends.
+
+        Events older than the buffer are gone; a watcher that fell that far behind
+        continues from the oldest one still buffered (node events carry full state).
+        """
+        cursor = after + 1
+        while True:
+            changed = self._changed
+            for event in list(self._events):
+                if event["seq"] >= cursor:
+                    cursor = event["seq"] + 1
+                    yield event
+            if self.finished and cursor >= self._next_seq:
+                return
+            await changed.wait()
+
+
+class RunRegistry:
+    """Active and recently finished runs, by run id."""
+
+    def __init__(self, max_events: int = 256, retention_seconds: float = 300.0):
+        self.max_events = max_events
+        self.retention_seconds = retention_seconds
+        self._runs: Dict[str, RunHandle] = {}
+
+    def get(self, run_id: str) -> Optional[RunHandle]:
+        return self._runs.get(run_id)
+
+    def start(
+        self,
+        service: CreatorWorkflowService,
+        scheduler: FairScheduler,
+        tenant: str,
+        **params: Any,
+    ) -> RunHandle:
+        """Start a run in the background; raises ``SchedulerRejected`` if not admitted."""
+        scheduler.check_admission(tenant)
+        handle = RunHandle(uuid.uuid4().hex, tenant, self.max_events)
+        self._runs[handle.run_id] = handle
+        handle.task = asyncio.create_task(self._execute(handle, service, scheduler, params))
+        return handle
+
+    async def _execute(
+        self,
+        handle: RunHandle,
+        service: CreatorWorkflowService,
+        scheduler: FairScheduler,
+        params: Dict[str, Any],
+    ) -> None:
+        try:
+            async with scheduler.slot(handle.tenant, "interactive"):
+                async for payload in service.stream_create(run_id=handle.run_id, **params):
+                    handle.publish(payload)
+            handle.status = "done"
+        except asyncio.CancelledError:
+            handle.status = "cancelled"
+            handle.publish({"event": "cancelled", "message": "Run cancelled"})
+        except Exception as exc:
+            logger.exception("Run %s failed", handle.run_id)
+            handle.status = "error"
+            handle.publish({"event": "error", "message": str(exc)})
+        finally:
+            handle.finished = True
+            handle.publish({"event": "closed", "status": handle.status})
+            asyncio.get_running_loop().call_later(self.retention_seconds, self._runs.pop, handle.run_id, None)
+
+    def cancel(self, run_id: str) -> bool:
+        handle = self._runs.get(run_id)
+        if handle is None or handle.finished or handle.task is None:
+            return False
+        handle.task.cancel()
+        return True
+
+
+@lru_cache(maxsize=1)
+def get_run_registry() -> RunRegistry:
+    settings = get_settings()
+    return RunRegistry(max_events=settings.run_event_buffer, retention_seconds=settings.run_retention_seconds)
@@ -0,0 +1,312 @@
+"""Per-tenant fair scheduling of pipeline runs in front of ``CreatorWorkflowService``.
+
+Runs wait for a slot in ``FairScheduler.slot``. Slots are granted by strict
+priority class first (interactive before batch), then by weighted fair queuing
+across tenants: each queued run gets a virtual finish tag of
+``max(virtual_time, tenant's last tag) + 1 / weight`` and the smallest tag among
+tenants that are below their concurrency cap runs next. A tenant that has used
+its token budget for the current window is refused up front, as is anyone once
+the queue is full. Queue wait times are kept per priority class for ``metrics``.
+A tenant's bookkeeping is dropped once it has nothing running or queued and no
+usage left in its budget window.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import itertools
+import logging
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from starlette.requests import HTTPConnection
+
+from app.agents.llm import current_usage
+from app.core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = ("interactive", "batch")
+# How often admission sweeps out tenants whose budget window has emptied.
+_SWEEP_SECONDS = 60.0
+
+
+class SchedulerRejected(Exception):
+    """Base class for runs refused admission (mapped to HTTP 429)."""
+
+
+class QueueFull(SchedulerRejected):
+    pass
+
+
+class TenantBudgetExceeded(SchedulerRejected):
+    pass
+
+
+@dataclass(order=True)
+class _Waiter:
+    finish_tag: float
+    seq: int
+    start_tag: float = field(compare=False)
+    tenant: str = field(compare=False)
+    priority: str = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    future: asyncio.Future = field(compare=False, repr=False)
+
+
+@dataclass
+class Ticket:
+    tenant: str
+    priority: str
+    wait_seconds: float
+    usage: Dict[str, int]
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class FairScheduler:
+    """Weighted fair queue of pipeline runs with priority classes and tenant limits."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        tenant_max_concurrency: int = 2,
+        tenant_weights: Optional[Dict[str, float]] = None,
+        token_budget: int = 0,
+        budget_window_seconds: float = 3600.0,
+        max_queue: int = 200,
+    ):
+        self.max_concurrency = max_concurrency
+        self.tenant_max_concurrency = tenant_max_concurrency
+        self.tenant_weights = tenant_weights or {}
+        self.token_budget = token_budget
+        self.budget_window_seconds = budget_window_seconds
+        self.max_queue = max_queue
+
+        self._queues: Dict[str, Dict[str, Deque[_Waiter]]] = {p: defaultdict(deque) for p in PRIORITIES}
+        self._virtual_time = 0.0
+        self._tenant_tag: Dict[str, float] = defaultdict(float)
+        self._running: Dict[str, int] = defaultdict(int)
+        self._running_total = 0
+        self._seq = itertools.count()
+        self._usage: Dict[str, Deque[Tuple[float, int]]] = defaultdict(deque)
+        self._waits: Dict[str, Deque[float]] = {p: deque(maxlen=1000) for p in PRIORITIES}
+        self._next_sweep = time.monotonic() + _SWEEP_SECONDS
+        self.completed = 0
+        self.rejected = 0
+
+    # ── Admission ──
+    def queued(self) -> int:
+        return sum(len(q) for by_tenant in self._queues.values() for q in by_tenant.values())
+
+    def tokens_used(self, tenant: str) -> int:
+        usage = self._usage.get(tenant)
+        if not usage:
+            return 0
+        cutoff = time.monotonic() - self.budget_window_seconds
+        while usage and usage[0][0] < cutoff:
+            usage.popleft()
+        if not usage:
+            self._forget_if_idle(tenant)
+        return sum(tokens for _, tokens in usage)
+
+    def _forget_if_idle(self, tenant: str) -> None:
+        """Drop a tenant's state once nothing is running, queued or in its budget window.
+
+        Its virtual tag goes too, so a returning tenant restarts at the current
+        virtual time, as an idle flow does in weighted fair queuing.
+        """
+        if self._running.get(tenant) or self._usage.get(tenant):
+            return
+        if any(self._queues[p].get(tenant) for p in PRIORITIES):
+            return
+        self._running.pop(tenant, None)
+        self._usage.pop(tenant, None)
+        self._tenant_tag.pop(tenant, None)
+        for priority in PRIORITIES:
+            self._queues[priority].pop(tenant, None)
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + _SWEEP_SECONDS
+        for tenant in list(self._usage):
+            self.tokens_used(tenant)
+
+    def check_admission(self, tenant: str) -> None:
+        """Raise ``SchedulerRejected`` if this tenant's run cannot be queued now."""
+        self._sweep()
+        if self.token_budget and self.tokens_used(tenant) >= self.token_budget:
+            self.rejected += 1
+            raise TenantBudgetExceeded(f"Tenant '{tenant}' has used its token budget for this window")
+        if self.queued() >= self.max_queue:
+            self.rejected += 1
+            raise QueueFull("Too many queued runs; try again shortly")
+
+    # ── Dispatch ──
+    def _dispatch(self) -> None:
+        while self._running_total < self.max_concurrency:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self._queues[waiter.priority][waiter.tenant].popleft()
+            if waiter.future.done():
+                continue  # cancelled while queued; its task cleans up
+            self._virtual_time = max(self._virtual_time, waiter.start_tag)
+            self._running[waiter.tenant] += 1
+            self._running_total += 1
+            waiter.future.set_result(None)
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        for priority in PRIORITIES:
+            heads = [
+                queue[0]
+                for tenant, queue in self._queues[priority].items()
+                if queue and self._running[tenant] < self.tenant_max_concurrency
+            ]
+            if heads:
+                return min(heads)
+        return None
+
+    def _release(self, tenant: str) -> None:
+        self._running[tenant] -= 1
+        self._running_total -= 1
+        self._forget_if_idle(tenant)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tenant: str, priority: str = "interactive") -> AsyncIterator[Ticket]:
+        """Wait for a fair share slot, then hold it for the duration of the run."""
+        if priority not in PRIORITIES:
+            priority = "interactive"
+        self.check_admission(tenant)
+        weight = max(self.tenant_weights.get(tenant, 1.0), 1e-6)
+        start = max(self._virtual_time, self._tenant_tag[tenant])
+        waiter = _Waiter(
+            finish_tag=start + 1.0 / weight,
+            seq=next(self._seq),
+            start_tag=start,
+            tenant=tenant,
+            priority=priority,
+            enqueued_at=time.monotonic(),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._tenant_tag[tenant] = waiter.finish_tag
+        self._queues[priority][tenant].append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(tenant)  # granted just as the client went away
+            else:
+                if waiter in self._queues[priority].get(tenant, ()):
+                    self._queues[priority][tenant].remove(waiter)
+                self._forget_if_idle(tenant)
+            raise
+
+        wait = time.monotonic() - waiter.enqueued_at
+        self._waits[priority].append(wait)
+        ticket = Ticket(tenant=tenant, priority=priority, wait_seconds=wait, usage=defaultdict(int))
+        if wait > 1.0:
+            logger.info("Run for tenant %s (%s) waited %.2fs for a slot", tenant, priority, wait)
+        token = current_usage.set(ticket.usage)
+        try:
+            yield ticket
+        finally:
+            current_usage.reset(token)
+            tokens = ticket.usage.get("input_tokens", 0) + ticket.usage.get("output_tokens", 0)
+            if tokens:
+                self._usage[tenant].append((time.monotonic(), tokens))
+            self.completed += 1
+            self._release(tenant)
+
+    # ── Metrics ──
+    def metrics(self) -> Dict[str, Any]:
+        tokens = {tenant: self.tokens_used(tenant) for tenant in list(self._usage)}
+        tenants = set(self._running) | set(self._usage) | {
+            t for by_tenant in self._queues.values() for t, q in by_tenant.items() if q
+        }
+        return {
+            "running": self._running_total,
+            "queued": self.queued(),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_seconds": {
+                priority: {
+                    "samples": len(waits),
+                    "p50": round(_percentile(list(waits), 50), 4),
+                    "p95": round(_percentile(list(waits), 95), 4),
+                    "max": round(max(waits, default=0.0), 4),
+                }
+                for priority, waits in self._waits.items()
+            },
+            "tenants": {
+                tenant: {
+                    "running": self._running.get(tenant, 0),
+                    "queued": sum(len(by_tenant.get(tenant, ())) for by_tenant in self._queues.values()),
+                    "tokens_in_window": tokens.get(tenant, 0),
+                }
+                for tenant in sorted(tenants)
+            },
+        }
+
+
+def resolve_tenant(request: HTTPConnection, settings: Settings) -> str:
+    """Tenant for a caller's budgets and fair share.
+
+    The tenant comes from the ``X-API-Key``: the name it maps to in
+    ``tenant_api_keys``. Keys are not verified anywhere else, so every unknown key
+    shares the ``unknown`` tenant (and its budget) unless ``tenant_hash_unknown_keys``
+    gives each one its own. ``X-Tenant-ID`` is a caller-chosen string, so it is
+    only honoured with ``trust_tenant_header`` (behind a proxy that authenticates
+    callers and sets it).
+    """
+    if settings.trust_tenant_header:
+        tenant = request.headers.get("x-tenant-id", "").strip()
+        if tenant:
+            return tenant[:64]
+    api_key = request.headers.get("x-api-key", "").strip()
+    if not api_key:
+        return "anonymous"
+    known = settings.tenant_api_keys.get(api_key)
+    if known:
+        return known
+    if settings.tenant_hash_unknown_keys:
+        return "key:" + hashlib.sha256(api_key.encode()).hexdigest()[:12]
+    return "unknown"
+
+
+def get_tenant(request: Request) -> str:
+    return resolve_tenant(request, get_settings())
+
+
+def get_priority(request: Request) -> str:
+    """Callers opt into the batch class with ``X-Priority: batch``."""
+    priority = request.headers.get("x-priority", "interactive").strip().lower()
+    return priority if priority in PRIORITIES else "interactive"
+
+
+@lru_cache(maxsize=1)
+def get_scheduler() -> FairScheduler:
+    settings = get_settings()
+    return FairScheduler(
+        max_concurrency=settings.scheduler_max_concurrency,
+        tenant_max_concurrency=settings.tenant_max_concurrency,
+        tenant_weights=settings.tenant_weights,
+        token_budget=settings.tenant_token_budget,
+        budget_window_seconds=settings.tenant_budget_window_seconds,
+        max_queue=settings.scheduler_max_queue,
+    )
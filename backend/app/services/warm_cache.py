@@ -0,0 +1,101 @@
+"""Precomputed ("warm") blueprints for briefs that are likely to be requested again.
+
+Entries are written by the cache warmer (``app.services.cache_warmer``) and read
+by ``CreatorWorkflowService`` for briefs with the same normalised prompt,
+content type, platform and duration. Every served copy carries freshness
+metadata; entries older than ``warm_ttl_seconds`` are never served.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from app.agents.local_analyzer import brief_key
+from app.core.config import get_settings
+
+
+@dataclass
+class WarmEntry:
+    state: Dict[str, Any]
+    computed_at: float
+    hits: int = 0
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.computed_at
+
+
+class WarmCache:
+    """Thread-safe LRU of finished run states keyed by brief, with a TTL."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 6 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str, str, int], WarmEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def peek(self, brief: Mapping[str, Any]) -> Optional[WarmEntry]:
+        """The entry for ``brief`` if there is one, fresh or not, without counting a lookup."""
+        with self._lock:
+            return self._entries.get(brief_key(brief))
+
+    def get(self, brief: Mapping[str, Any]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """A copy of the warm state for ``brief`` and its freshness metadata, if fresh."""
+        key = brief_key(brief)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.age(now) > self.ttl_seconds:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self.hits += 1
+            state = copy.deepcopy(entry.state)
+        freshness = {
+            "source": "warm_cache",
+            "computed_at": entry.computed_at,
+            "age_seconds": round(now - entry.computed_at, 1),
+            "expires_at": entry.computed_at + self.ttl_seconds,
+        }
+        return state, freshness
+
+    def put(self, state: Mapping[str, Any]) -> None:
+        key = brief_key(state)
+        with self._lock:
+            self._entries[key] = WarmEntry(state=copy.deepcopy(dict(state)), computed_at=time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "oldest_age_seconds": round(max((e.age(now) for e in self._entries.values()), default=0.0), 1),
+            }
+
+
+@lru_cache(maxsize=1)
+def get_warm_cache() -> Optional[WarmCache]:
+    """Process-wide warm cache, or ``None`` when cache warming is disabled."""
+    settings = get_settings()
+    if not settings.cache_warming_enabled:
+        return None
+    return WarmCache(max_entries=settings.warm_cache_size, ttl_seconds=settings.warm_ttl_seconds)
@@ -0,0 +1,100 @@
+"""Event-loop stall caused by logging to a slow sink, before and after the queue pipeline.
+
+Simulates concurrent runs that log from the event loop while stdout is a pipe that
+takes ``--write-ms`` per write (a back-pressured Docker log driver). A heartbeat
+task measures how late the loop wakes it up.
+
+    cd backend && python -m benchmarks.logging_stall --runs 50 --records 40 --write-ms 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import logging
+import time
+from typing import Dict
+
+from app.core.config import Settings
+from app.core.logging import configure_logging, shutdown_logging
+
+
+class SlowSink(io.TextIOBase):
+    def __init__(self, write_seconds: float):
+        self.write_seconds = write_seconds
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        time.sleep(self.write_seconds)
+        self.lines += text.count("\n")
+        return len(text)
+
+
+async def _workload(runs: int, records: int) -> Dict[str, float]:
+    logger = logging.getLogger("bench.node")
+    lags = []
+    stop = asyncio.Event()
+
+    async def heartbeat() -> None:
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(max(0.0, time.perf_counter() - started - 0.001))
+
+    async def run(i: int) -> None:
+        for n in range(records):
+            logger.info("run %d step %d", i, n)
+            await asyncio.sleep(0)
+
+    beat = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    await asyncio.gather(*(run(i) for i in range(runs)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await beat
+    ordered = sorted(lags) or [0.0]
+    return {
+        "elapsed_s": elapsed,
+        "max_stall_ms": ordered[-1] * 1000,
+        "p99_stall_ms": ordered[int(0.99 * (len(ordered) - 1))] * 1000,
+        "total_stall_s": sum(lags),
+    }
+
+
+def _report(name: str, result: Dict[str, float], sink: SlowSink) -> None:
+    print(
+        f"{name:<22} elapsed {result['elapsed_s']:7.3f}s  max stall {result['max_stall_ms']:8.1f}ms  "
+        f"p99 stall {result['p99_stall_ms']:7.1f}ms  total stall {result['total_stall_s']:7.3f}s  "
+        f"lines written {sink.lines}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--records", type=int, default=40)
+    parser.add_argument("--write-ms", type=float, default=2.0)
+    args = parser.parse_args()
+    root = logging.getLogger()
+
+    # Before: synchronous StreamHandler, as configure_logging used to install.
+    sink = SlowSink(args.write_ms / 1000)
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s"))
+    root.handlers[:] = [handler]
+    root.setLevel(logging.INFO)
+    _report("sync StreamHandler", asyncio.run(_workload(args.runs, args.records)), sink)
+
+    # After: queue pipeline, unsampled and sampled.
+    for name, burst in (("queue, no sampling", 0), ("queue + sampling", 20)):
+        sink = SlowSink(args.write_ms / 1000)
+        settings = Settings(_env_file=None, log_sample_burst=burst, log_queue_size=100_000)
+        configure_logging(settings, stream=sink)
+        result = asyncio.run(_workload(args.runs, args.records))
+        shutdown_logging()  # drain, so every accepted record is counted
+        _report(name, result, sink)
+
+
+if __name__ == "__main__":
+    main()
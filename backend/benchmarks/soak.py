@@ -0,0 +1,282 @@
+"""Soak test: many concurrent /api/create/stream connections against the in-process app.
+
+Drives ``--concurrency`` simultaneous SSE clients through ``httpx.ASGITransport``
+into the real FastAPI app (middleware, scheduler, service, graph, SSE
+serialisation), with a scripted chat model in place of Groq, for ``--duration``
+seconds or ``--runs`` runs. Reports per-run latency percentiles, events per
+second and memory growth per 1,000 runs, measured with tracemalloc (Python heap)
+and RSS after a warm-up that fills the bounded caches. Exits non-zero when the
+Python heap grows by more than ``--max-bytes-per-run`` per run.
+
+    cd backend && python -m benchmarks.soak --concurrency 200 --duration 60
+
+ASGITransport hands the response over once the stream ends, so latency is the
+full run as seen by a client, not time to first event.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import httpx
+from fastapi import Request
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.agents.workflow import build_creator_graph
+from app.core.config import Settings
+from app.main import app
+from app.services.report_service import CreatorWorkflowService, get_creator_service
+from app.services.scheduler import FairScheduler, get_scheduler, get_tenant, resolve_tenant
+
+SCRIPT = (
+    "[00:00] HOOK: Rain hits the palace steps.\n"
+    "[VISUAL: close-up of raindrops]\n"
+    "VO: The old city wakes up in the monsoon, one street at a time.\n"
+    "[MUSIC: soft sitar]\n"
+    "[TEXT: Monsoon diaries]\n"
+    "CTA: Follow for more."
+)
+
+RESPONSES: Dict[str, Any] = {
+    "Content Analyzer Agent": {"language": "English", "region": "India", "genre": "cinematic", "tone": "dramatic"},
+    "Script Writer Agent": SCRIPT,
+    "Timeline Planner Agent": [
+        {"timestamp": "00:00 - 00:15", "shot_type": "close-up", "visual": "rain", "audio": "sitar"},
+        {"timestamp": "00:15 - 00:30", "shot_type": "wide", "visual": "fort", "audio": "VO"},
+    ],
+    "Enhancement Agent": {"hooks": ["h1"], "hashtags": ["#monsoon"] * 8, "captions": []},
+    "Story Architect Agent": {"narrative_arc": "before/after", "payoff": "calm"},
+    "Quality Critic": {"score": 8, "critique": "Solid piece with a clear hook.", "section_scores": {"hook": 8}},
+    "Script Refiner Agent": {"edits": []},
+}
+
+BRIEFS = ("monsoon in {city}", "street food tour of {city}", "a day in my life in {city}", "hidden cafes of {city}")
+CITIES = ("Jaipur", "Mumbai", "Delhi", "Goa", "Kolkata", "Pune", "Udaipur", "Chennai")
+
+
+class ScriptedLLM(BaseChatModel):
+    """Answers each agent with a fixed response after a jittered delay; keeps no per-call state."""
+
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "soak-scripted"
+
+    def _answer(self, messages: List[BaseMessage]) -> ChatResult:
+        text = "\n".join(str(m.content) for m in messages)
+        value = next((v for marker, v in RESPONSES.items() if marker in text), "")
+        content = value if isinstance(value, str) else json.dumps(value)
+        usage = {"input_tokens": len(text) // 4, "output_tokens": len(content) // 4, "total_tokens": (len(text) + len(content)) // 4}
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content, usage_metadata=usage))])
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return self._answer(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency_ms:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * self.latency_ms / 1000)
+        return self._answer(messages)
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] if ordered else 0.0
+
+
+def install(settings: Settings, latency_ms: float, concurrency: int) -> CreatorWorkflowService:
+    """Point the app's service and scheduler dependencies at a scripted-LLM pipeline."""
+    service = CreatorWorkflowService(settings)
+    llm = ScriptedLLM(latency_ms=latency_ms)
+    service.graph = build_creator_graph(
+        llm, settings, prefix_meter=service.prefix_meter, analysis_cache=service.analysis_cache
+    )
+    service.draft_graph = build_creator_graph(llm, settings, draft=True, analysis_cache=service.analysis_cache)
+    scheduler = FairScheduler(
+        max_concurrency=concurrency, tenant_max_concurrency=concurrency, max_queue=concurrency * 2
+    )
+    app.dependency_overrides[get_creator_service] = lambda: service
+    app.dependency_overrides[get_scheduler] = lambda: scheduler
+
+    def tenant(request: Request) -> str:
+        return resolve_tenant(request, settings)
+
+    app.dependency_overrides[get_tenant] = tenant
+    return service
+
+
+async def soak(
+    concurrency: int = 200,
+    duration: float = 30.0,
+    runs: Optional[int] = None,
+    warmup: int = 500,
+    latency_ms: float = 20.0,
+    tenants: int = 8,
+    preview: bool = False,
+    trace_memory: bool = True,
+    settings: Optional[Settings] = None,
+) -> Dict[str, Any]:
+    """Run the soak and return its report.
+
+    ``warmup`` runs complete first and are not measured; memory is compared
+    between the two idle points (no run in flight) before and after measuring.
+    """
+    settings = settings or Settings(groq_api_key="soak", history_enabled=False, _env_file=None)
+    # One registered key per simulated tenant.
+    keys = {f"soak-{i}": f"tenant-{i}" for i in range(tenants)}
+    settings = settings.model_copy(update={"tenant_api_keys": {**settings.tenant_api_keys, **keys}})
+    install(settings, latency_ms, concurrency)
+    latencies: List[float] = []
+    counters = {"events": 0, "errors": 0}
+
+    async def phase(client: httpx.AsyncClient, total: Optional[int], until: float, record: bool) -> None:
+        remaining = [total if total is not None else -1]
+
+        async def client_loop(worker: int) -> None:
+            while remaining[0] != 0 and time.perf_counter() < until:
+                remaining[0] -= 1
+                brief = random.choice(BRIEFS).format(city=random.choice(CITIES))
+                started = time.perf_counter()
+                try:
+                    response = await client.get(
+                        "/api/create/stream",
+                        params={"prompt": brief, "preview": str(preview).lower()},
+                        headers={"X-API-Key": f"soak-{worker % tenants}"},
+                    )
+                    events = [line[7:] for line in response.text.splitlines() if line.startswith("event: ")]
+                    failed = response.status_code != 200 or not events or events[-1] != "done"
+                except httpx.HTTPError:
+                    events, failed = [], True
+                if record:
+                    latencies.append(time.perf_counter() - started)
+                    counters["events"] += len(events)
+                    counters["errors"] += int(failed)
+
+        await asyncio.gather(*(client_loop(i) for i in range(concurrency)))
+
+    def memory() -> tuple[int, int]:
+        gc.collect()
+        return (tracemalloc.get_traced_memory()[0] if trace_memory else 0), rss_bytes()
+
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://soak", timeout=None) as client:
+            if warmup:
+                await phase(client, warmup, float("inf"), record=False)
+            heap_before, rss_before = memory()
+            started = time.perf_counter()
+            until = float("inf") if runs is not None else started + duration
+            await phase(client, runs, until, record=True)
+            elapsed = time.perf_counter() - started
+        heap_after, rss_after = memory()
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        app.dependency_overrides.pop(get_creator_service, None)
+        app.dependency_overrides.pop(get_scheduler, None)
+        app.dependency_overrides.pop(get_tenant, None)
+
+    measured = len(latencies)
+    ordered = sorted(latencies)
+
+    def per_1k_mb(growth: int) -> float:
+        return round(growth / measured * 1000 / 2**20, 3) if measured else 0.0
+
+    return {
+        "concurrency": concurrency,
+        "runs": measured,
+        "errors": counters["errors"],
+        "elapsed_s": round(elapsed, 3),
+        "runs_per_s": round(measured / elapsed, 2) if elapsed > 0 else 0.0,
+        "events_per_s": round(counters["events"] / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(ordered, 50) * 1000, 1),
+            "p95": round(_percentile(ordered, 95) * 1000, 1),
+            "p99": round(_percentile(ordered, 99) * 1000, 1),
+            "max": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+        },
+        "heap_growth_bytes": heap_after - heap_before if trace_memory else None,
+        "heap_bytes_per_run": round((heap_after - heap_before) / measured, 1) if trace_memory and measured else None,
+        "heap_growth_per_1k_runs_mb": per_1k_mb(heap_after - heap_before) if trace_memory else None,
+        "rss_growth_bytes": rss_after - rss_before,
+        "rss_growth_per_1k_runs_mb": per_1k_mb(rss_after - rss_before),
+    }
+
+
+def check(report: Dict[str, Any], max_bytes_per_run: float, max_rss_bytes_per_run: float = 0.0) -> List[str]:
+    """Guardrail violations in a soak report (empty when it passes)."""
+    failures = []
+    if report["errors"]:
+        failures.append(f"{report['errors']} of {report['runs']} runs failed")
+    per_run = report["heap_bytes_per_run"]
+    if per_run is not None and per_run > max_bytes_per_run:
+        failures.append(f"Python heap grew {per_run:.0f} B/run (limit {max_bytes_per_run:.0f})")
+    if max_rss_bytes_per_run and report["runs"]:
+        rss_per_run = report["rss_growth_bytes"] / report["runs"]
+        if rss_per_run > max_rss_bytes_per_run:
+            failures.append(f"RSS grew {rss_per_run:.0f} B/run (limit {max_rss_bytes_per_run:.0f})")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to measure (ignored with --runs)")
+    parser.add_argument("--runs", type=int, default=None, help="measure exactly this many runs instead")
+    # Long enough for RSS to reach the allocator's high-water mark.
+    parser.add_argument("--warmup", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="mean scripted LLM latency per call")
+    parser.add_argument("--tenants", type=int, default=8)
+    parser.add_argument("--preview", action="store_true", help="also run the draft graph for every stream")
+    parser.add_argument("--max-bytes-per-run", type=float, default=2048.0)
+    parser.add_argument("--max-rss-bytes-per-run", type=float, default=0.0, help="0 = report only")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="faster, RSS only")
+    args = parser.parse_args()
+
+    # Keep per-node INFO logging out of the measurement.
+    logging.getLogger().setLevel(logging.WARNING)
+    report = asyncio.run(
+        soak(
+            concurrency=args.concurrency,
+            duration=args.duration,
+            runs=args.runs,
+            warmup=args.warmup,
+            latency_ms=args.latency_ms,
+            tenants=args.tenants,
+            preview=args.preview,
+            trace_memory=not args.no_tracemalloc,
+        )
+    )
+    print(json.dumps(report, indent=2))
+    failures = check(report, args.max_bytes_per_run, args.max_rss_bytes_per_run)
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
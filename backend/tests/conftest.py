@@ -0,0 +1,99 @@
+import asyncio
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.core.config import Settings
+
+SCRIPT = (
+    "[00:00] HOOK: Rain hits the palace steps.\n"
+    "[VISUAL: close-up of raindrops]\n"
+    "VO: Jaipur wakes up in the monsoon.\n"
+    "[MUSIC: soft sitar]\n"
+    "[TEXT: Jaipur in Monsoon]\n"
+    "CTA: Follow for more."
+)
+
+DEFAULT_RESPONSES: Dict[str, Any] = {
+    "analyzer": {"language": "English", "region": "India", "genre": "cinematic", "tone": "dramatic"},
+    "script_writer": SCRIPT,
+    "timeline_planner": [
+        {"timestamp": "00:00 - 00:15", "shot_type": "close-up", "visual": "rain", "audio": "sitar"},
+        {"timestamp": "00:15 - 00:30", "shot_type": "wide", "visual": "fort", "audio": "VO"},
+    ],
+    "enhancer": {"hooks": ["h1"], "hashtags": ["#jaipur"] * 5, "captions": []},
+    "story_architect": {"narrative_arc": "before/after", "payoff": "calm"},
+    "critic": {"score": 8, "critique": "Solid piece with a clear hook.", "section_scores": {"hook": 8, "cta": 8}},
+    "ranker": {"rankings": [{"candidate": 1, "score": 8, "critique": "Clear and on brief."}], "winner": 1},
+    "refiner": {"edits": [{"section": "cta", "find": "CTA: Follow for more.", "replace": "CTA: Save this for your next trip."}]},
+}
+
+NODE_MARKERS = (
+    ("Script Ranker Agent", "ranker"),
+    ("Content Analyzer Agent", "analyzer"),
+    ("Script Writer Agent", "script_writer"),
+    ("Timeline Planner Agent", "timeline_planner"),
+    ("Enhancement Agent", "enhancer"),
+    ("Story Architect Agent", "story_architect"),
+    ("Quality Critic", "critic"),
+    ("Script Refiner Agent", "refiner"),
+)
+
+
+def node_for_prompt(text: str) -> str:
+    for marker, node in NODE_MARKERS:
+        if marker in text:
+            return node
+    return "unknown"
+
+
+class FakeLLM(BaseChatModel):
+    """Deterministic chat model that answers according to which agent is prompting it."""
+
+    responses: Dict[str, Any] = {}
+    calls: List[str] = []
+    max_tokens: List[Optional[int]] = []
+    responder: Optional[Callable[[str, str], Any]] = None
+    latency: Optional[Callable[[str], float]] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-creator"
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text = "\n".join(str(m.content) for m in messages)
+        node = node_for_prompt(text)
+        self.calls.append(node)
+        return self._respond(node, text)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text = "\n".join(str(m.content) for m in messages)
+        node = node_for_prompt(text)
+        self.calls.append(node)
+        self.max_tokens.append(kwargs.get("max_tokens"))
+        if self.latency:
+            await asyncio.sleep(self.latency(node))
+        return self._respond(node, text)
+
+    def _respond(self, node: str, text: str) -> ChatResult:
+        value = self.responder(node, text) if self.responder else None
+        if value is None:
+            value = self.responses.get(node, DEFAULT_RESPONSES.get(node, ""))
+        if isinstance(value, AIMessage):
+            return ChatResult(generations=[ChatGeneration(message=value)])
+        content = value if isinstance(value, str) else json.dumps(value)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+
+@pytest.fixture
+def fake_llm() -> FakeLLM:
+    return FakeLLM(responses={}, calls=[], max_tokens=[])
+
+
+@pytest.fixture
+def settings() -> Settings:
+    return Settings(groq_api_key="test-key", _env_file=None)
@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+from app.services.batch_service import BatchRunner, finished_ids, record_id
+from app.services.report_service import create_initial_state
+
+
+class StubService:
+    def __init__(self, fail_on=()):
+        self.fail_on = set(fail_on)
+        self.prompts = []
+
+    async def run_create(self, prompt, content_type, duration_seconds, platform, deadline_seconds=None):
+        self.prompts.append(prompt)
+        if prompt in self.fail_on:
+            raise RuntimeError("quota exceeded")
+        state = create_initial_state(prompt, content_type, duration_seconds, platform)
+        state["final_blueprint"] = f"# {prompt}"
+        return state
+
+
+def write_briefs(path, prompts):
+    path.write_text("".join(json.dumps({"id": f"b{i}", "prompt": p}) + "\n" for i, p in enumerate(prompts)))
+
+
+def test_batch_runs_and_resumes(tmp_path):
+    briefs = tmp_path / "briefs.jsonl"
+    results = tmp_path / "results.jsonl"
+    write_briefs(briefs, ["monsoon in Jaipur", "street food in Delhi", "Goa sunsets"])
+
+    first = StubService(fail_on={"Goa sunsets"})
+    report = asyncio.run(BatchRunner(first, concurrency=2).run(briefs, results))
+    assert (report.completed, report.failed) == (2, 1)
+    assert finished_ids(results) == {"b0", "b1"}
+
+    # Simulate a crash mid-write, then resume: only the failed brief is rerun.
+    with results.open("a") as handle:
+        handle.write('{"id": "b2", "sta')
+    second = StubService()
+    report = asyncio.run(BatchRunner(second, concurrency=2).run(briefs, results))
+    assert second.prompts == ["Goa sunsets"]
+    assert report.skipped == 2
+    assert finished_ids(results) == {"b0", "b1", "b2"}
+
+
+def test_record_id_is_stable_without_id():
+    record = {"prompt": "monsoon in Jaipur", "platform": "tiktok"}
+    assert record_id(record) == record_id(dict(record))
+    assert record_id({"id": 7, "prompt": "x"}) == "7"
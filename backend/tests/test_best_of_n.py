@@ -0,0 +1,70 @@
+import asyncio
+import re
+import time
+
+from app.agents.workflow import build_creator_graph
+from app.services.report_service import create_initial_state
+
+SCRIPT = "[00:00] HOOK: Rain hits the palace steps.\nVO: Jaipur wakes up in the monsoon.\nCTA: Follow for more."
+
+
+def _candidate(text: str) -> int:
+    return int(re.search(r"This is candidate (\d+) of", text).group(1))
+
+
+def test_best_of_n_sends_only_the_winner_downstream(fake_llm, settings):
+    settings.quality_mode = "best_of_n"
+    prompts = {}
+
+    def respond(node, text):
+        prompts.setdefault(node, []).append(text)
+        if node == "script_writer":
+            return SCRIPT.replace("Jaipur wakes up", f"Take {_candidate(text)}: Jaipur wakes up")
+        if node == "ranker":
+            return {
+                "rankings": [
+                    {"candidate": 1, "score": 6, "critique": "Flat hook."},
+                    {"candidate": 2, "score": 9, "section_scores": {"hook": 9}, "critique": "Best hook."},
+                    {"candidate": 3, "score": 7, "critique": "Fine."},
+                ],
+                "winner": 2,
+            }
+        return None
+
+    fake_llm.responder = respond
+    fake_llm.latency = lambda node: 0.2 if node == "script_writer" else 0.0
+    graph = build_creator_graph(fake_llm, settings)
+
+    started = time.perf_counter()
+    result = asyncio.run(graph.ainvoke(create_initial_state("monsoon in Jaipur", "reel", 30)))
+
+    assert time.perf_counter() - started < 0.5  # three 0.2 s candidates ran concurrently
+    assert fake_llm.calls.count("script_writer") == 3
+    assert fake_llm.calls.count("ranker") == 1
+    assert "critic" not in fake_llm.calls and "refiner" not in fake_llm.calls
+    assert "Take 2:" in result["script"]
+    assert "Take 2:" in prompts["timeline_planner"][0]
+    assert result["score"] == 9 and result["section_scores"] == {"hook": 9}
+    assert [c["winner"] for c in result["candidates"]] == [False, True, False]
+    assert [c["temperature"] for c in result["candidates"]] == settings.candidate_temperatures
+    assert not result["degraded"]
+
+
+def test_unusable_ranking_falls_back_to_rules(fake_llm, settings):
+    settings.quality_mode = "best_of_n"
+    settings.script_candidates = 2
+
+    def respond(node, text):
+        if node == "script_writer":
+            # Only candidate 2 closes with a call to action.
+            return SCRIPT if _candidate(text) == 2 else SCRIPT.replace("CTA: Follow for more.", "The end.")
+        if node == "ranker":
+            return "I liked them both."
+        return None
+
+    fake_llm.responder = respond
+    result = asyncio.run(build_creator_graph(fake_llm, settings).ainvoke(create_initial_state("monsoon in Jaipur")))
+
+    assert result["script"] == SCRIPT
+    assert result["score"] == settings.min_quality_score
+    assert result["candidates"][1]["winner"]
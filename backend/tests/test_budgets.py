@@ -0,0 +1,59 @@
+import asyncio
+
+from langchain_core.messages import AIMessage
+
+from app.agents.budgets import output_token_budget
+from app.agents.llm import LLMClient
+from app.agents.workflow import build_creator_graph
+from app.services.report_service import create_initial_state
+
+
+def test_budgets_scale_with_duration_and_format(settings):
+    reel = create_initial_state("x", "reel", 30, "instagram")
+    video = create_initial_state("x", "youtube", 600, "youtube")
+
+    assert output_token_budget("script_writer", reel, settings) == settings.node_output_tokens["script_writer"]
+    assert output_token_budget("script_writer", video, settings) > 3 * output_token_budget("script_writer", reel, settings)
+    # Nodes without a per-minute allowance only scale by format.
+    assert output_token_budget("critic", video, settings) < output_token_budget("timeline_planner", video, settings)
+    assert output_token_budget("timeline_planner", create_initial_state("x", "film", 3600), settings) == settings.max_output_tokens
+
+    settings.output_budgets_enabled = False
+    assert output_token_budget("script_writer", reel, settings) is None
+
+
+def test_short_form_uses_compact_enhancement_brief(fake_llm, settings):
+    prompts = {}
+
+    def capture(node, text):
+        prompts[node] = text
+
+    fake_llm.responder = capture
+    graph = build_creator_graph(fake_llm, settings)
+    asyncio.run(graph.ainvoke(create_initial_state("monsoon in Jaipur", "reel", 30)))
+    assert "8-10 relevant hashtags" in prompts["enhancer"]
+    assert "posting_strategy" not in prompts["enhancer"]
+    assert all(limit for limit in fake_llm.max_tokens)
+
+    asyncio.run(graph.ainvoke(create_initial_state("monsoon in Jaipur", "youtube", 600)))
+    assert "15-20 relevant hashtags" in prompts["enhancer"]
+
+
+def test_truncated_output_is_continued(fake_llm, settings):
+    pieces = iter([
+        AIMessage(content='{"score": 8, "crit', response_metadata={"finish_reason": "length"},
+                  usage_metadata={"input_tokens": 100, "output_tokens": 450, "total_tokens": 550}),
+        AIMessage(content='ique": "ok"}', response_metadata={"finish_reason": "stop"},
+                  usage_metadata={"input_tokens": 120, "output_tokens": 5, "total_tokens": 125}),
+    ])
+    fake_llm.responder = lambda node, text: next(pieces)
+    client = LLMClient(fake_llm, settings)
+
+    response = asyncio.run(client.ainvoke("critic", "## Your task\nYou are the Quality Critic.", max_tokens=450))
+
+    assert response.content == '{"score": 8, "critique": "ok"}'
+    assert response.usage_metadata["output_tokens"] == 455
+    assert response.response_metadata["continuations"] == 1
+    budgets = client.stats()["budgets"]["critic"]
+    assert budgets["truncations"] == 1 and budgets["continuations"] == 1
+    assert budgets["calls"] == 2
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from app.agents.workflow import build_creator_graph
+from app.services.cache_warmer import CacheWarmer, trending_briefs
+from app.services.history_service import RunHistoryStore
+from app.services.report_service import CreatorWorkflowService, create_initial_state
+from app.services.scheduler import FairScheduler
+from app.services.warm_cache import WarmCache
+
+
+def row(prompt, recent, total, platform="instagram", last_seen=0.0):
+    return {"prompt": prompt, "content_type": "reel", "platform": platform, "duration_seconds": 30,
+            "recent": recent, "total": total, "last_seen": last_seen}
+
+
+def test_trending_briefs_merge_spellings_and_favour_rising(settings):
+    settings.warm_top_k = 2
+    rows = [
+        row("Monsoon in Jaipur", 3, 4, last_seen=2.0),
+        row("monsoon in jaipur!", 2, 2, last_seen=1.0),  # same brief: 5 recent of 6
+        row("gym motivation", 6, 60),                    # frequent but flat
+        row("Diwali lights", 4, 4),                      # new and rising
+        row("one-off idea", 1, 1),                       # below warm_min_runs
+    ]
+
+    briefs = trending_briefs(rows, settings)
+
+    # "gym motivation" has more recent runs than "Diwali lights" but is not rising.
+    assert [b.prompt for b in briefs] == ["Monsoon in Jaipur", "Diwali lights"]
+    assert briefs[0].recent == 5 and briefs[0].total == 6
+
+
+@pytest.fixture
+def warming(fake_llm, settings, tmp_path):
+    settings.cache_warming_enabled = True
+    settings.warm_min_runs = 2
+    store = RunHistoryStore(str(tmp_path / "runs.db"))
+    service = CreatorWorkflowService(settings, history=store, warm_cache=WarmCache(ttl_seconds=60))
+    service.graph = build_creator_graph(fake_llm, settings)
+    scheduler = FairScheduler()
+    warmer = CacheWarmer(service, store, scheduler, service.warm_cache, settings)
+    for prompt in ("monsoon in Jaipur", "Monsoon in Jaipur", "street food in Delhi"):
+        state = create_initial_state(prompt)
+        state.update(score=8, iteration_count=1, final_blueprint="# Blueprint")
+        store.submit(state)
+    store.flush()
+    yield service, warmer, scheduler
+    store.close()
+
+
+def test_warmer_precomputes_and_service_serves_with_freshness(warming, fake_llm):
+    service, warmer, _ = warming
+
+    summary = asyncio.run(warmer.run_cycle())
+    assert summary["warmed"] == ["Monsoon in Jaipur"]
+    assert warmer.quota_left() == warmer.settings.warm_daily_quota - 1
+    assert service.history.count() == 3  # warm runs stay out of the history
+    calls = len(fake_llm.calls)
+
+    state = asyncio.run(service.run_create("monsoon in jaipur"))
+    assert len(fake_llm.calls) == calls
+    assert state["prompt"] == "monsoon in jaipur"
+    assert state["final_blueprint"] and state["warm"]["source"] == "warm_cache"
+    # The precompute run is not in the history, so its id is not exposed.
+    assert "source_run_id" not in state["warm"]
+    assert state["warm"]["expires_at"] > state["warm"]["computed_at"]
+
+    async def stream():
+        return [e async for e in service.stream_create("Monsoon in Jaipur")]
+
+    events = asyncio.run(stream())
+    assert [e["event"] for e in events] == ["start", "done"]
+    assert events[-1]["state"]["warm"]["age_seconds"] >= 0
+
+    fresh = asyncio.run(service.run_create("monsoon in jaipur", fresh=True))
+    assert len(fake_llm.calls) > calls and not fresh["warm"]
+
+    # Still fresh, so the next cycle has nothing to do.
+    assert asyncio.run(warmer.run_cycle())["warmed"] == []
+
+
+def test_warmer_respects_load_and_quota(warming):
+    service, warmer, scheduler = warming
+
+    async def busy_cycle():
+        async with scheduler.slot("someone", "interactive"):
+            return await warmer.run_cycle()
+
+    assert asyncio.run(busy_cycle())["stopped"] == "busy"
+
+    warmer.settings.warm_daily_quota = 0
+    assert asyncio.run(warmer.run_cycle())["stopped"] == "quota"
+    assert service.warm_cache.snapshot()["entries"] == 0
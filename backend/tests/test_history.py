@@ -0,0 +1,63 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.history_service import RunHistoryStore, get_history_store
+from app.services.report_service import create_initial_state
+
+
+@pytest.fixture
+def store(tmp_path):
+    history = RunHistoryStore(str(tmp_path / "runs.db"))
+    yield history
+    history.close()
+
+
+def finished(prompt, platform="instagram"):
+    state = create_initial_state(prompt, platform=platform)
+    state.update(score=8, iteration_count=1, final_blueprint=f"# Blueprint\n{prompt}")
+    return state
+
+
+def test_list_search_and_get(store):
+    prompts = ["monsoon in Jaipur", "street food in Delhi", "Goa sunsets", "Jaipur palaces at night"]
+    for prompt in prompts:
+        store.submit(finished(prompt), elapsed_seconds=3.2, timings={"critic": 1.1})
+    store.flush()
+
+    page, cursor = store.list_runs(limit=3)
+    assert [r["prompt"] for r in page] == prompts[::-1][:3]
+    rest, end = store.list_runs(limit=3, cursor=cursor)
+    assert [r["prompt"] for r in rest] == [prompts[0]] and end is None
+
+    assert {r["prompt"] for r in store.search("jaip")} == {"monsoon in Jaipur", "Jaipur palaces at night"}
+
+    record = store.get(page[0]["run_id"])
+    assert record["timings"] == {"critic": 1.1}
+    assert record["state"]["final_blueprint"].endswith("Jaipur palaces at night")
+
+
+def test_compaction_enforces_max_runs(store):
+    store.max_runs = 2
+    for i in range(5):
+        store.submit(finished(f"brief number {i}"))
+    store.flush()
+    assert store.compact() == 3
+    assert store.count() == 2
+    assert store.search("number 0") == []
+
+
+def test_runs_endpoints(store):
+    state = finished("monsoon in Jaipur", platform="tiktok")
+    store.submit(state)
+    store.flush()
+    app.dependency_overrides[get_history_store] = lambda: store
+    try:
+        client = TestClient(app)
+        listing = client.get("/api/runs", params={"platform": "tiktok"}).json()
+        assert listing["runs"][0]["run_id"] == state["run_id"]
+        assert client.get("/api/runs/search", params={"q": "monsoon"}).json()[0]["platform"] == "tiktok"
+        assert client.get(f"/api/runs/{state['run_id']}").json()["state"]["prompt"] == "monsoon in Jaipur"
+        assert client.get("/api/runs/missing").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
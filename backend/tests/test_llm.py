@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from app.agents.cassette import CassetteMiss
+from app.agents.llm import LLMClient, NodeLatencyTracker
+from app.agents.workflow import build_creator_graph
+from app.core.config import Settings
+from app.services.report_service import CreatorWorkflowService, create_initial_state
+
+
+def test_latency_tracker_percentiles():
+    tracker = NodeLatencyTracker(window=10)
+    for value in range(1, 21):
+        tracker.record("critic", float(value))
+    assert tracker.count("critic") == 10
+    assert tracker.percentile("critic", 50) == 15.0
+    assert tracker.percentile("critic", 100) == 20.0
+    assert tracker.percentile("analyzer", 95) is None
+
+
+def test_hedge_replaces_slow_call(fake_llm, settings):
+    settings.llm_hedging_enabled = True
+    settings.llm_hedge_min_samples = 3
+    settings.llm_hedge_budget_ratio = 0.5
+    client = LLMClient(fake_llm, settings)
+    for _ in range(3):
+        client.latency.record("critic", 0.05)
+    client.total_calls = 10
+
+    delays = iter([1.0, 0.0])
+    fake_llm.latency = lambda node: next(delays)
+
+    async def run():
+        started = asyncio.get_running_loop().time()
+        await client.ainvoke("critic", "You are the Quality Critic.")
+        return asyncio.get_running_loop().time() - started
+
+    elapsed = asyncio.run(run())
+    assert elapsed < 0.5
+    assert client.hedged_calls == 1
+    assert client.hedge_wins == 1
+    # The backup's win is recorded as what the caller waited, so the window keeps its slow tail.
+    assert client.latency.percentile("critic", 1) >= 0.05
+
+
+def test_hedging_respects_budget(fake_llm, settings):
+    settings.llm_hedging_enabled = True
+    settings.llm_hedge_min_samples = 1
+    settings.llm_hedge_budget_ratio = 0.1
+    client = LLMClient(fake_llm, settings)
+    client.latency.record("critic", 0.01)
+    fake_llm.latency = lambda node: 0.05
+
+    asyncio.run(client.ainvoke("critic", "You are the Quality Critic."))
+    assert client.hedged_calls == 0
+
+
+def test_cassette_record_then_replay(fake_llm, settings, tmp_path):
+    settings.llm_cassette_path = str(tmp_path / "run.jsonl.gz")
+    settings.llm_cassette_mode = "record"
+    recorder = LLMClient(fake_llm, settings)
+    graph = build_creator_graph(recorder, settings)
+    recorded = asyncio.run(graph.ainvoke(create_initial_state("monsoon in Jaipur")))
+    recorder.close()
+    live_calls = list(fake_llm.calls)
+
+    settings.llm_cassette_mode = "replay"
+    offline = type(fake_llm)(responses={}, calls=[])
+    player = LLMClient(offline, settings)
+    replayed = asyncio.run(build_creator_graph(player, settings).ainvoke(create_initial_state("monsoon in Jaipur")))
+
+    assert offline.calls == []
+    assert player.player.hits == len(live_calls)
+    assert replayed["final_blueprint"] == recorded["final_blueprint"]
+
+
+def test_service_replays_without_api_key(fake_llm, settings, tmp_path):
+    settings.llm_cassette_path = str(tmp_path / "run.jsonl")
+    settings.llm_cassette_mode = "record"
+    recorder = LLMClient(fake_llm, settings)
+    recorded = asyncio.run(build_creator_graph(recorder, settings).ainvoke(create_initial_state("monsoon in Jaipur")))
+    recorder.close()
+
+    offline = Settings(
+        groq_api_key="", llm_cassette_mode="replay", llm_cassette_path=settings.llm_cassette_path, _env_file=None
+    )
+    service = CreatorWorkflowService(offline)
+    replayed = asyncio.run(service.run_create("monsoon in Jaipur"))
+    assert replayed["final_blueprint"] == recorded["final_blueprint"]
+
+
+def test_cassette_replay_runs_out(settings, tmp_path):
+    settings.llm_cassette_path = str(tmp_path / "empty.jsonl")
+    (tmp_path / "empty.jsonl").write_text("")
+    settings.llm_cassette_mode = "replay"
+    client = LLMClient(None, settings)
+    with pytest.raises(CassetteMiss):
+        asyncio.run(client.ainvoke("critic", "You are the Quality Critic."))
@@ -0,0 +1,72 @@
+import asyncio
+
+from app.agents.local_analyzer import (
+    AnalysisCache,
+    analyze_locally,
+    detect_language,
+    extract_themes,
+    normalize_prompt,
+)
+from app.agents.workflow import build_creator_graph
+from app.services.report_service import create_initial_state
+
+
+def test_language_detection():
+    assert detect_language("a travel reel about Jaipur")[0] == "English"
+    assert detect_language("Write it in Tamil: street food of Chennai") == ("Tamil", 0.95)
+    assert detect_language("जयपुर में मानसून का जादू")[0] == "Hindi"
+    assert detect_language("東京の夜の散歩")[0] == "Japanese"
+    assert detect_language("la mejor receta de tacos para la cena con mi familia")[0] == "Spanish"
+    assert detect_language("mera pehla vlog kya hai aur kaise bana")[0] == "Hinglish"
+    assert detect_language("monsoon vlog (in Hindi)") == ("Hindi", 0.95)
+    # "in Italian style" is not a language request; a trailing "in Italian" is left to the LLM.
+    assert detect_language("How to cook pasta in Italian style at home")[0] == "English"
+    assert detect_language("pasta recipe in Italian")[1] < 0.6
+
+
+def test_local_analysis_fields():
+    result = analyze_locally("Funny prank on my roommate in Mumbai", "reel", 30, "instagram")
+    analysis = result.analysis
+    assert (analysis["genre"], analysis["tone"], analysis["region"]) == ("comedy", "humorous", "India")
+    assert analysis["platform_optimization"]["aspect_ratio"] == "9:16"
+    assert "Mumbai" in analysis["key_themes"]
+    assert result.confidence >= 0.6
+
+    vague = analyze_locally("something for my page", "reel", 30, "instagram")
+    assert vague.confidence < 0.6
+    # A tone taken from the genre default is a guess, not a match.
+    defaulted = analyze_locally("How to make cold brew coffee at home", "reel", 30, "instagram")
+    assert defaulted.analysis["tone"] == "casual" and defaulted.confidence < 0.6
+    assert analyze_locally("x", "youtube", 600, "youtube").analysis["platform_optimization"]["aspect_ratio"] == "16:9"
+    assert extract_themes("Monsoon magic in Jaipur: monsoon streets, monsoon chai")[:2] == ["Monsoon", "Jaipur"]
+
+
+def test_cache_key_is_normalised():
+    cache = AnalysisCache(max_entries=2)
+    state = create_initial_state("Monsoon  in JAIPUR!")
+    cache.put(state, {"genre": "cinematic"}, "llm")
+    assert normalize_prompt("Monsoon  in JAIPUR!") == "monsoon in jaipur"
+    assert cache.get(create_initial_state("monsoon in jaipur")) == {"genre": "cinematic"}
+    assert cache.get(create_initial_state("monsoon in jaipur", platform="youtube")) is None
+    assert cache.snapshot()["hits"] == 1
+
+
+def test_analyzer_uses_local_result_then_cache_and_falls_back_to_llm(fake_llm, settings):
+    cache = AnalysisCache()
+    graph = build_creator_graph(fake_llm, settings, analysis_cache=cache)
+
+    confident = asyncio.run(graph.ainvoke(create_initial_state("Cinematic drone shots of monsoon in Jaipur")))
+    assert confident["analysis_source"] == "local"
+    assert confident["analysis"]["region"] == "India"
+    assert "analyzer" not in fake_llm.calls
+
+    vague = asyncio.run(graph.ainvoke(create_initial_state("something for my page")))
+    assert vague["analysis_source"] == "llm"
+    assert vague["analysis_confidence"] == 1.0
+    assert fake_llm.calls.count("analyzer") == 1
+
+    again = asyncio.run(graph.ainvoke(create_initial_state("Something for my page.")))
+    assert again["analysis_source"] == "cache"
+    assert again["analysis"] == vague["analysis"]
+    assert fake_llm.calls.count("analyzer") == 1
+    assert cache.snapshot()["sources"] == {"local": 1, "llm": 1, "cache": 1}
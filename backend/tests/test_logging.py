@@ -0,0 +1,37 @@
+import io
+import json
+import logging
+
+from app.core.config import Settings
+from app.core.logging import SamplingFilter, configure_logging, log_context, shutdown_logging
+
+
+def test_json_lines_carry_run_context():
+    stream = io.StringIO()
+    configure_logging(Settings(_env_file=None, log_sample_burst=0), stream=stream)
+    logger = logging.getLogger("app.test")
+    try:
+        with log_context(run_id="r1", node="critic"):
+            logger.info("score=%d", 8)
+        logger.warning("outside")
+    finally:
+        shutdown_logging()
+    # Still written once the listener has stopped.
+    logger.warning("after shutdown")
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines[0]["message"] == "score=8"
+    assert (lines[0]["run_id"], lines[0]["node"]) == ("r1", "critic")
+    assert "run_id" not in lines[1]
+    assert lines[2]["message"] == "after shutdown"
+
+
+def test_sampling_keeps_burst_then_one_in_n_and_all_warnings():
+    sampler = SamplingFilter(burst=3, every=5, window_seconds=60)
+
+    def record(level):
+        return logging.LogRecord("app", level, __file__, 1, "step %d", (1,), None)
+
+    kept = sum(sampler.filter(record(logging.INFO)) for _ in range(23))
+    assert kept == 3 + 4
+    assert all(sampler.filter(record(logging.WARNING)) for _ in range(10))
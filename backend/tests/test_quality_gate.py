@@ -0,0 +1,87 @@
+import asyncio
+
+from app.agents.quality_gate import evaluate_gate, get_gate_stats, has_cta, spoken_words
+from app.agents.workflow import build_creator_graph
+from app.services.report_service import create_initial_state
+
+FULL_SCRIPT = (
+    "[00:00] HOOK: The first drop of rain lands on the old palace steps and the whole city holds its breath.\n"
+    "[VISUAL: close-up of raindrops]\n"
+    "VO: Jaipur wakes up slowly in the monsoon, pink walls turning a deeper shade of rose as the streets fill "
+    "with the smell of wet stone, chai and marigolds from the flower sellers near the gate.\n"
+    "[MUSIC: soft sitar]\n"
+    "CTA: Follow for more hidden corners of Rajasthan."
+)
+
+
+def _state(**overrides):
+    state = create_initial_state("monsoon in Jaipur", "reel", 30)
+    state.update(
+        script=FULL_SCRIPT,
+        timeline=[{"timestamp": "00:00 - 00:15"}, {"timestamp": "00:15 - 00:30"}],
+        enhancements={"hashtags": ["#jaipur"] * 6},
+    )
+    state.update(overrides)
+    return state
+
+
+def test_gate_checks(settings):
+    assert spoken_words("[VISUAL: x]\nVO: two words") == 2
+    assert evaluate_gate(_state(), settings).verdict == "pass"
+
+    short = evaluate_gate(_state(timeline=[{"timestamp": "00:00 - 00:10"}]), settings)
+    assert short.verdict == "fail" and short.findings[0].check == "timeline_coverage"
+    assert "visual_cues" in short.section_feedback()
+
+    no_cta = evaluate_gate(_state(script=FULL_SCRIPT.rsplit("\n", 1)[0]), settings)
+    assert [f.check for f in no_cta.findings] == ["missing_cta"]
+    assert not has_cta("A shopkeeper smiled at the tapestry.")
+    assert has_cta("Drop your favourite spot below and tag a friend.")
+
+    # English translations in parentheses are not spoken, so they don't count against the length.
+    line = "VO: " + " ".join(["जयपुर"] * 15) + " (" + " ".join(["Jaipur"] * 15) + ")\n"
+    translated = line * 5 + "CTA: फॉलो करें (Follow for more)"
+    hindi = evaluate_gate(_state(script=translated, analysis={"language": "Hindi"}), settings)
+    assert hindi.verdict != "fail" and "script_too_long" not in [f.check for f in hindi.findings]
+
+    # Soft findings defer to the critic; hashtags are not judged when the enhancer was skipped.
+    assert evaluate_gate(_state(enhancements={"hashtags": ["#a"]}), settings).verdict == "uncertain"
+    assert evaluate_gate(_state(enhancements={}, skipped_nodes=["enhancer"]), settings).verdict == "pass"
+
+
+def test_decisive_failure_refines_without_critic(fake_llm, settings):
+    fake_llm.responses = {"timeline_planner": [{"timestamp": "00:00 - 00:05", "visual": "rain"}]}
+    graph = build_creator_graph(fake_llm, settings)
+
+    result = asyncio.run(graph.ainvoke(create_initial_state("monsoon in Jaipur", "reel", 30)))
+
+    assert fake_llm.calls.count("critic") == 1
+    assert fake_llm.calls.index("refiner") < fake_llm.calls.index("critic")
+    assert result["gate_verdict"] == "fail"
+    assert result["iteration_count"] == 2
+
+
+def test_clean_pass_can_skip_critic(fake_llm, settings):
+    settings.gate_skip_critic_on_pass = True
+    fake_llm.responses = {"script_writer": FULL_SCRIPT}
+    saved_before = get_gate_stats().snapshot()["critic_calls_saved"]
+    graph = build_creator_graph(fake_llm, settings)
+
+    result = asyncio.run(graph.ainvoke(create_initial_state("monsoon in Jaipur", "reel", 30)))
+
+    assert "critic" not in fake_llm.calls
+    assert result["gate_action"] == "finalize"
+    assert result["score"] == settings.min_quality_score
+    assert result["final_blueprint"]
+    assert get_gate_stats().snapshot()["critic_calls_saved"] == saved_before + 1
+
+
+def test_gate_disabled_always_calls_critic(fake_llm, settings):
+    settings.quality_gate_enabled = False
+    fake_llm.responses = {"timeline_planner": [{"timestamp": "00:00 - 00:05", "visual": "rain"}]}
+    graph = build_creator_graph(fake_llm, settings)
+
+    asyncio.run(graph.ainvoke(create_initial_state("monsoon in Jaipur", "reel", 30)))
+
+    assert fake_llm.calls.count("critic") == 1
+    assert "refiner" not in fake_llm.calls
@@ -0,0 +1,58 @@
+from app.services.rag_service import RAGIndexer, SeenIds, build_chunks
+
+
+class FakeCollection:
+    def __init__(self):
+        self.upserts = []
+        self.ids = set()
+
+    def count(self):
+        return len(self.ids)
+
+    def upsert(self, ids, documents, metadatas):
+        self.upserts.append(list(ids))
+        self.ids.update(ids)
+
+
+def research(n, prefix="fact"):
+    return [{"sub_question": f"q{i}", "summary": f"{prefix} {i}", "sources": []} for i in range(n)]
+
+
+def test_indexer_batches_and_dedups_across_submissions(tmp_path):
+    collection = FakeCollection()
+    indexer = RAGIndexer(collection, seen_path=tmp_path / "seen.bin", batch_size=4, max_batch_wait=0.05)
+    indexer.submit("monsoon", research(3))
+    indexer.submit("monsoon", research(3))  # exact duplicates of the first run
+    indexer.submit("monsoon", research(5, prefix="new"))
+    assert indexer.flush()
+    indexer.close()
+
+    assert all(len(batch) <= 4 for batch in collection.upserts)
+    assert len(collection.ids) == 8
+    assert indexer.skipped_duplicates == 3
+
+    # Seen ids survive a restart, so nothing is re-upserted.
+    restarted = RAGIndexer(collection, seen_path=tmp_path / "seen.bin", batch_size=4)
+    restarted.submit("monsoon", research(3))
+    restarted.flush()
+    restarted.close()
+    assert restarted.indexed == 0 and restarted.skipped_duplicates == 3
+
+
+def test_long_texts_are_chunked():
+    text = ". ".join(f"Sentence number {i} about the monsoon" for i in range(200))
+    chunks = list(build_chunks("monsoon", [{"summary": text}], chunk_chars=500, overlap=50))
+    assert len(chunks) > 1
+    assert all(len(doc) < 600 for _, doc, _ in chunks)
+    assert len({doc_id for doc_id, _, _ in chunks}) == len(chunks)
+
+
+def test_seen_ids_ignores_torn_record(tmp_path):
+    path = tmp_path / "seen.bin"
+    SeenIds(path).add_many(["0" * 32, "f" * 32])
+    with path.open("ab") as handle:
+        handle.write(b"\x01\x02")
+    seen = SeenIds(path)
+    assert len(seen) == 2
+    seen.add_many(["a" * 32])
+    assert len(SeenIds(path)) == 3
@@ -0,0 +1,70 @@
+import asyncio
+import csv
+import io
+
+from fastapi.testclient import TestClient
+
+from app.agents.blueprint import blueprint_view, render_markdown
+from app.agents.workflow import build_creator_graph
+from app.main import app
+from app.services.history_service import RunHistoryStore, get_history_store
+from app.services.render_service import RenderCache, get_render_cache, negotiate_format
+from app.services.report_service import create_initial_state
+
+
+def test_negotiate_format():
+    assert negotiate_format("csv", None) == "csv"
+    assert negotiate_format("pdf", None) is None
+    assert negotiate_format(None, "text/html,application/json;q=0.9") == "html"
+    assert negotiate_format(None, "text/html;q=0.5, text/csv") == "csv"
+    assert negotiate_format(None, "*/*") == "markdown"
+
+
+def test_markdown_keeps_empty_script_and_tolerates_malformed_agent_output():
+    state = create_initial_state("monsoon in Jaipur")
+    markdown = render_markdown(blueprint_view(state))
+    # An empty script stays an empty line, as the finalizer always rendered it.
+    assert "## 📝 Script\n\n\n\n## 🎯" in markdown
+    assert "_No script generated._" not in markdown
+
+    # Malformed lists from an agent are skipped instead of failing the finalizer.
+    state.update(timeline=["not a shot", {"timestamp": "00:00 - 00:30"}], enhancements={"hashtags": None, "hooks": "x"})
+    markdown = render_markdown(blueprint_view(state))
+    assert "### Shot 1: 00:00 - 00:30" in markdown and "### Shot 2" not in markdown
+
+
+def test_blueprint_endpoint_renders_each_format_once(fake_llm, settings, tmp_path):
+    settings.local_analyzer_enabled = False
+    fake_llm.responses["analyzer"] = {"language": "English", "genre": "<script>alert(1)</script>"}
+    state = asyncio.run(build_creator_graph(fake_llm, settings).ainvoke(create_initial_state("monsoon in Jaipur")))
+    store = RunHistoryStore(str(tmp_path / "runs.db"))
+    store.submit(state)
+    store.flush()
+    cache = RenderCache()
+    app.dependency_overrides[get_history_store] = lambda: store
+    app.dependency_overrides[get_render_cache] = lambda: cache
+    url = f"/api/runs/{state['run_id']}/blueprint"
+    try:
+        client = TestClient(app)
+        markdown = client.get(url)
+        assert markdown.text == state["final_blueprint"]
+        assert markdown.headers["content-type"].startswith("text/markdown")
+
+        page = client.get(url, headers={"Accept": "text/html"})
+        assert page.headers["content-type"].startswith("text/html")
+        assert "&lt;script&gt;" in page.text and "<script>" not in page.text
+
+        rows = list(csv.reader(io.StringIO(client.get(url, params={"format": "csv"}).text)))
+        assert rows[0][:3] == ["shot", "timestamp", "shot_type"]
+        assert len(rows) == 1 + len(state["timeline"])
+
+        document = client.get(url, params={"format": "json"}).json()
+        assert document["run_id"] == state["run_id"]
+        assert document["shots"][0]["timestamp"] == "00:00 - 00:15"
+
+        client.get(url, params={"format": "json"})
+        assert (cache.misses, cache.hits) == (3, 1)
+        assert client.get(url, params={"format": "pdf"}).status_code == 400
+    finally:
+        app.dependency_overrides.clear()
+        store.close()
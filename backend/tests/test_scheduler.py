@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+import pytest
+from starlette.requests import Request
+
+from app.agents.llm import current_usage
+from app.services.scheduler import FairScheduler, TenantBudgetExceeded, resolve_tenant
+
+
+async def run_jobs(scheduler, jobs, hold=0.01):
+    """Start every (tenant, priority) job at once; return the order they got slots."""
+    order = []
+
+    async def job(tenant, priority):
+        async with scheduler.slot(tenant, priority):
+            order.append((tenant, priority))
+            await asyncio.sleep(hold)
+
+    await asyncio.gather(*(job(t, p) for t, p in jobs))
+    return order
+
+
+def test_weighted_fair_share_and_priority():
+    scheduler = FairScheduler(max_concurrency=1, tenant_max_concurrency=1, tenant_weights={"big": 2.0})
+    jobs = [("bulk", "batch")] * 3 + [("big", "interactive")] * 4 + [("small", "interactive")] * 2
+    order = asyncio.run(run_jobs(scheduler, jobs))
+
+    # The first batch job was granted before anything else was queued; after
+    # that, every interactive run goes ahead of the remaining batch work.
+    assert order[0] == ("bulk", "batch")
+    assert order[-2:] == [("bulk", "batch")] * 2
+    interactive = [tenant for tenant, _ in order[1:-2]]
+    # Weight 2 gets two slots for every one of the weight-1 tenant.
+    assert interactive == ["big", "big", "small", "big", "big", "small"]
+
+    metrics = scheduler.metrics()
+    assert metrics["completed"] == 9
+    assert metrics["queue_wait_seconds"]["batch"]["max"] > metrics["queue_wait_seconds"]["interactive"]["p50"]
+
+
+def test_tenant_concurrency_cap():
+    scheduler = FairScheduler(max_concurrency=4, tenant_max_concurrency=1)
+    peak = {"a": 0}
+    active = {"a": 0}
+
+    async def job():
+        async with scheduler.slot("a"):
+            active["a"] += 1
+            peak["a"] = max(peak["a"], active["a"])
+            await asyncio.sleep(0.01)
+            active["a"] -= 1
+
+    async def main():
+        await asyncio.gather(*(job() for _ in range(3)))
+
+    asyncio.run(main())
+    assert peak["a"] == 1
+
+
+def test_token_budget_rejects_after_usage():
+    scheduler = FairScheduler(token_budget=100)
+
+    async def main():
+        async with scheduler.slot("t"):
+            usage = current_usage.get()
+            usage["input_tokens"] += 80
+            usage["output_tokens"] += 40
+        with pytest.raises(TenantBudgetExceeded):
+            async with scheduler.slot("t"):
+                pass
+        async with scheduler.slot("other"):
+            pass
+
+    asyncio.run(main())
+    assert scheduler.metrics()["tenants"]["t"]["tokens_in_window"] == 120
+
+
+def test_resolve_tenant(settings):
+    def request(headers):
+        return Request({"type": "http", "headers": [(k.encode(), v.encode()) for k, v in headers.items()]})
+
+    settings.tenant_api_keys = {"secret": "acme"}
+    assert resolve_tenant(request({"x-api-key": "secret"}), settings) == "acme"
+    assert resolve_tenant(request({"x-api-key": "other"}), settings) == "unknown"
+    assert resolve_tenant(request({}), settings) == "anonymous"
+    # A caller-chosen X-Tenant-ID can't pick (or spoof) a tenant...
+    assert resolve_tenant(request({"x-tenant-id": "team-a"}), settings) == "anonymous"
+    assert resolve_tenant(request({"x-tenant-id": "team-a", "x-api-key": "secret"}), settings) == "acme"
+    # ...unless a trusted proxy sets it.
+    settings.trust_tenant_header = True
+    assert resolve_tenant(request({"x-tenant-id": "team-a", "x-api-key": "secret"}), settings) == "team-a"
+
+
+def test_forgets_idle_tenants():
+    scheduler = FairScheduler(budget_window_seconds=0.05)
+
+    async def main():
+        for i in range(50):
+            async with scheduler.slot(f"tenant-{i}"):
+                pass
+        async with scheduler.slot("spender") as ticket:
+            ticket.usage["output_tokens"] = 10
+
+    asyncio.run(main())
+    # Only the tenant with usage in its budget window is still tracked.
+    assert set(scheduler._running) | set(scheduler._tenant_tag) | set(scheduler._usage) == {"spender"}
+    time.sleep(0.06)
+    assert scheduler.metrics()["tenants"] == {}
+    assert not scheduler._running and not scheduler._tenant_tag and not scheduler._usage
+
+
+def test_unknown_keys_share_a_budget(settings):
+    def request(key):
+        return Request({"type": "http", "headers": [(b"x-api-key", key.encode())]})
+
+    settings.tenant_api_keys = {"secret": "acme"}
+    scheduler = FairScheduler(token_budget=100)
+    first, second = (resolve_tenant(request(key), settings) for key in ("made-up-1", "made-up-2"))
+
+    async def main():
+        async with scheduler.slot(first) as ticket:
+            ticket.usage["output_tokens"] = 150
+        with pytest.raises(TenantBudgetExceeded):
+            scheduler.check_admission(second)
+        scheduler.check_admission(resolve_tenant(request("secret"), settings))
+
+    asyncio.run(main())
+
+    # Per-key tenants only when opted in.
+    settings.tenant_hash_unknown_keys = True
+    assert resolve_tenant(request("made-up-1"), settings) != resolve_tenant(request("made-up-2"), settings)
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from app.agents.workflow import build_creator_graph
+from app.services.report_service import CreatorWorkflowService
+
+
+@pytest.fixture
+def service(fake_llm, settings):
+    svc = CreatorWorkflowService(settings)
+    svc.graph = build_creator_graph(fake_llm, settings)
+    svc.draft_graph = build_creator_graph(type(fake_llm)(responses={}, calls=[]), settings, draft=True)
+    return svc
+
+
+def collect(agen):
+    async def run():
+        return [event async for event in agen]
+
+    return asyncio.run(run())
+
+
+def test_preview_streams_before_done(service, fake_llm):
+    fake_llm.latency = lambda node: 0.05
+    events = collect(service.stream_create("monsoon in Jaipur", preview=True))
+
+    names = [e["event"] for e in events]
+    assert names[0] == "start"
+    assert names[-1] == "done"
+    assert names.index("preview") < names.index("done")
+    preview = next(e for e in events if e["event"] == "preview")
+    assert "Draft preview" in preview["state"]["final_blueprint"]
+    assert not preview["state"]["timeline"]
+
+
+def test_stream_without_preview(service):
+    names = [e["event"] for e in collect(service.stream_create("monsoon in Jaipur"))]
+    assert "preview" not in names
+    assert names[-1] == "done"
+
+
+def test_history_timings_exclude_a_slow_consumer(service, fake_llm):
+    submitted = {}
+
+    class History:
+        def submit(self, state, elapsed_seconds=0.0, timings=None):
+            submitted.update(elapsed=elapsed_seconds, timings=timings)
+
+    service.history = History()
+    fake_llm.latency = lambda node: 0.02
+
+    async def slow_reader():
+        async for _ in service.stream_create("monsoon in Jaipur"):
+            await asyncio.sleep(0.1)
+
+    asyncio.run(slow_reader())
+    assert set(submitted["timings"]) >= {"script_writer", "critic", "finalizer"}
+    assert all(seconds < 0.09 for seconds in submitted["timings"].values())
+    assert submitted["elapsed"] < 0.1 * len(submitted["timings"])
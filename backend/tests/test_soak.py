@@ -0,0 +1,16 @@
+import asyncio
+
+from benchmarks.soak import check, soak
+
+
+def test_soak_smoke(settings):
+    settings.history_enabled = False
+    report = asyncio.run(soak(concurrency=20, runs=40, warmup=20, latency_ms=1, settings=settings))
+
+    assert report["runs"] == 40
+    assert report["errors"] == 0
+    assert report["events_per_s"] > 0
+    assert 0 < report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+    # Too few runs for a tight bound; this only catches gross per-run leaks.
+    assert check(report, max_bytes_per_run=64 * 1024) == []
+    assert check({**report, "errors": 1}, max_bytes_per_run=64 * 1024)
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.agents.workflow import build_creator_graph
+from app.core.config import Settings
+from app.core.profiling import SamplingProfiler
+from app.core.tracing import configure_tracing, shutdown_tracing, span
+from app.main import app
+from app.services.report_service import create_initial_state
+
+
+def exported_spans(path):
+    spans = []
+    for line in path.read_text().splitlines():
+        for resource in json.loads(line)["resourceSpans"]:
+            for scope in resource["scopeSpans"]:
+                spans.extend(scope["spans"])
+    return spans
+
+
+def test_graph_spans_nest_under_request(fake_llm, settings, tmp_path):
+    path = tmp_path / "spans.jsonl"
+    configure_tracing(Settings(_env_file=None, tracing_enabled=True, trace_export_path=str(path)))
+    try:
+        graph = build_creator_graph(fake_llm, settings)
+
+        async def main():
+            with span("request") as root:
+                await graph.ainvoke(create_initial_state("monsoon in Jaipur"))
+            return root
+
+        root = asyncio.run(main())
+    finally:
+        shutdown_tracing()
+
+    spans = exported_spans(path)
+    by_id = {s["spanId"]: s for s in spans}
+    assert {s["traceId"] for s in spans} == {root.trace_id}
+    nodes = [s for s in spans if s["name"].startswith("node ")]
+    assert {s["name"] for s in nodes} >= {"node analyzer", "node critic", "node finalizer"}
+    assert all(s["parentSpanId"] == root.span_id for s in nodes)
+    llm_calls = [s for s in spans if s["name"] == "llm.call"]
+    assert len(llm_calls) == len(fake_llm.calls)
+    assert all(by_id[s["parentSpanId"]]["name"].startswith("node ") for s in llm_calls)
+
+
+def test_request_gets_trace_id_header(tmp_path):
+    configure_tracing(Settings(_env_file=None, tracing_enabled=True, trace_export_path=str(tmp_path / "s.jsonl")))
+    try:
+        response = TestClient(app).get("/api/health")
+    finally:
+        shutdown_tracing()
+    assert len(response.headers["x-trace-id"]) == 32
+
+
+def test_profiler_writes_collapsed_stacks(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), interval_ms=1)
+    result = {}
+
+    def busy_request():
+        session = profiler.start()
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+        result["path"] = profiler.stop(session)
+        result["id"] = session.profile_id
+
+    thread = threading.Thread(target=busy_request)
+    thread.start()
+    thread.join()
+
+    profile = profiler.load(result["id"])
+    assert "busy_request" in profile
+    stack, count = profile.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+    assert profiler.load("../etc/passwd") is None
@@ -0,0 +1,119 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.agents.workflow import build_creator_graph
+from app.core.config import get_settings
+from app.main import app
+from app.services.report_service import CreatorWorkflowService, get_creator_service
+from app.services.run_registry import RunRegistry, get_run_registry
+from app.services.scheduler import FairScheduler, get_scheduler
+
+
+@pytest.fixture
+def client(fake_llm, settings):
+    service = CreatorWorkflowService(settings)
+    service.graph = build_creator_graph(fake_llm, settings)
+    app.dependency_overrides[get_creator_service] = lambda: service
+    scheduler, registry = FairScheduler(), RunRegistry()
+    app.dependency_overrides[get_scheduler] = lambda: scheduler
+    app.dependency_overrides[get_run_registry] = lambda: registry
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+def receive_until_closed(ws, run_ids):
+    events, open_runs = [], set(run_ids)
+    while open_runs:
+        event = ws.receive_json()
+        events.append(event)
+        if event["event"] == "closed":
+            open_runs.discard(event["run_id"])
+    return events
+
+
+def test_multiplexes_runs_and_resumes(client):
+    with client.websocket_connect("/api/ws") as ws:
+        for request_id in ("a", "b"):
+            ws.send_json({"type": "start", "request_id": request_id, "prompt": "monsoon in Jaipur"})
+        started, closed, events = {}, set(), []
+        while len(closed) < 2:
+            event = ws.receive_json()
+            if event["event"] == "started":
+                started[event["request_id"]] = event["run_id"]
+                continue
+            events.append(event)
+            if event["event"] == "closed":
+                closed.add(event["run_id"])
+
+    assert closed == set(started.values())
+    for run_id in started.values():
+        run_events = [e for e in events if e.get("run_id") == run_id]
+        assert [e["seq"] for e in run_events] == sorted(e["seq"] for e in run_events)
+        assert run_events[-2]["event"] == "done" and run_events[-1]["status"] == "done"
+
+    # A new connection resumes a finished run from the last seq it saw.
+    run_id = started["a"]
+    with client.websocket_connect("/api/ws") as ws:
+        ws.send_json({"type": "watch", "run_id": run_id, "after": 2})
+        assert ws.receive_json() == {"event": "watching", "run_id": run_id, "status": "done"}
+        replay = receive_until_closed(ws, [run_id])
+    assert replay[0]["seq"] == 3
+
+
+def test_cancel_run(client, fake_llm):
+    fake_llm.latency = lambda node: 0.5 if node == "script_writer" else 0.0
+    with client.websocket_connect("/api/ws") as ws:
+        ws.send_json({"type": "start", "prompt": "monsoon in Jaipur"})
+        run_id = ws.receive_json()["run_id"]
+        ws.send_json({"type": "cancel", "run_id": run_id})
+        events = receive_until_closed(ws, [run_id])
+    assert events[-2]["event"] == "cancelled"
+    assert "done" not in [e["event"] for e in events]
+
+
+def test_rejects_invalid_start(client):
+    with client.websocket_connect("/api/ws") as ws:
+        ws.send_json({"type": "start", "request_id": "x", "prompt": "no"})
+        event = ws.receive_json()
+    assert event["event"] == "error" and event["request_id"] == "x"
+
+
+def test_runs_are_private_to_their_tenant(client, fake_llm, monkeypatch):
+    monkeypatch.setattr(get_settings(), "tenant_api_keys", {"team-a": "a", "team-b": "b"})
+    fake_llm.latency = lambda node: 0.3 if node == "script_writer" else 0.0
+    with client.websocket_connect("/api/ws", headers={"X-API-Key": "team-a"}) as owner:
+        owner.send_json({"type": "start", "prompt": "monsoon in Jaipur"})
+        run_id = owner.receive_json()["run_id"]
+        with client.websocket_connect("/api/ws", headers={"X-API-Key": "team-b"}) as other:
+            for kind in ("watch", "cancel"):
+                other.send_json({"type": kind, "run_id": run_id})
+                assert other.receive_json() == {"event": "error", "run_id": run_id, "message": "Unknown or expired run"}
+        events = receive_until_closed(owner, [run_id])
+    assert events[-1]["status"] == "done"
+
+
+def test_bad_watch_cursor_keeps_connection(client):
+    with client.websocket_connect("/api/ws") as ws:
+        ws.send_json({"type": "start", "prompt": "monsoon in Jaipur"})
+        run_id = ws.receive_json()["run_id"]
+        receive_until_closed(ws, [run_id])
+        for after in ("x", None):
+            ws.send_json({"type": "watch", "run_id": run_id, "after": after})
+            assert ws.receive_json()["event"] == "error"
+        ws.send_json({"type": "watch", "run_id": run_id, "after": 2})
+        assert ws.receive_json()["event"] == "watching"
+
+
+def test_run_cap_counts_unwatched_runs(client, fake_llm, monkeypatch):
+    monkeypatch.setattr(get_settings(), "ws_max_runs_per_connection", 1)
+    fake_llm.latency = lambda node: 0.3 if node == "script_writer" else 0.0
+    with client.websocket_connect("/api/ws") as ws:
+        ws.send_json({"type": "start", "prompt": "monsoon in Jaipur"})
+        run_id = ws.receive_json()["run_id"]
+        ws.send_json({"type": "unwatch", "run_id": run_id})
+        ws.send_json({"type": "start", "request_id": "second", "prompt": "monsoon in Jaipur"})
+        event = ws.receive_json()
+        while event.get("run_id") == run_id:  # events forwarded before the unwatch
+            event = ws.receive_json()
+    assert event == {"event": "error", "request_id": "second", "message": "Too many runs on this connection"}
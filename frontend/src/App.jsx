@@ -125,6 +125,7 @@ export default function App() {
   const [error, setError] = useState("");
   const [timeline, setTimeline] = useState([]);
   const [state, setState] = useState(INITIAL_STATE);
+  const [preview, setPreview] = useState(null);
   const [elapsed, setElapsed] = useState(0);
 
   const sourceRef = useRef(null);
@@ -132,9 +133,12 @@ export default function App() {
 
   const finalDurationSec = timeUnit === "min" ? timeValue * 60 : timeValue;
 
+  // Show the draft preview until the full pipeline produces its blueprint.
+  const viewState = !state.final_blueprint && preview ? preview : state;
+
   const hasBlueprint = useMemo(
-    () => Boolean(state.final_blueprint || state.script),
-    [state]
+    () => Boolean(viewState.final_blueprint || viewState.script),
+    [viewState]
   );
 
   const closeSource = () => {
@@ -157,6 +161,7 @@ export default function App() {
     setError("");
     setRunning(true);
     setTimeline([]);
+    setPreview(null);
     setState({
       ...INITIAL_STATE,
       prompt: cleanPrompt,
@@ -176,6 +181,7 @@ export default function App() {
       content_type: contentType,
       duration: String(finalDurationSec),
       platform,
+      preview: "true",
     });
     const url = `${API_BASE_URL}/api/create/stream?${params}`;
     const source = new EventSource(url);
@@ -199,6 +205,16 @@ export default function App() {
       if (payload.state) setState(payload.state);
     });
 
+    source.addEventListener("preview", (evt) => {
+      const payload = parseStreamData(evt);
+      if (!payload?.state) return;
+      setPreview(payload.state);
+      setTimeline((prev) => [
+        ...prev,
+        { type: "start", label: "Draft preview ready", at: new Date().toISOString() },
+      ]);
+    });
+
     source.addEventListener("done", (evt) => {
       const payload = parseStreamData(evt);
       if (payload?.state) setState(payload.state);
@@ -358,7 +374,7 @@ export default function App() {
       <div className="w-full flex items-center justify-between max-w-[1100px] z-50 mb-8">
         {/* Left: Brand */}
         <button
-          onClick={() => { closeSource(); setRunning(false); setTimeline([]); setState(INITIAL_STATE); }}
+          onClick={() => { closeSource(); setRunning(false); setTimeline([]); setPreview(null); setState(INITIAL_STATE); }}
           className="flex items-center gap-2 text-ink/70 hover:text-ink transition-colors"
         >
           <div className="flex h-8 w-8 items-center justify-center rounded-lg glass-strong overflow-hidden">
@@ -436,7 +452,7 @@ export default function App() {
         <AgentTimeline timeline={timeline} state={state} running={running} elapsed={elapsed} />
 
         {(hasBlueprint || !running) && (
-          <BlueprintViewer state={state} hasBlueprint={hasBlueprint} running={running} />
+          <BlueprintViewer state={viewState} hasBlueprint={hasBlueprint} running={running} />
         )}
       </main>
     </div>